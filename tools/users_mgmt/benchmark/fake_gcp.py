@@ -0,0 +1,372 @@
+# Copyright (c) 2024-2025 Accenture, All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+fake_gcp.py
+
+In-process stand-in for Google Cloud Platform APIs used by the users_mgmt tool:
+- Resource Manager `ProjectsClient.get_iam_policy` / `set_iam_policy` (with etags),
+- IAM `roles()` discovery resource (`list`, `list_next`, `get` and batch requests),
+- Cloud Storage bucket objects with generation preconditions (used for project locks).
+
+Backend counts every call by RPC type, can inject latency and quota errors,
+so `Operation` and `RolesMgmt` can be measured without a live GCP project.
+
+Author: Accenture
+Date: October 2026
+"""
+import copy
+import logging
+import itertools
+import random
+import threading
+import time
+from collections import Counter
+
+from google.api_core.exceptions import Aborted, NotFound, PreconditionFailed, ResourceExhausted
+from google.iam.v1 import policy_pb2
+
+from retry_policy import RetryPolicy, TokenBucket
+from rpc_stats import RpcStats
+
+
+class FakeBackend:
+    """Fake GCP Backend Class
+
+    Holds IAM policies of projects and GCP roles catalog, counts calls and injects latency and errors.
+    """
+
+    def __init__(self, roles=(), latency=0.0, quota_error_rate=0.0, seed=0):
+        """Fake GCP Backend Class Constructor
+
+        Args:
+            roles (iterable): GCP roles definitions served by the IAM roles resource
+            latency (float): Time (in seconds) each call takes
+            quota_error_rate (float): Probability (0-1) of call failing with quota error (429)
+            seed (int): seed of random generator used for errors injection
+        """
+        self.roles = {role["name"]: role for role in roles}
+        self.latency = latency
+        self.quota_error_rate = quota_error_rate
+        self.rpc_counts = Counter()
+        self.__policies = {}
+        self.__etags = itertools.count(1)
+        self.__random = random.Random(seed)
+        self.__lock = threading.RLock()
+        self.__buckets = {}
+
+    def call(self, rpc):
+        """Register a call: count it, wait configured latency and inject quota error.
+
+        Args:
+            rpc (string): RPC type name
+
+        Raises:
+            google.api_core.exceptions.ResourceExhausted: Raised randomly with probability `quota_error_rate`.
+        """
+        with self.__lock:
+            self.rpc_counts[rpc] += 1
+            quota_error = self.__random.random() < self.quota_error_rate
+        if self.latency:
+            time.sleep(self.latency)
+        if quota_error:
+            raise ResourceExhausted(f"Fake quota exceeded for {rpc}.")
+
+    def new_etag(self):
+        """Generate new policy etag.
+
+        Returns:
+            bytes: etag
+        """
+        with self.__lock:
+            return str(next(self.__etags)).encode()
+
+    def set_policy(self, resource, users_by_roles):
+        """Set project IAM policy directly (without counting a call).
+
+        Args:
+            resource (string): Resource name. Format: "projects/<project_id>"
+            users_by_roles (dict): Format: {"roles/role_id": ["user:user_id", "serviceAccount:sa_id"]}
+        """
+        policy = policy_pb2.Policy()
+        for role, members in users_by_roles.items():
+            binding = policy.bindings.add()
+            binding.role = role
+            binding.members.extend(members)
+        policy.etag = self.new_etag()
+        with self.__lock:
+            self.__policies[resource] = policy
+
+    def read_policy(self, resource):
+        """Read copy of project IAM policy.
+
+        Args:
+            resource (string): Resource name
+
+        Returns:
+            google.iam.v1.policy_pb2.Policy: copy of the policy
+        """
+        with self.__lock:
+            return copy.deepcopy(self.__policies.setdefault(resource, policy_pb2.Policy(etag=self.new_etag())))
+
+    def write_policy(self, resource, policy):
+        """Write project IAM policy if its etag matches the stored one.
+
+        Args:
+            resource (string): Resource name
+            policy (google.iam.v1.policy_pb2.Policy): new policy
+
+        Raises:
+            google.api_core.exceptions.Aborted: Raised if etag of the policy does not match (concurrent change).
+
+        Returns:
+            google.iam.v1.policy_pb2.Policy: copy of the stored policy with new etag
+        """
+        new_etag = self.new_etag()
+        with self.__lock:
+            current = self.__policies.get(resource)
+            if current is not None and policy.etag and policy.etag != current.etag:
+                raise Aborted("There were concurrent policy changes. Please retry the whole read-modify-write with exponential backoff.")
+            stored = copy.deepcopy(policy)
+            stored.etag = new_etag
+            self.__policies[resource] = stored
+            return copy.deepcopy(stored)
+
+
+    def bucket(self, name):
+        """Retrieve Cloud Storage bucket, shared by all clients of the backend.
+
+        Args:
+            name (string): bucket name
+
+        Returns:
+            FakeBucket: bucket
+        """
+        with self.__lock:
+            return self.__buckets.setdefault(name, FakeBucket(self, name))
+
+
+class FakeBucket:
+    """Fake Cloud Storage Bucket Class
+
+    Objects are kept in memory with generation numbers, so writes and deletes with `if_generation_match`
+    behave as in Cloud Storage (0 - object must not exist).
+    """
+
+    def __init__(self, backend, name):
+        """Fake Cloud Storage Bucket Class Constructor
+
+        Args:
+            backend (FakeBackend): backend counting the calls
+            name (string): bucket name
+        """
+        self.name = name
+        self.backend = backend
+        # {object name: (generation, data)}
+        self.objects = {}
+        self.generations = itertools.count(1)
+        self.lock = threading.Lock()
+
+    def blob(self, name):
+        return FakeBlob(self, name)
+
+    def get_blob(self, name):
+        self.backend.call("storage.objects.get")
+        with self.lock:
+            stored = self.objects.get(name)
+        return None if stored is None else FakeBlob(self, name, generation=stored[0])
+
+
+class FakeBlob:
+    """Fake Cloud Storage Object Class"""
+
+    def __init__(self, bucket, name, generation=None):
+        self.__bucket = bucket
+        self.name = name
+        self.generation = generation
+
+    def __check(self, if_generation_match):
+        """Check generation precondition. Bucket lock must be held."""
+        current = self.__bucket.objects.get(self.name, (0, None))[0]
+        if if_generation_match is not None and if_generation_match != current:
+            raise PreconditionFailed(f"Generation of {self.name} is {current}, not {if_generation_match}.")
+
+    def upload_from_string(self, data, content_type=None, if_generation_match=None):
+        self.__bucket.backend.call("storage.objects.insert")
+        with self.__bucket.lock:
+            self.__check(if_generation_match)
+            self.generation = next(self.__bucket.generations)
+            self.__bucket.objects[self.name] = (self.generation, data.encode() if isinstance(data, str) else data)
+
+    def download_as_bytes(self, if_generation_match=None):
+        self.__bucket.backend.call("storage.objects.get")
+        with self.__bucket.lock:
+            if self.name not in self.__bucket.objects:
+                raise NotFound(f"Object {self.name} does not exist.")
+            self.__check(if_generation_match)
+            return self.__bucket.objects[self.name][1]
+
+    def delete(self, if_generation_match=None):
+        self.__bucket.backend.call("storage.objects.delete")
+        with self.__bucket.lock:
+            if self.name not in self.__bucket.objects:
+                raise NotFound(f"Object {self.name} does not exist.")
+            self.__check(if_generation_match)
+            del self.__bucket.objects[self.name]
+
+
+class FakeProjectsClient:
+    """Fake Resource Manager Projects Client Class"""
+
+    class _Transport:
+        def close(self):
+            pass
+
+    def __init__(self, backend):
+        """Fake Resource Manager Projects Client Class Constructor
+
+        Args:
+            backend (FakeBackend): backend holding the policies
+        """
+        self.__backend = backend
+        self.transport = self._Transport()
+
+    def get_iam_policy(self, request):
+        self.__backend.call("get_iam_policy")
+        return self.__backend.read_policy(request["resource"])
+
+    def set_iam_policy(self, request):
+        self.__backend.call("set_iam_policy")
+        return self.__backend.write_policy(request["resource"], request["policy"])
+
+
+class _FakeRequest:
+    """Fake googleapiclient.http.HttpRequest"""
+
+    def __init__(self, backend, rpc, function, **kwargs):
+        self.backend = backend
+        self.rpc = rpc
+        self.function = function
+        self.kwargs = kwargs
+
+    def execute(self):
+        self.backend.call(self.rpc)
+        return self.function(**self.kwargs)
+
+
+class _FakeBatchRequest:
+    """Fake googleapiclient.http.BatchHttpRequest"""
+
+    def __init__(self, backend, callback):
+        self.__backend = backend
+        self.__callback = callback
+        self.__requests = []
+
+    def add(self, request, request_id):
+        self.__requests.append((request_id, request))
+
+    def execute(self):
+        self.__backend.call("batch")
+        for request_id, request in self.__requests:
+            try:
+                response = request.function(**request.kwargs)
+            except Exception as e:
+                self.__callback(request_id, None, e)
+            else:
+                self.__callback(request_id, response, None)
+
+
+class FakeRolesResource:
+    """Fake IAM `roles()` discovery resource"""
+
+    def __init__(self, backend):
+        self.__backend = backend
+
+    def __list_page(self, view=None, pageSize=300, pageToken=None):
+        names = sorted(self.__backend.roles)
+        start = int(pageToken or 0)
+        roles = [dict(self.__backend.roles[name]) for name in names[start:start + pageSize]]
+        if view != "FULL":
+            for role in roles:
+                role.pop("includedPermissions", None)
+        response = {"roles": roles}
+        if start + pageSize < len(names):
+            response["nextPageToken"] = str(start + pageSize)
+        return response
+
+    def __get(self, name):
+        if name not in self.__backend.roles:
+            raise KeyError(f"Role {name} not found.")
+        return dict(self.__backend.roles[name])
+
+    def list(self, view=None, pageSize=300, pageToken=None):
+        return _FakeRequest(self.__backend, "roles.list", self.__list_page, view=view, pageSize=pageSize, pageToken=pageToken)
+
+    def list_next(self, previous_request, previous_response):
+        if "nextPageToken" not in previous_response:
+            return None
+        kwargs = dict(previous_request.kwargs, pageToken=previous_response["nextPageToken"])
+        return _FakeRequest(self.__backend, "roles.list", self.__list_page, **kwargs)
+
+    def get(self, name):
+        return _FakeRequest(self.__backend, "roles.get", self.__get, name=name)
+
+
+class FakeIamService:
+    """Fake IAM discovery service"""
+
+    def __init__(self, backend):
+        self.__backend = backend
+
+    def roles(self):
+        return FakeRolesResource(self.__backend)
+
+    def new_batch_http_request(self, callback=None):
+        return _FakeBatchRequest(self.__backend, callback)
+
+    def close(self):
+        pass
+
+
+class FakeClients:
+    """Fake Google Cloud Platform Clients Class
+
+    Drop-in replacement of `clients.Clients` serving all calls from FakeBackend.
+    Retries use the real retry policy with delays scaled down to the backend latency.
+    """
+
+    def __init__(self, backend, logger=None):
+        """Fake Google Cloud Platform Clients Class Constructor
+
+        Args:
+            backend (FakeBackend): backend serving all calls
+            logger (logging.Logger): logger
+        """
+        self.credentials = None
+        self.stats = RpcStats()
+        self.retry_policy = RetryPolicy(logger=logger or logging.getLogger(__name__), stats=self.stats,
+                                        initial_delay=max(backend.latency, 0.001), max_delay=max(backend.latency, 0.001) * 32)
+        self.__set_policy_limiters = {}
+        self.__backend = backend
+        self.projects_client = FakeProjectsClient(backend)
+        self.iam_service = FakeIamService(backend)
+
+    def storage_bucket(self, bucket_name):
+        return self.__backend.bucket(bucket_name)
+
+    def set_policy_limiter(self, project_id):
+        return self.__set_policy_limiters.setdefault(project_id, TokenBucket())
+
+    def close(self):
+        pass
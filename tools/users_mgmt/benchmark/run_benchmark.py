@@ -0,0 +1,294 @@
+# Copyright (c) 2024-2025 Accenture, All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+run_benchmark.py
+
+Benchmark of the users_mgmt tool run against in-process fake GCP backend (see fake_gcp.py).
+For each size of synthetic IAM policy it measures wall time and number of calls of each RPC type for:
+--check, --users, --backup and an operations file, and for CONCURRENT_RUNS runs applying parts of --users configuration
+at the same time: without locks (etag conflicts) and with project lock in queue-and-merge mode.
+Script takes input parameter:
+--sizes (-s) - Comma separated numbers of users in synthetic policies.
+--latency (-lt) - Time (in seconds) each fake call takes.
+--quota_error_rate (-q) - Probability (0-1) of fake call failing with quota error.
+--horizon_roles (-hr) - Path to JSON file with Horizon roles mapping.
+--output (-out) - Directory to store benchmark results.
+
+Author: Accenture
+Date: October 2026
+"""
+import os
+import sys
+import json
+import time
+import random
+import logging
+import argparse
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from fake_gcp import FakeBackend, FakeClients
+from operations import Operation
+from project_lock import ProjectLock
+from roles_mgmt import RolesMgmt
+
+
+SIZES = "100,1000,5000,20000"
+HORIZON_ROLES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "horizon_roles.json")
+OUTPUT_DIR = "output"
+PROJECT_ID = "benchmark-project"
+EXEC_USER_ID = "admin@example.com"
+CHANGED_USERS_RATIO = 0.1
+FILLER_ROLES_COUNT = 1500
+CONCURRENT_RUNS = 8
+
+
+def synthetic_roles_catalog(horizon_roles):
+    """Build synthetic GCP roles catalog.
+
+    Args:
+        horizon_roles (list): Horizon roles mapping
+
+    Returns:
+        list: GCP roles definitions
+    """
+
+    names = {gcp_role for hr in horizon_roles for gcp_role in hr["gcp_roles"]}
+    names.update(f"roles/filler.role{i}" for i in range(FILLER_ROLES_COUNT))
+    return [{"name": name, "title": name, "description": f"Synthetic {name}", "stage": "GA", "etag": "BwY=",
+             "includedPermissions": [f"{name[6:]}.permission{i}" for i in range(20)]} for name in sorted(names)]
+
+
+def synthetic_configuration(size, horizon_roles, rnd):
+    """Build synthetic users configuration and IAM policy.
+
+    Args:
+        size (int): number of users
+        horizon_roles (list): Horizon roles mapping
+        rnd (random.Random): random generator
+
+    Returns:
+        tuple (list, dict, dict): users file content, policy matching it ({role: [members]}) and policy
+                                  where CHANGED_USERS_RATIO of users have different roles.
+    """
+
+    names = [hr["name"] for hr in horizon_roles]
+    gcp_roles = {hr["name"]: hr["gcp_roles"] for hr in horizon_roles}
+    users_conf = []
+    matching_policy = {}
+    drifted_policy = {}
+
+    for i in range(size):
+        user_id = f"user{i}@example.com"
+        user_horizon_roles = [rnd.choice(names)]
+        users_conf.append({"user": user_id, "horizon_roles": user_horizon_roles})
+        roles = {role for hr in user_horizon_roles for role in gcp_roles[hr]}
+        drifted_roles = {rnd.choice([role for hr in names for role in gcp_roles[hr]])} if rnd.random() < CHANGED_USERS_RATIO else roles
+        for role in roles:
+            matching_policy.setdefault(role, []).append(f"user:{user_id}")
+        for role in drifted_roles:
+            drifted_policy.setdefault(role, []).append(f"user:{user_id}")
+
+    for policy in (matching_policy, drifted_policy):
+        policy.setdefault("roles/owner", []).extend([f"user:{EXEC_USER_ID}", "serviceAccount:sa@example.iam.gserviceaccount.com"])
+
+    return users_conf, matching_policy, drifted_policy
+
+
+def synthetic_operations(size, rnd):
+    """Build synthetic operations file content with mixed reads and writes.
+
+    Args:
+        size (int): number of users in the policy
+        rnd (random.Random): random generator
+
+    Returns:
+        list: operations
+    """
+
+    operations = []
+    for i in range(max(size // 10, 10)):
+        user_id = f"user{rnd.randrange(size)}@example.com"
+        operations.append(rnd.choice([
+            {"operation": "GET_USER", "user": user_id},
+            {"operation": "SET_ROLE_TO_USER", "user": user_id, "role": "viewer"},
+            {"operation": "DELETE_ROLE_FROM_USER", "user": user_id, "role": "viewer"},
+            {"operation": "GET_ROLE_INFO", "role": f"filler.role{rnd.randrange(FILLER_ROLES_COUNT)}"},
+            {"operation": "GET_ROLES_WITH_USERS", "roles": ["viewer", "editor"]},
+        ]))
+    return operations
+
+
+def run_scenario(name, size, backend, clients, function, logger):
+    """Run single scenario and measure it.
+
+    Args:
+        name (string): scenario name
+        size (int): number of users in the policy
+        backend (fake_gcp.FakeBackend): backend used by the scenario
+        clients (fake_gcp.FakeClients): clients used by the scenario
+        function (function): scenario to run
+        logger (logging.Logger): logger
+
+    Returns:
+        dict: measurement. Format:
+                {"scenario", "size", "wall_time_s", "rpc_counts", "retries", "error"}
+    """
+
+    error = None
+    start_time = time.perf_counter()
+    try:
+        function()
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    wall_time = time.perf_counter() - start_time
+
+    result = {"scenario": name, "size": size, "wall_time_s": round(wall_time, 4),
+              "rpc_counts": dict(backend.rpc_counts), "retries": clients.stats.retries(), "error": error}
+    logger.info(f"{name:<12} {size:>7} users {wall_time:>9.3f}s  rpc: {dict(backend.rpc_counts)}  retries: {result['retries']}"
+                + (f"  ERROR: {error}" if error else ""))
+    return result
+
+
+def run_benchmark(sizes, horizon_roles_file, latency, quota_error_rate, output_dir, logger):
+    """Run all scenarios for all sizes.
+
+    Args:
+        sizes (list): numbers of users in synthetic policies
+        horizon_roles_file (string): Path to JSON file with Horizon roles mapping
+        latency (float): Time (in seconds) each fake call takes
+        quota_error_rate (float): Probability (0-1) of fake call failing with quota error
+        output_dir (string): Directory to store benchmark results
+        logger (logging.Logger): logger
+
+    Returns:
+        list: measurements
+    """
+
+    with open(horizon_roles_file, "r") as file:
+        horizon_roles = json.load(file)
+    roles_catalog = synthetic_roles_catalog(horizon_roles)
+    resource = f"projects/{PROJECT_ID}"
+
+    # Tool's own logs are not measured
+    tool_logger = logging.getLogger("benchmark.tool")
+    tool_logger.setLevel(logging.CRITICAL)
+
+    results = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        for size in sizes:
+            rnd = random.Random(size)
+            users_conf, matching_policy, drifted_policy = synthetic_configuration(size, horizon_roles, rnd)
+            users_file = os.path.join(work_dir, f"users_{size}.json")
+            operations_file = os.path.join(work_dir, f"operations_{size}.json")
+            with open(users_file, "w") as file:
+                json.dump(users_conf, file)
+            with open(operations_file, "w") as file:
+                json.dump(synthetic_operations(size, rnd), file)
+
+            def scenario(name, policy, function):
+                backend = FakeBackend(roles=roles_catalog, latency=latency, quota_error_rate=quota_error_rate, seed=size)
+                backend.set_policy(resource, policy)
+                clients = FakeClients(backend, logger=tool_logger)
+                operation_mgmt = Operation(clients=clients, project_id=PROJECT_ID, logger=tool_logger,
+                                           output_dir=os.path.join(work_dir, f"{name}_{size}"), exec_user_id=EXEC_USER_ID)
+                roles_mgmt = RolesMgmt(operation_manager=operation_mgmt, logger=tool_logger, exec_user_id=EXEC_USER_ID)
+                roles_mgmt.horizon_roles_mgmt(horizon_roles_file_path=horizon_roles_file)
+                results.append(run_scenario(name, size, backend, clients, lambda: function(operation_mgmt, roles_mgmt), logger))
+
+            scenario("backup", drifted_policy,
+                     lambda op, rm: op.backup())
+            scenario("check", matching_policy,
+                     lambda op, rm: rm.check_users_configurations(users_list_file_path=users_file))
+            scenario("users", drifted_policy,
+                     lambda op, rm: rm.users_mgmt(users_list_file_path=users_file, force_overwrite=False))
+            scenario("users_force", drifted_policy,
+                     lambda op, rm: rm.users_mgmt(users_list_file_path=users_file, force_overwrite=True))
+            scenario("operations", drifted_policy,
+                     lambda op, rm: op.retrieve_operations_list_from_json(operations_file_path=operations_file))
+            scenario("permissions", drifted_policy,
+                     lambda op, rm: op.operations_handler("GET_USERS_WITH_PERMISSION", permission="viewer.permission0")[0]
+                     and op.operations_handler("GET_USER_PERMISSIONS", user="*")[0])
+
+            # Each concurrent run applies its own part of the configuration
+            part_files = []
+            for run in range(CONCURRENT_RUNS):
+                part_files.append(os.path.join(work_dir, f"users_{size}_part{run}.json"))
+                with open(part_files[-1], "w") as file:
+                    json.dump(users_conf[run::CONCURRENT_RUNS], file)
+
+            def concurrent_scenario(name, use_lock):
+                backend = FakeBackend(roles=roles_catalog, latency=latency, quota_error_rate=quota_error_rate, seed=size)
+                backend.set_policy(resource, drifted_policy)
+                clients = FakeClients(backend, logger=tool_logger)
+                runs = []
+                for run in range(CONCURRENT_RUNS):
+                    project_lock = None
+                    if use_lock:
+                        project_lock = ProjectLock(project_id=PROJECT_ID, logger=tool_logger, lock_dir=os.path.join(work_dir, f"{name}_{size}_locks"),
+                                                   bucket=clients.storage_bucket("locks"), queue_merge=True)
+                    operation_mgmt = Operation(clients=clients, project_id=PROJECT_ID, logger=tool_logger,
+                                               output_dir=os.path.join(work_dir, f"{name}_{size}", str(run)), exec_user_id=EXEC_USER_ID,
+                                               project_lock=project_lock)
+                    roles_mgmt = RolesMgmt(operation_manager=operation_mgmt, logger=tool_logger, exec_user_id=EXEC_USER_ID)
+                    roles_mgmt.horizon_roles_mgmt(horizon_roles_file_path=horizon_roles_file)
+                    runs.append(roles_mgmt)
+
+                def run_all():
+                    with ThreadPoolExecutor(max_workers=CONCURRENT_RUNS) as executor:
+                        statuses = list(executor.map(lambda run: runs[run].users_mgmt(users_list_file_path=part_files[run]),
+                                                     range(CONCURRENT_RUNS)))
+                    if not all(statuses):
+                        raise RuntimeError(f"{statuses.count(False)} of {CONCURRENT_RUNS} runs failed.")
+
+                results.append(run_scenario(name, size, backend, clients, run_all, logger))
+
+            concurrent_scenario("concurrent", use_lock=False)
+            concurrent_scenario("concurrent_lock", use_lock=True)
+
+    output_path = Path(output_dir)
+    output_path.mkdir(parents=True, exist_ok=True)
+    results_path = output_path / "benchmark_results.json"
+    with results_path.open("w", encoding="utf-8") as file:
+        json.dump({"latency_s": latency, "quota_error_rate": quota_error_rate, "results": results}, file, indent=4)
+    logger.info(f"Benchmark results are saved in a file '{results_path}'.")
+
+    return results
+
+
+if __name__ == '__main__':
+
+    logging.basicConfig(format='%(asctime)s - %(levelname)s - %(message)s', level=logging.INFO)
+    benchmark_logger = logging.getLogger("benchmark")
+
+    parser = argparse.ArgumentParser(description="Benchmark of the users_mgmt tool run against fake GCP backend.")
+    parser.add_argument("-s", "--sizes", default=SIZES,
+                        help=f"Comma separated numbers of users in synthetic policies. Default value: {SIZES}")
+    parser.add_argument("-lt", "--latency", type=float, default=0.0,
+                        help="Time (in seconds) each fake call takes. Default value: 0")
+    parser.add_argument("-q", "--quota_error_rate", type=float, default=0.0,
+                        help="Probability (0-1) of fake call failing with quota error. Default value: 0")
+    parser.add_argument("-hr", "--horizon_roles", default=HORIZON_ROLES_FILE,
+                        help=f"Path to json file which contains list of Horizon roles with GCP roles mapping. Default value: {HORIZON_ROLES_FILE}")
+    parser.add_argument("-out", "--output", default=OUTPUT_DIR,
+                        help=f"Directory to store benchmark results. Default value: {OUTPUT_DIR}")
+    arguments = parser.parse_args()
+
+    run_benchmark(sizes=[int(size) for size in arguments.sizes.split(",")], horizon_roles_file=arguments.horizon_roles,
+                  latency=arguments.latency, quota_error_rate=arguments.quota_error_rate,
+                  output_dir=arguments.output, logger=benchmark_logger)
@@ -0,0 +1,225 @@
+# Copyright (c) 2024-2025 Accenture, All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+startup_benchmark.py
+
+Cold-start benchmark of the users_mgmt tool. Every measurement is taken in a fresh Python process:
+- import of the `access_control` module,
+- `access_control.py --help`,
+- first use of each lazily loaded subsystem (Resource Manager client, IAM service built from the bundled
+  discovery document, google.auth, requests),
+- modules with the highest import time (`python -X importtime`).
+Script takes input parameter:
+--runs (-r) - Number of runs of each measurement.
+--output (-out) - Directory to store benchmark results.
+
+Author: Accenture
+Date: October 2026
+"""
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import statistics
+import subprocess
+from pathlib import Path
+
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+RUNS = 10
+OUTPUT_DIR = "output"
+TOP_IMPORTS = 15
+
+# Snippets measured in fresh processes. Each prints time (in seconds) its measured part took.
+SNIPPETS = {
+    "import access_control": "import access_control",
+    "resource manager client": "from google.cloud import resourcemanager_v3",
+    "iam service (bundled discovery document)":
+        "from googleapiclient import discovery, discovery_cache\n"
+        "discovery.build_from_document(discovery_cache.get_static_doc(serviceName='iam', version='v1'))",
+    "google.auth": "import google.auth\nimport google.auth.transport.requests",
+    "requests": "import requests",
+}
+
+
+def timed_snippet(code):
+    """Wrap code, so the process prints time its execution took.
+
+    Args:
+        code (string): Python code
+
+    Returns:
+        string: Python code
+    """
+    body = "\n".join(f"    {line}" for line in code.splitlines())
+    return f"import time\n_start = time.perf_counter()\nif True:\n{body}\nprint(time.perf_counter() - _start)"
+
+
+def run_python(args):
+    """Run Python in a fresh process with the tool sources on the path.
+
+    Args:
+        args (list): Python arguments
+
+    Returns:
+        tuple (subprocess.CompletedProcess, float): finished process and its wall time in seconds.
+    """
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [SRC_DIR, os.environ.get("PYTHONPATH")])))
+    start_time = time.perf_counter()
+    process = subprocess.run([sys.executable, *args], capture_output=True, text=True, env=env)
+    return process, time.perf_counter() - start_time
+
+
+def summary(values):
+    """Summarize measurements.
+
+    Args:
+        values (list): measured times in seconds
+
+    Returns:
+        dict: Format:
+                {"runs", "min_ms", "median_ms", "max_ms"}
+    """
+    return {
+        "runs": len(values),
+        "min_ms": round(min(values) * 1000, 2),
+        "median_ms": round(statistics.median(values) * 1000, 2),
+        "max_ms": round(max(values) * 1000, 2),
+    }
+
+
+def measure_snippet(name, code, runs, logger):
+    """Measure code snippet in fresh processes.
+
+    Args:
+        name (string): measurement name
+        code (string): Python code
+        runs (int): number of runs
+        logger (logging.Logger): logger
+
+    Returns:
+        dict: measurement (see `summary`) with "name" and "error" keys.
+    """
+
+    values = []
+    for _ in range(runs):
+        process, _ = run_python(["-c", timed_snippet(code)])
+        if process.returncode != 0:
+            error = process.stderr.strip().splitlines()[-1] if process.stderr.strip() else f"exit code {process.returncode}"
+            logger.warning(f"{name:<42} skipped: {error}")
+            return {"name": name, "error": error}
+        values.append(float(process.stdout.strip().splitlines()[-1]))
+
+    result = {"name": name, **summary(values), "error": None}
+    logger.info(f"{name:<42} median {result['median_ms']:>9.2f}ms  (min {result['min_ms']}ms, max {result['max_ms']}ms)")
+    return result
+
+
+def measure_help(runs, logger):
+    """Measure wall time of `access_control.py --help` (interpreter start included).
+
+    Args:
+        runs (int): number of runs
+        logger (logging.Logger): logger
+
+    Returns:
+        dict: measurement (see `summary`) with "name" and "error" keys.
+    """
+
+    name = "access_control.py --help (wall time)"
+    values = []
+    for _ in range(runs):
+        process, wall_time = run_python([os.path.join(SRC_DIR, "access_control.py"), "--help"])
+        if process.returncode != 0:
+            error = process.stderr.strip().splitlines()[-1] if process.stderr.strip() else f"exit code {process.returncode}"
+            logger.warning(f"{name:<42} skipped: {error}")
+            return {"name": name, "error": error}
+        values.append(wall_time)
+
+    result = {"name": name, **summary(values), "error": None}
+    logger.info(f"{name:<42} median {result['median_ms']:>9.2f}ms  (min {result['min_ms']}ms, max {result['max_ms']}ms)")
+    return result
+
+
+def top_imports(logger):
+    """Find modules with the highest cumulative import time when `access_control` is imported.
+
+    Args:
+        logger (logging.Logger): logger
+
+    Returns:
+        list: Format:
+                [{"module", "cumulative_ms"}]
+    """
+
+    process, _ = run_python(["-X", "importtime", "-c", "import access_control"])
+    imports = []
+    for line in process.stderr.splitlines():
+        # Format: "import time: self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = (part.strip() for part in line.split(":", 1)[1].split("|"))
+        imports.append({"module": module, "cumulative_ms": round(int(cumulative) / 1000, 2)})
+
+    imports.sort(key=lambda entry: entry["cumulative_ms"], reverse=True)
+    for entry in imports[:TOP_IMPORTS]:
+        logger.debug(f"import {entry['module']:<50} {entry['cumulative_ms']:>9.2f}ms")
+    return imports[:TOP_IMPORTS]
+
+
+def run_startup_benchmark(runs, output_dir, logger):
+    """Run all measurements.
+
+    Args:
+        runs (int): number of runs of each measurement
+        output_dir (string): Path to directory where to store results
+        logger (logging.Logger): logger
+
+    Returns:
+        dict: results. Format:
+                {"python", "measurements": [...], "top_imports": [...]}
+    """
+
+    results = {
+        "python": sys.version.split()[0],
+        "measurements": [measure_help(runs, logger)] + [measure_snippet(name, code, runs, logger) for name, code in SNIPPETS.items()],
+        "top_imports": top_imports(logger),
+    }
+
+    output_path = Path(output_dir)
+    output_path.mkdir(parents=True, exist_ok=True)
+    results_path = output_path / "startup_results.json"
+    with results_path.open("w", encoding="utf-8") as file:
+        json.dump(results, file, indent=4)
+    logger.info(f"Startup benchmark results are saved in a file '{results_path}'.")
+
+    return results
+
+
+if __name__ == '__main__':
+
+    logging.basicConfig(format='%(asctime)s - %(levelname)s - %(message)s', level=logging.INFO)
+    benchmark_logger = logging.getLogger("benchmark")
+
+    parser = argparse.ArgumentParser(description="Cold-start benchmark of the users_mgmt tool.")
+    parser.add_argument("-r", "--runs", type=int, default=RUNS,
+                        help=f"Number of runs of each measurement. Default value: {RUNS}")
+    parser.add_argument("-out", "--output", default=OUTPUT_DIR,
+                        help=f"Directory to store benchmark results. Default value: {OUTPUT_DIR}")
+    arguments = parser.parse_args()
+
+    run_startup_benchmark(runs=arguments.runs, output_dir=arguments.output, logger=benchmark_logger)
@@ -18,37 +18,96 @@ access_control.py
 
 Access control script for a Platform Administrator.
 Script takes input parameter:
+--project (-p) - Project id, comma separated list of projects ids or path to a file with projects ids (one per line).
+                 Operations for many projects are executed concurrently.
+--workers (-w) - Maximal number of projects handled at the same time.
 --operations (-op) - parameter requires path to JSON file which contains list of operations that shall be performed.
 --horizon_roles (-hr) -  parameter requires path to JSON file which contains list of Horizon roles with GCP roles mapping.
 --users  (-u) - parameter requires path to JSON file which contains list of users and Horizon roles assigned to them that they shall have.
                 It is also required to provide parameter --horizon_roles.
 --force  (-f) - used for users' roles mapping. If flag is set than user's roles will be overwritten.
                 If flag is not set roles will be added to user with no interference to their existing roles.
+--plan  (-pl) - used for users' roles mapping. If flag is set than planned changes are only logged and not applied.
+--reconcile (-rc) - Flag to keep users' roles reconciled with configuration provided in parameter --users until the script is stopped.
+                    Every interval IAM policy is polled and the plan is computed only if the policy or configuration files changed.
+--interval (-i) - Time (in seconds) between reconciliation cycles.
+--max_cycles (-mc) - Number of reconciliation cycles after which the script stops. 0 - run until stopped.
 --check  (-c) - parameter requires path to JSON file which contains list of users and mapped Horizon roles (as in parameter --users).
                 Performs a check and compares configuration in provided JSON file with Horizon roles mapping and existing configuration in Google Cloud Platform.
                 It is also required to provide parameter --horizon_roles.
---backup (-bu) - Flag to create a backup json file which contains list of users and gcp roles assigned to them.
+--backup (-bu) - Flag to store backup of users and gcp roles assigned to them. Backups are stored incrementally:
+                 full snapshot followed by compressed deltas between runs.
+--restore_backup (-rb) - Reconstruct backup from given point in time (ISO 8601 date/time, UNIX timestamp or `latest`)
+                         and save it in a json file. IAM policy is not changed.
+--offline (-of) - Serve read operations (GET_*, --check, --users with --plan) from a saved snapshot, without authentication
+                  and without calls to GCP. Accepted values: path to JSON file with users' roles or IAM policy,
+                  `latest` or point in time (ISO 8601 date/time, UNIX timestamp) of a snapshot from the history store or backups.
+--format (-fmt) - Format of operations' output files: `json` (indented, default), `compact` (JSON without whitespace) or `jsonl` (one record per line).
+--gzip (-gz) - Flag to compress operations' output files with gzip.
+--lock_dir (-ld) - Directory with lock files (default: `locks` in the output directory). IAM policy commits of all runs sharing it are serialized per project.
+--lock_bucket (-lb) - Cloud Storage bucket where lock objects are kept, so commits are serialized also between machines.
+--lock_wait (-lw) - Maximal time (in seconds) to wait for the project's lock.
+--queue_merge (-qm) - Flag to queue changes for the run holding the project's lock instead of waiting for it.
+                      The holder merges queued changes into its own IAM policy write.
+--no_lock (-nl) - Flag to commit IAM policy changes without taking the project's lock.
+--roles_ttl (-rt) - Time (in seconds) after which cached catalog of GCP roles is fetched again.
+--refresh_roles (-rr) - Flag to fetch catalog of GCP roles again, even if the cached one is still valid.
+--refresh_session (-rs) - Flag to ignore cached authentication session and run full authentication.
+--profile (-pr) - Flag to profile handling of each argument with cProfile. Profiles are stored in the output directory.
+--log (-l) - Level of logging information: DEBUG, INFO, WARNING or ERROR.
+--log_json (-lj) - Flag to write LOG.log records as JSON lines carrying operation id, user, role and elapsed time of operations.
+
+Logs are written by a background thread to the console and to LOG.log, which is rotated by size (previous runs are kept).
+
+Number, latency (p50/p95), size, errors and retries of all calls to GCP (and gcloud CLI) are saved in Performance_report.json
+in the output directory at the end of every run.
 
 Author: Accenture
 Date: March 2025
 """
 import os
 import sys
+import json
+import time
+import signal
 import argparse
+import cProfile
 import subprocess
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 from enum import Enum, auto
-import google.auth
-from googleapiclient import discovery
-import requests
 
+from clients import Clients
 from operations import Operation
+from project_lock import ProjectLock, DEFAULT_LOCK_WAIT, LOCK_DIRNAME
+from reconciler import Reconciler, DEFAULT_INTERVAL
+from result_sink import ResultSink
 from roles_mgmt import RolesMgmt
+from roles_catalog import CACHE_DIR, DEFAULT_TTL
+from rpc_stats import RpcStats
+from session_cache import SessionCache, SESSION_FILENAME
+from structured_logging import AsyncLogging, operation_context
 
 
 PROJECT_ID = "sdva-2108202401"
+PROJECTS_IDS = [PROJECT_ID]
+MAX_WORKERS = 4
 CREDENTIALS_FILENAME = "application_default_credentials.json"
 OUTPUT_DIR = "output"
+ROLES_CACHE_TTL = DEFAULT_TTL
+PROFILE = False
+REFRESH_SESSION = False
+RECONCILE_INTERVAL = DEFAULT_INTERVAL
+LOCK_DIR = None  # `locks` directory in OUTPUT_DIR, if not given
+LOCK_WAIT = DEFAULT_LOCK_WAIT
+# Set on SIGINT/SIGTERM - stops reconciliation of all projects after their current cycle
+STOP_EVENT = threading.Event()
+# Statistics of all calls made by the script, shared by all projects
+RPC_STATS = RpcStats()
+# Background writer of log records, set up by logging_config
+ASYNC_LOGGING = None
 
 class LogLvl(Enum):
     """Log Level Enum
@@ -63,24 +122,16 @@ class LogLvl(Enum):
 def logging_config():
     """Configure logger for the script.
 
+    Records are written to the log file (rotated by size) and to the console by a background thread.
+
     Returns:
         logging.Logger: logger
     """
 
-    log_formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-
-    # File handler to write logs to a file
-    log_file_handler = logging.FileHandler("LOG.log", mode="w")
-    log_file_handler.setFormatter(log_formatter)
-
-    # Console handler to logger.info logs to stdout
-    log_console_handler = logging.StreamHandler()
-    log_console_handler.setFormatter(log_formatter)
-
+    global ASYNC_LOGGING
     logger = logging.getLogger('MyLogger')
     logger.setLevel(LogLvl.INFO.value)
-    logger.addHandler(log_file_handler)
-    logger.addHandler(log_console_handler)
+    ASYNC_LOGGING = AsyncLogging(logger=logger)
 
     return logger
 
@@ -97,21 +148,21 @@ def log_lvl_update(lvl):
         logger.error(f"Incorect log level was provided: {lvl}. Log level will remain {LogLvl(logger.level).name} \nError: {e}")
         
 
-def check_credentials():
-    """Checks if credentials were already created.
+def credentials_file_path():
+    """Find file with credentials.
 
-    It simplifies authentication by checking common locations for credentials, such as:
+    It checks common locations for credentials, such as:
     - The GOOGLE_APPLICATION_CREDENTIALS environment variable (for service account keys).
     - Credentials obtained from gcloud auth application-default login.
 
     Returns:
-        bool: result of check if credentials exist
+        string: path to credentials file or None if credentials were not created yet.
     """
 
     # Check credentials from the GOOGLE_APPLICATION_CREDENTIALS environment variable.
     # GOOGLE_APPLICATION_CREDENTIALS stores path to credentials file.
     if os.environ.get("GOOGLE_APPLICATION_CREDENTIALS"):
-        return True
+        return os.environ.get("GOOGLE_APPLICATION_CREDENTIALS")
     else:
         # Check credentials from the Cloud SDK.
         # Check if the path is explicitly set. If yes, check if credentials are stored in given path.
@@ -119,7 +170,7 @@ def check_credentials():
         if env_var:
             credentials_file_path = os.path.join(env_var, CREDENTIALS_FILENAME)
             if os.path.isfile(credentials_file_path):
-                return True
+                return credentials_file_path
         else:
             # Check manually (not using environment variable) if credentials files exists.
             if os.name != "nt":
@@ -127,7 +178,7 @@ def check_credentials():
                 credentials_file_path = os.path.join(os.path.expanduser(
                     "~"), ".config", "gcloud", CREDENTIALS_FILENAME)
                 if os.path.isfile(credentials_file_path):
-                    return True
+                    return credentials_file_path
             else:
                 # Check credentials on Windows systems. Config should stored at %APPDATA%/gcloud
                 env_var = os.environ.get("APPDATA")
@@ -135,9 +186,56 @@ def check_credentials():
                     credentials_file_path = os.path.join(
                         env_var, "gcloud", CREDENTIALS_FILENAME)
                     if os.path.isfile(credentials_file_path):
-                        return True
+                        return credentials_file_path
+
+    return None
+
+
+def check_credentials():
+    """Checks if credentials were already created.
+
+    It simplifies authentication by checking common locations for credentials (see `credentials_file_path`).
+
+    Returns:
+        bool: result of check if credentials exist
+    """
+
+    return credentials_file_path() is not None
+
+
+def cached_session_authentication(session_cache):
+    """Authenticate user with cached session.
+
+    Fast path of authentication: if the session saved by a previous run is still valid (same credentials file,
+    same project, access token not expired), credentials are loaded directly from the credentials file
+    and the identity of the user is taken from the session. No subprocess or HTTP call is made;
+    access token is refreshed by the clients at first use.
+
+    Args:
+        session_cache (session_cache.SessionCache): cache of authentication session
+
+    Returns:
+        tuple (google.auth.credentials.Credentials, string): credentials and id of user executing the script,
+                                                             (None, None) if there is no valid session.
+    """
+
+    file_path = credentials_file_path()
+    session = session_cache.load(project_id=PROJECT_ID, fingerprint=SessionCache.fingerprint(file_path))
+    if session is None:
+        return None, None
+
+    import google.auth
+
+    try:
+        credentials, _ = google.auth.load_credentials_from_file(file_path)
+    except google.auth.exceptions.DefaultCredentialsError as e:
+        logger.warning(f"Credentials from cached session cannot be loaded. Running full authentication. \nError: {e}")
+        return None, None
 
-    return False
+    logger.info(f"You are authenticated (cached session valid until {session['expiry']}).")
+    logger.info(f"Project details: project id {session['project_id']}, quota project: {session['quota_project_id']}")
+    logger.info(f"User executing the script: {session['user_id']}")
+    return credentials, session["user_id"]
 
 
 def authentication():
@@ -151,6 +249,8 @@ def authentication():
     If that fails, runs `gcloud auth application-default login --no-browser` command which lets authenticate without access to a web browser.
     Generates a link which should be run on a machine with a web browser and copy the output back in the command line.
 
+    If session saved by a previous run is still valid, all of the above (including gcloud configuration of project
+    and quota project and retrieval of user's identity) is skipped - see `cached_session_authentication`.
 
     Returns:
         tuple (bool, google.auth.credentials.Credentials): operation status (True if operation succeeded) and the current environment's credentials
@@ -161,11 +261,25 @@ def authentication():
     user_id = None
 
     logger.info("------")
+    session_cache = SessionCache(file_path=Path(OUTPUT_DIR) / CACHE_DIR / SESSION_FILENAME, logger=logger)
+    if REFRESH_SESSION:
+        session_cache.clear()
+    else:
+        credentials, user_id = cached_session_authentication(session_cache)
+        if credentials:
+            return True, credentials, user_id
+
+    # Imported only when full authentication is needed
+    import google.auth
+    import google.auth.transport.requests
+    import requests
+
     if check_credentials():
         logger.info("Credentials already exist.")
         try:
             credentials, proj_id = google.auth.default()
-            credentials.refresh(google.auth.transport.requests.Request())
+            with RPC_STATS.track("token_refresh"):
+                credentials.refresh(google.auth.transport.requests.Request())
             return_status = True
         except google.auth.exceptions.DefaultCredentialsError as e:
             logger.critical(f"Credentials missing or invalid. Running login flow. \nError during authentication: {e}")
@@ -175,12 +289,14 @@ def authentication():
     if not credentials:
         logger.info(f"There are no credentials. You will need to log in.")
         try:
-            subprocess.run(["gcloud", "auth", "application-default", "login"], check=True)
+            with RPC_STATS.track("gcloud_login"):
+                subprocess.run(["gcloud", "auth", "application-default", "login"], check=True)
         except subprocess.CalledProcessError as e:
             logger.info("Another try to authenticate.")
             try:
-                result = subprocess.run(
-                    ["gcloud", "auth", "application-default", "login", "--no-launch-browser"], check=True)
+                with RPC_STATS.track("gcloud_login"):
+                    result = subprocess.run(
+                        ["gcloud", "auth", "application-default", "login", "--no-launch-browser"], check=True)
                 result.check_returncode()
             except Exception as e:
                 logger.critical(f"""There were three attempts to authenticate:
@@ -207,27 +323,60 @@ def authentication():
                 logger.critical("There was a problem with authentication. You are not authenticated.")
 
     if credentials:
+        project_configured = False
         try:
-            subprocess.run(["gcloud", "config", "set", "project", PROJECT_ID], check=True)
-            subprocess.run(["gcloud", "auth", "application-default", "set-quota-project", PROJECT_ID], check=True)
+            with RPC_STATS.track("gcloud_config", PROJECT_ID):
+                subprocess.run(["gcloud", "config", "set", "project", PROJECT_ID], check=True)
+            with RPC_STATS.track("gcloud_config", PROJECT_ID):
+                subprocess.run(["gcloud", "auth", "application-default", "set-quota-project", PROJECT_ID], check=True)
+            project_configured = True
         except Exception as e:
             logger.critical("There was a problem when setting project id and quota project id. \nReturned error: \n{e}.")
             
         logger.info(f"Project details: project id {proj_id}, quota project: {credentials.quota_project_id}")
 
         # RETRIEVE ID OF USER EXECUTING THE SCRIPT #
-        credentials.refresh(google.auth.transport.requests.Request())
-        id_info = requests.get(
-            "https://www.googleapis.com/oauth2/v3/tokeninfo",
-            params={"access_token": credentials.token}
-        ).json()
+        with RPC_STATS.track("token_refresh"):
+            credentials.refresh(google.auth.transport.requests.Request())
+        with RPC_STATS.track("tokeninfo") as call:
+            response = requests.get(
+                "https://www.googleapis.com/oauth2/v3/tokeninfo",
+                params={"access_token": credentials.token}
+            )
+            call.bytes = len(response.content)
+        id_info = response.json()
 
         user_id = id_info.get("email")
         logger.info(f"User executing the script: {user_id}")
 
+        if project_configured:
+            # Credentials file is fingerprinted after gcloud configuration, which updates it
+            session_cache.save(user_id=user_id, project_id=PROJECT_ID, quota_project_id=credentials.quota_project_id,
+                               expiry=credentials.expiry, fingerprint=SessionCache.fingerprint(credentials_file_path()))
+
     return return_status, credentials, user_id
 
 
+def parse_projects(project_arg):
+    """Parse projects ids provided with the script.
+
+    Args:
+        project_arg (string): Project id, comma separated list of projects ids or path to a file with projects ids.
+                              In the file each line contains one project id. Empty lines and lines starting with `#` are skipped.
+
+    Returns:
+        list: projects ids without duplicates, in the order they were provided.
+    """
+
+    if os.path.isfile(project_arg):
+        with open(project_arg, "r") as file:
+            projects = [line.strip() for line in file if line.strip() and not line.strip().startswith("#")]
+    else:
+        projects = [project.strip() for project in project_arg.split(",") if project.strip()]
+
+    return list(dict.fromkeys(projects))
+
+
 def script_arguments_project_setup():
     """Retrieve script arguments.
 
@@ -237,11 +386,13 @@ def script_arguments_project_setup():
         argparse.Namespace: Arguments provided with the script
     """
 
-    global PROJECT_ID, OUTPUT_DIR, CREDENTIALS_FILENAME
+    global PROJECT_ID, PROJECTS_IDS, MAX_WORKERS, OUTPUT_DIR, CREDENTIALS_FILENAME, ROLES_CACHE_TTL, PROFILE, REFRESH_SESSION, RECONCILE_INTERVAL, LOCK_DIR, LOCK_WAIT
     parser = argparse.ArgumentParser(
         description="Script for managing access management on GCP level. USe the script with chosen arguments.")
     parser.add_argument("-p", "--project",
-                        help=f"Project id. Default value: {PROJECT_ID}")
+                        help=f"Project id, comma separated list of projects ids or path to a file with projects ids (one per line). Default value: {PROJECT_ID}")
+    parser.add_argument("-w", "--workers", type=int,
+                        help=f"Maximal number of projects handled at the same time. Default value: {MAX_WORKERS}")
     parser.add_argument("-out", "--output",
                         help=f"Directory to store output files. Default value: {OUTPUT_DIR}")
     parser.add_argument("-cr", "--creds",
@@ -254,12 +405,54 @@ def script_arguments_project_setup():
                         help="Path to json file which contains list of users and assigned to them Horizon roles that they shall have.")
     parser.add_argument("-f", "--force", action="store_true",
                         help="Flag used for users' roles mapping. \nIf flag is set than user's roles will be overwritten. \nIf flag is not set roles will be added to user with no interference to their existing roles.")
+    parser.add_argument("-pl", "--plan", action="store_true",
+                        help="Flag used for users' roles mapping. \nIf flag is set than changes required to apply the configuration are only logged (dry run). IAM policy is not changed.")
+    parser.add_argument("-rc", "--reconcile", action="store_true",
+                        help="Flag to keep users' roles reconciled with configuration provided in parameter `--users` until the script is stopped. "
+                             "Every interval IAM policy is polled and only changes are applied. Can be used with `--force` and `--plan` flags.")
+    parser.add_argument("-i", "--interval", type=float,
+                        help=f"Time (in seconds) between reconciliation cycles. Default value: {RECONCILE_INTERVAL}")
+    parser.add_argument("-mc", "--max_cycles", type=int, default=0,
+                        help="Number of reconciliation cycles after which the script stops. Default value: 0 (run until stopped)")
     parser.add_argument("-c", "--check",
                         help="Path to json file which contains list of users and Horizon roles assigned to them. Perform a check and compare configuration in provided Json file with Horizon roles mapping and existing configuration in Google Cloud Platform.")
     parser.add_argument("-bu", "--backup", action="store_true",
-                        help="Flag to create a backup json file which contains list of users and gcp roles assigned to them.")
+                        help="Flag to store backup of users and gcp roles assigned to them. Backups are stored incrementally in the `backups` subdirectory of the output directory.")
+    parser.add_argument("-rb", "--restore_backup",
+                        help="Reconstruct backup from given point in time (ISO 8601 date/time in UTC, UNIX timestamp or `latest`) and save it in a json file. IAM policy is not changed.")
+    parser.add_argument("-of", "--offline",
+                        help="Serve read operations from saved snapshot without calling GCP: path to json file with users' roles or IAM policy, "
+                             "`latest` or point in time (ISO 8601 date/time in UTC, UNIX timestamp) of a snapshot from history or backups.")
+    parser.add_argument("-fmt", "--format", choices=[output_format.value for output_format in ResultSink.Format],
+                        default=ResultSink.Format.JSON.value,
+                        help=f"Format of operations' output files. Default value: {ResultSink.Format.JSON.value}")
+    parser.add_argument("-gz", "--gzip", action="store_true",
+                        help="Flag to compress operations' output files with gzip.")
+    parser.add_argument("-ld", "--lock_dir",
+                        help=f"Directory with lock files serializing IAM policy commits of runs sharing it. "
+                             f"Default value: `{LOCK_DIRNAME}` directory in the output directory")
+    parser.add_argument("-lb", "--lock_bucket",
+                        help="Cloud Storage bucket for lock objects serializing IAM policy commits of runs on all machines. "
+                             "Requires `google-cloud-storage` package.")
+    parser.add_argument("-lw", "--lock_wait", type=float,
+                        help=f"Maximal time (in seconds) to wait for the project's lock. Default value: {LOCK_WAIT}")
+    parser.add_argument("-qm", "--queue_merge", action="store_true",
+                        help="Flag to queue changes for the run holding the project's lock instead of waiting for it. "
+                             "The holder merges them into its own IAM policy write.")
+    parser.add_argument("-nl", "--no_lock", action="store_true",
+                        help="Flag to commit IAM policy changes without taking the project's lock.")
+    parser.add_argument("-rt", "--roles_ttl", type=int,
+                        help=f"Time (in seconds) after which cached catalog of GCP roles is fetched again. Default value: {ROLES_CACHE_TTL}")
+    parser.add_argument("-rr", "--refresh_roles", action="store_true",
+                        help="Flag to fetch catalog of GCP roles again, even if the cached one is still valid.")
+    parser.add_argument("-rs", "--refresh_session", action="store_true",
+                        help="Flag to ignore cached authentication session and run full authentication (including gcloud configuration of project and quota project).")
+    parser.add_argument("-pr", "--profile", action="store_true",
+                        help="Flag to profile handling of each argument with cProfile. Profiles are stored in the output directory as `<argument>.prof` files.")
     parser.add_argument("-l", "--log",
                         help=f"Level of logging information. Possible values: {LogLvl.DEBUG.name}, {LogLvl.INFO.name}, {LogLvl.WARNING.name}, {LogLvl.ERROR.name}")
+    parser.add_argument("-lj", "--log_json", action="store_true",
+                        help="Flag to write log file records as JSON lines with operation id, user, role and elapsed time of operations.")
     arguments = parser.parse_args()
 
     # Check if arguments were provided to the script
@@ -269,9 +462,16 @@ def script_arguments_project_setup():
     else:
         if arguments.log:
             log_lvl_update(lvl=arguments.log)
+
+        if arguments.log_json:
+            ASYNC_LOGGING.use_json()
         
         if arguments.project:
-            PROJECT_ID = arguments.project
+            PROJECTS_IDS = parse_projects(arguments.project)
+            PROJECT_ID = PROJECTS_IDS[0]
+
+        if arguments.workers:
+            MAX_WORKERS = arguments.workers
 
         if arguments.output:
             OUTPUT_DIR = arguments.output
@@ -279,9 +479,95 @@ def script_arguments_project_setup():
         if arguments.creds:
             CREDENTIALS_FILENAME = arguments.creds
 
+        if arguments.roles_ttl is not None:
+            ROLES_CACHE_TTL = arguments.roles_ttl
+
+        PROFILE = arguments.profile
+
+        if arguments.interval is not None:
+            RECONCILE_INTERVAL = arguments.interval
+
+        LOCK_DIR = arguments.lock_dir or str(Path(OUTPUT_DIR) / LOCK_DIRNAME)
+
+        if arguments.lock_wait is not None:
+            LOCK_WAIT = arguments.lock_wait
+        REFRESH_SESSION = arguments.refresh_session
+
     return arguments
 
 
+def profiled(name, output_dir, function, **kwargs):
+    """Call function and profile it with cProfile if profiling was requested.
+
+    Profile is stored in `<output_dir>/<name>.prof` and can be inspected with `python -m pstats`.
+    Only one profiler can be active at a time, so when projects are handled concurrently,
+    arguments which could not be profiled are executed without profiling.
+
+    Args:
+        name (string): name of the profiled step (used as the profile file name)
+        output_dir (string): Path to directory where to store the profile
+        function (function): function to be called
+        **kwargs: arguments of the function
+
+    Returns:
+        Result of the function.
+    """
+
+    if not PROFILE:
+        return function(**kwargs)
+
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError as e:
+        logger.warning(f"Step {name} will not be profiled. \nError: {e}")
+        return function(**kwargs)
+
+    try:
+        return function(**kwargs)
+    finally:
+        profiler.disable()
+        profile_path = Path(output_dir) / f"{name}.prof"
+        profile_path.parent.mkdir(parents=True, exist_ok=True)
+        profiler.dump_stats(profile_path)
+        logger.info(f"Profile of step {name} is saved in a file '{profile_path}'.")
+
+
+def validate_input_files(arguments):
+    """Validate input files before any call to Google Cloud Platform.
+
+    Horizon roles definitions and users' configurations (`--users`, `--check`) are validated locally,
+    so incorrect files reject the whole run before authentication and before any change is made.
+    In offline mode, arguments which change IAM policy are rejected.
+
+    Args:
+        arguments (argparse.Namespace): Arguments provided with the script
+
+    Returns:
+        bool: True if all provided files are correct.
+    """
+
+    if arguments.offline and (arguments.backup or arguments.reconcile or (arguments.users and not arguments.plan)):
+        logger.error("Parameters `--backup`, `--reconcile` and `--users` (without `--plan`) cannot be used in offline mode.")
+        return False
+
+    if not arguments.horizon_roles:
+        return True
+
+    roles_mgmt = RolesMgmt(operation_manager=None, logger=logger, exec_user_id=None)
+    if not roles_mgmt.horizon_roles_mgmt(horizon_roles_file_path=arguments.horizon_roles):
+        return False
+
+    for users_file_path in filter(None, (arguments.users, arguments.check)):
+        try:
+            if roles_mgmt.load_users_configuration(users_list_file_path=users_file_path) is None:
+                return False
+        except (FileNotFoundError, json.decoder.JSONDecodeError):
+            return False
+
+    return True
+
+
 def script_arguments_handler(arguments, operations_management, roles_management):
     """Handler for script arguments
 
@@ -294,26 +580,131 @@ def script_arguments_handler(arguments, operations_management, roles_management)
     """
 
     operation_result = False
+    output_dir = operations_management.out_dir
 
     if arguments.horizon_roles:
-        operation_result = roles_management.horizon_roles_mgmt(horizon_roles_file_path=arguments.horizon_roles)
+        operation_result = profiled("horizon_roles", output_dir, roles_management.horizon_roles_mgmt,
+                                    horizon_roles_file_path=arguments.horizon_roles)
 
     if arguments.backup:
-        logger.info("Backup file will be created")
-        operation_result = operations_management.operations_handler(operations_management.Operations.GET_USER.name, user="*")
+        logger.info("Backup will be created")
+        operation_result = profiled("backup", output_dir, operations_management.backup)
 
-    if arguments.check:
-        roles_management.check_users_configurations(users_list_file_path=arguments.check)
+    if arguments.restore_backup:
+        operation_result = profiled("restore_backup", output_dir, operations_management.restore_backup,
+                                    point_in_time=arguments.restore_backup)
 
-    if arguments.users:
+    if arguments.check:
+        profiled("check", output_dir, roles_management.check_users_configurations, users_list_file_path=arguments.check)
+
+    if arguments.reconcile:
+        if operation_result and arguments.users:
+            reconciler = Reconciler(roles_management=roles_management, operations_management=operations_management,
+                                    horizon_roles_file_path=arguments.horizon_roles, users_file_path=arguments.users, logger=logger,
+                                    interval=RECONCILE_INTERVAL, force_overwrite=arguments.force, dry_run=arguments.plan,
+                                    max_cycles=arguments.max_cycles, stop_event=STOP_EVENT)
+            operation_result = reconciler.run()
+        else:
+            logger.error("To perform reconciliation, parameters `--users` and `--horizon_roles` need to be provided correctly.")
+    elif arguments.users:
         if operation_result:
-            operation_result = roles_management.users_mgmt(users_list_file_path=arguments.users, force_overwrite=arguments.force)
+            operation_result = profiled("users", output_dir, roles_management.users_mgmt,
+                                        users_list_file_path=arguments.users, force_overwrite=arguments.force, dry_run=arguments.plan)
         else:
             logger.error(
                 "To perform users mapping functionality provided in parameter `--users`, parameter `--horizon_roles` neads to be provided correctly.")
 
     if arguments.operations:
-        operations_management.retrieve_operations_list_from_json(operations_file_path=arguments.operations)
+        operation_result = profiled("operations", output_dir, operations_management.retrieve_operations_list_from_json,
+                                    operations_file_path=arguments.operations)
+
+    return operation_result
+
+
+def project_handler(project_id, arguments, clients, user_id, output_dir):
+    """Handle script arguments for a single project.
+
+    Args:
+        project_id (string): project id
+        arguments (argparse.Namespace): Arguments provided with the script
+        clients (clients.Clients): Google Cloud Platform clients shared by all projects
+        user_id (string): Id of user who is executing the script
+        output_dir (string): Path to directory where to store generated, output files of the project
+
+    Returns:
+        dict: result of handling the project. Format:
+                {"project": project_id, "status": bool, "elapsed_s": float, "retries": int, "error": string or None}
+    """
+
+    if threading.current_thread() is not threading.main_thread():
+        threading.current_thread().name = project_id
+    start_time = time.perf_counter()
+    result = {"project": project_id, "status": False, "elapsed_s": None, "retries": 0, "error": None}
+
+    # Structured log records of the project carry its id
+    with operation_context(project=project_id):
+        try:
+            project_lock = None
+            if not (arguments.no_lock or arguments.offline):
+                project_lock = ProjectLock(project_id=project_id, logger=logger, lock_dir=LOCK_DIR,
+                                           bucket=clients.storage_bucket(arguments.lock_bucket) if arguments.lock_bucket else None,
+                                           wait=LOCK_WAIT, queue_merge=arguments.queue_merge)
+            operations_mgmt = Operation(clients=clients, project_id=project_id, logger=logger, output_dir=output_dir, exec_user_id=user_id,
+                                        roles_cache_ttl=ROLES_CACHE_TTL, refresh_roles=arguments.refresh_roles,
+                                        offline_snapshot=arguments.offline, output_format=ResultSink.Format(arguments.format),
+                                        compress_output=arguments.gzip, project_lock=project_lock)
+            roles_mgmt = RolesMgmt(operation_manager=operations_mgmt, logger=logger, exec_user_id=user_id)
+
+            result["status"] = bool(script_arguments_handler(arguments=arguments, operations_management=operations_mgmt, roles_management=roles_mgmt))
+        except Exception as e:
+            logger.error(f"Handling project {project_id} failed. \nError: {e}")
+            result["error"] = str(e)
+
+    result["elapsed_s"] = round(time.perf_counter() - start_time, 3)
+    result["retries"] = clients.stats.retries(project=project_id)
+    return result
+
+
+def projects_handler(arguments, clients, user_id):
+    """Handle script arguments for all provided projects.
+
+    Projects are handled concurrently, at most MAX_WORKERS at the same time. All projects share the same credentials and clients.
+    If more than one project is provided, output files of each project are stored in a separate subdirectory of OUTPUT_DIR.
+
+    Args:
+        arguments (argparse.Namespace): Arguments provided with the script
+        clients (clients.Clients): Google Cloud Platform clients shared by all projects
+        user_id (string): Id of user who is executing the script
+
+    Returns:
+        list: results of handling each project (see `project_handler`).
+    """
+
+    if len(PROJECTS_IDS) == 1:
+        return [project_handler(project_id=PROJECT_ID, arguments=arguments, clients=clients, user_id=user_id, output_dir=OUTPUT_DIR)]
+
+    # Show which project log line belongs to
+    ASYNC_LOGGING.set_text_format('%(asctime)s - %(levelname)s - [%(threadName)s] %(message)s')
+
+    logger.info(f"Handling {len(PROJECTS_IDS)} projects: {', '.join(PROJECTS_IDS)}")
+    # Reconciliation never ends, so every project needs its own worker
+    workers = len(PROJECTS_IDS) if arguments.reconcile else min(MAX_WORKERS, len(PROJECTS_IDS))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(
+            lambda project_id: project_handler(project_id=project_id, arguments=arguments, clients=clients,
+                                               user_id=user_id, output_dir=os.path.join(OUTPUT_DIR, project_id)),
+            PROJECTS_IDS))
+
+    for result in results:
+        logger.info(f"Project {result['project']}: {'success' if result['status'] else 'FAILURE'} ({result['elapsed_s']}s, {result['retries']} retries)")
+
+    summary_path = Path(OUTPUT_DIR) / "Projects_summary.json"
+    summary_path.parent.mkdir(parents=True, exist_ok=True)
+    with summary_path.open("w", encoding="utf-8") as file:
+        json.dump(results, file, indent=4)
+    logger.info(f"Projects summary is saved in a file '{summary_path}'.")
+
+    return results
 
 
 if __name__ == '__main__':
@@ -329,18 +720,30 @@ if __name__ == '__main__':
     logger.info(f"gcloud config dir: {os.environ.get('CLOUDSDK_CONFIG', '~/.config/gcloud')}")
     logger.info("Start script execution")
 
-    if script_arguments:
+    if script_arguments and not validate_input_files(arguments=script_arguments):
+        logger.error("Input files are incorrect. Nothing was done in Google Cloud Platform.")
+    elif script_arguments:
+        if script_arguments.reconcile:
+            # Stop reconciliation gracefully - current cycles are finished and reports are saved
+            for stop_signal in (signal.SIGINT, signal.SIGTERM):
+                signal.signal(stop_signal, lambda signum, frame: STOP_EVENT.set())
+
         # AUTHENTICATION #
-        operation_status, credentials, user_id = authentication()
+        if script_arguments.offline:
+            logger.info("Offline mode. Authentication is skipped and no calls to GCP are made.")
+            operation_status, credentials, user_id = True, None, None
+        else:
+            operation_status, credentials, user_id = authentication()
 
         # HANDLING SCRIPT ARGUMENTS #
         if operation_status:
-            service = discovery.build(serviceName='iam', version='v1', credentials=credentials)
-
-            operations_mgmt = Operation(service=service, project_id=PROJECT_ID, logger=logger, output_dir=OUTPUT_DIR, exec_user_id=user_id)
-            roles_mgmt = RolesMgmt(operation_manager=operations_mgmt, logger=logger, exec_user_id=user_id)
-
-            script_arguments_handler(arguments=script_arguments, operations_management=operations_mgmt, roles_management=roles_mgmt)
+            # Clients are created at first use and shared by all operations
+            clients = Clients(credentials=credentials, logger=logger, stats=RPC_STATS)
+            try:
+                projects_handler(arguments=script_arguments, clients=clients, user_id=user_id)
+            finally:
+                clients.close()
+                RPC_STATS.save(output_dir=OUTPUT_DIR, logger=logger)
 
             logger.info("------")
     logger.info("End script execution")
@@ -0,0 +1,296 @@
+# Copyright (c) 2024-2025 Accenture, All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import base64
+import gzip
+import json
+import os
+import time
+from datetime import datetime, timezone
+from enum import Enum
+from pathlib import Path
+
+
+BACKUP_DIR = "backups"
+MANIFEST_FILENAME = "manifest.json"
+DELTAS_PER_BASE = 24  # with hourly backups a new full snapshot is written once a day
+COMPRESS_LEVEL = 6
+
+
+class BackupStore:
+    """Incremental Backup Store Class
+
+    Keeps history of users' roles as a full base snapshot followed by compressed deltas between consecutive backups.
+    Every entry carries timestamp and etag of the IAM policy it was taken from. After DELTAS_PER_BASE deltas
+    a new base snapshot is written, so reconstructing any point in time reads at most one base and DELTAS_PER_BASE deltas.
+
+    Store layout:
+        manifest.json - list of entries: {"kind", "file", "timestamp", "time", "etag"}
+        base_<time>.json.gz - {user: [role1, role2]}
+        delta_<time>.json.gz - {"add": {user: [role1]}, "remove": {user: [role2]}}
+    """
+
+    def __init__(self, backup_dir, logger, deltas_per_base=DELTAS_PER_BASE):
+        """Incremental Backup Store Class Constructor
+
+        Args:
+            backup_dir (string): Path to directory where backups are stored
+            logger (logging.Logger): logger
+            deltas_per_base (int): Number of deltas after which a new base snapshot is written
+        """
+        self.__dir = Path(backup_dir)
+        self.__log = logger
+        self.__deltas_per_base = deltas_per_base
+        self.__manifest = None
+
+    class Kind(Enum):
+        """Entry Kinds Enum
+
+        Possible kinds of backup entries.
+        """
+        BASE = "base"
+        DELTA = "delta"
+
+    @staticmethod
+    def encode_etag(etag):
+        """Encode policy etag to be stored in JSON.
+
+        Args:
+            etag (bytes or string): IAM policy etag
+
+        Returns:
+            string: etag encoded with base64 (as returned by gcloud) or None.
+        """
+        if isinstance(etag, bytes):
+            return base64.b64encode(etag).decode("ascii")
+        return etag
+
+    @staticmethod
+    def parse_time(point_in_time):
+        """Parse point in time.
+
+        Args:
+            point_in_time (string or float): ISO 8601 date/time (UTC if no offset is given) or UNIX timestamp
+
+        Raises:
+            ValueError: Raised if point in time has incorrect format.
+
+        Returns:
+            float: UNIX timestamp
+        """
+        try:
+            return float(point_in_time)
+        except ValueError:
+            moment = datetime.fromisoformat(point_in_time)
+            if moment.tzinfo is None:
+                moment = moment.replace(tzinfo=timezone.utc)
+            return moment.timestamp()
+
+    def entries(self):
+        """Retrieve all backup entries.
+
+        Returns:
+            list: entries ordered by time. Format:
+                    [{"kind": "base" or "delta", "file": file name, "timestamp": float, "time": ISO 8601 string, "etag": string}]
+        """
+
+        if self.__manifest is None:
+            try:
+                with (self.__dir / MANIFEST_FILENAME).open("r", encoding="utf-8") as file:
+                    self.__manifest = json.load(file)
+            except FileNotFoundError:
+                self.__manifest = []
+        return self.__manifest
+
+    def __save_manifest(self):
+        """Save manifest to disk.
+
+        File is written to a temporary file first and then replaced, so a broken run never leaves a corrupted manifest.
+        """
+
+        manifest_path = self.__dir / MANIFEST_FILENAME
+        tmp_path = manifest_path.with_suffix(".tmp")
+        with tmp_path.open("w", encoding="utf-8") as file:
+            json.dump(self.__manifest, file, indent=4)
+        os.replace(tmp_path, manifest_path)
+
+    def __read(self, entry):
+        """Read data of the entry.
+
+        Args:
+            entry (dict): backup entry
+
+        Returns:
+            dict: base snapshot or delta.
+        """
+        with gzip.open(self.__dir / entry["file"], "rt", encoding="utf-8") as file:
+            return json.load(file)
+
+    def __write(self, kind, timestamp, etag, data):
+        """Write new entry.
+
+        Data file is written before the manifest, so the manifest never points to a missing file.
+
+        Args:
+            kind (BackupStore.Kind): kind of the entry
+            timestamp (float): UNIX timestamp of the backup
+            etag (string): encoded IAM policy etag
+            data (dict): base snapshot or delta
+
+        Returns:
+            dict: written entry.
+        """
+
+        moment = datetime.fromtimestamp(timestamp, tz=timezone.utc)
+        entry = {
+            "kind": kind.value,
+            "file": f"{kind.value}_{moment.strftime('%Y%m%dT%H%M%S%fZ')}.json.gz",
+            "timestamp": timestamp,
+            "time": moment.isoformat(),
+            "etag": etag,
+        }
+
+        self.__dir.mkdir(parents=True, exist_ok=True)
+        with gzip.open(self.__dir / entry["file"], "wt", encoding="utf-8", compresslevel=COMPRESS_LEVEL) as file:
+            json.dump(data, file, separators=(",", ":"))
+
+        self.entries().append(entry)
+        self.__save_manifest()
+        return entry
+
+    @staticmethod
+    def diff(old, new):
+        """Compute delta between two snapshots.
+
+        Args:
+            old (dict): previous snapshot. Format: {user: [role1, role2]}
+            new (dict): current snapshot. Format: {user: [role1, role2]}
+
+        Returns:
+            dict: Format:
+                    {"add": {user: [role1]}, "remove": {user: [role2]}}
+        """
+
+        delta = {"add": {}, "remove": {}}
+        for user in old.keys() | new.keys():
+            old_roles = set(old.get(user, ()))
+            new_roles = set(new.get(user, ()))
+            if new_roles - old_roles:
+                delta["add"][user] = sorted(new_roles - old_roles)
+            if old_roles - new_roles:
+                delta["remove"][user] = sorted(old_roles - new_roles)
+        return delta
+
+    @staticmethod
+    def __apply(state, delta):
+        """Apply delta to snapshot.
+
+        Snapshot is modified in place.
+
+        Args:
+            state (dict): snapshot. Format: {user: set of roles}
+            delta (dict): delta. Format: {"add": {user: [role1]}, "remove": {user: [role2]}}
+        """
+        for user, roles in delta["remove"].items():
+            state[user] = state.get(user, set()) - set(roles)
+            if not state[user]:
+                del state[user]
+        for user, roles in delta["add"].items():
+            state.setdefault(user, set()).update(roles)
+
+    def restore(self, point_in_time=None):
+        """Reconstruct users' roles at given point in time.
+
+        Latest base snapshot taken not later than given time is read and following deltas are applied to it.
+
+        Args:
+            point_in_time (float): UNIX timestamp. If None - the latest backup is reconstructed.
+
+        Returns:
+            tuple (dict, dict): snapshot ({user: [role1, role2]}) and the latest entry it covers.
+                                (None, None) if there is no backup taken before given time.
+        """
+
+        entries = [entry for entry in self.entries() if point_in_time is None or entry["timestamp"] <= point_in_time]
+        base_position = next((i for i in range(len(entries) - 1, -1, -1) if entries[i]["kind"] == self.Kind.BASE.value), None)
+        if base_position is None:
+            return None, None
+
+        state = {user: set(roles) for user, roles in self.__read(entries[base_position]).items()}
+        for entry in entries[base_position + 1:]:
+            self.__apply(state, self.__read(entry))
+
+        return {user: sorted(roles) for user, roles in state.items()}, entries[-1]
+
+    def history(self):
+        """Reconstruct users' roles of every backup, from the oldest one.
+
+        Each entry is read once. Deltas written before the first base snapshot are skipped.
+
+        Yields:
+            tuple (dict, dict): entry and snapshot ({user: [role1, role2]}) it covers.
+        """
+
+        state = None
+        for entry in self.entries():
+            data = self.__read(entry)
+            if entry["kind"] == self.Kind.BASE.value:
+                state = {user: set(roles) for user, roles in data.items()}
+            elif state is None:
+                continue
+            else:
+                self.__apply(state, data)
+            yield entry, {user: sorted(roles) for user, roles in state.items()}
+
+    def save(self, users_roles, etag, timestamp=None):
+        """Store new backup.
+
+        Nothing is written if the policy etag did not change since the previous backup.
+        Otherwise delta against the previous backup is written, or a full base snapshot if there is no base yet
+        or DELTAS_PER_BASE deltas were already written after the last one.
+
+        Args:
+            users_roles (dict): current users' roles. Format: {user: [role1, role2]}
+            etag (bytes or string): etag of IAM policy the roles were read from
+            timestamp (float): UNIX timestamp of the backup. Current time if not given.
+
+        Returns:
+            dict: written entry or None if nothing changed.
+        """
+
+        timestamp = time.time() if timestamp is None else timestamp
+        etag = self.encode_etag(etag)
+        entries = self.entries()
+
+        if entries and etag is not None and entries[-1]["etag"] == etag:
+            self.__log.info(f"IAM policy did not change since backup from {entries[-1]['time']} (etag {etag}). Nothing to store.")
+            return None
+
+        deltas_since_base = 0
+        for entry in reversed(entries):
+            if entry["kind"] == self.Kind.BASE.value:
+                break
+            deltas_since_base += 1
+
+        if not entries or deltas_since_base >= self.__deltas_per_base or deltas_since_base == len(entries):
+            entry = self.__write(self.Kind.BASE, timestamp, etag, users_roles)
+            self.__log.info(f"Full backup of {len(users_roles)} users is saved in '{self.__dir / entry['file']}'.")
+            return entry
+
+        previous, _ = self.restore()
+        delta = self.diff(previous, users_roles)
+        entry = self.__write(self.Kind.DELTA, timestamp, etag, delta)
+        self.__log.info(f"Incremental backup ({len(delta['add'])} users with added roles, {len(delta['remove'])} users with removed roles) "
+                        f"is saved in '{self.__dir / entry['file']}'.")
+        return entry
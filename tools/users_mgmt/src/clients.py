@@ -0,0 +1,148 @@
+# Copyright (c) 2024-2025 Accenture, All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+
+from retry_policy import RetryPolicy, TokenBucket
+from rpc_stats import RpcStats
+
+
+class Clients:
+    """Google Cloud Platform Clients Class
+
+    Owns clients used by the script for the whole process lifetime.
+    Each client (and its channel) is created lazily at first use, reused by all operations
+    and closed once at the end of script execution.
+    Resource Manager client is thread-safe and shared by all threads. IAM service (httplib2 based) is not,
+    so each thread gets its own instance.
+    All calls share one retry policy, and IAM policy writes of each project share one rate limiter.
+    Client libraries are imported at first use of the client, so runs which do not need a client do not pay for loading it.
+    """
+
+    def __init__(self, credentials, logger, stats=None, retry_policy=None):
+        """Google Cloud Platform Clients Class Constructor
+
+        Args:
+            credentials (google.auth.credentials.Credentials): credentials used by all clients
+            logger (logging.Logger): logger
+            stats (rpc_stats.RpcStats): statistics of calls made with the clients. New one is created if not given.
+            retry_policy (retry_policy.RetryPolicy): retry policy of calls made with the clients. Default one is created if not given.
+        """
+        self.credentials = credentials
+        self.stats = stats if stats is not None else RpcStats()
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy(logger=logger, stats=self.stats)
+        self.__set_policy_limiters = {}
+        self.__iam_discovery_document = None
+        self.__log = logger
+        self.__projects_client = None
+        self.__storage_client = None
+        self.__iam_services = []
+        self.__local = threading.local()
+        self.__lock = threading.Lock()
+
+    @property
+    def projects_client(self):
+        """Resource Manager Projects client.
+
+        Returns:
+            google.cloud.resourcemanager_v3.ProjectsClient: client for Resource Manager Projects API
+        """
+        with self.__lock:
+            if self.__projects_client is None:
+                from google.cloud import resourcemanager_v3
+                self.__projects_client = resourcemanager_v3.ProjectsClient(credentials=self.credentials)
+                self.__log.debug("Resource Manager client created.")
+        return self.__projects_client
+
+    @property
+    def iam_service(self):
+        """IAM API service.
+
+        Returns:
+            googleapiclient.discovery.Resource: A Resource object with methods for interacting with the IAM service
+        """
+        iam_service = getattr(self.__local, "iam_service", None)
+        if iam_service is None:
+            from googleapiclient import discovery
+            document = self.__get_iam_discovery_document()
+            if document:
+                iam_service = discovery.build_from_document(document, credentials=self.credentials)
+            else:
+                self.__log.warning("IAM discovery document is not bundled with googleapiclient. It will be fetched from GCP.")
+                iam_service = discovery.build(serviceName='iam', version='v1', credentials=self.credentials, static_discovery=False)
+            self.__local.iam_service = iam_service
+            with self.__lock:
+                self.__iam_services.append(iam_service)
+            self.__log.debug("IAM service created.")
+        return iam_service
+
+    def storage_bucket(self, bucket_name):
+        """Cloud Storage bucket.
+
+        `google-cloud-storage` is needed only by runs which use it (e.g. for locks shared by machines).
+
+        Args:
+            bucket_name (string): bucket name
+
+        Returns:
+            google.cloud.storage.Bucket: bucket (no call is made to get it)
+        """
+        with self.__lock:
+            if self.__storage_client is None:
+                from google.cloud import storage
+                self.__storage_client = storage.Client(credentials=self.credentials)
+                self.__log.debug("Cloud Storage client created.")
+        return self.__storage_client.bucket(bucket_name)
+
+    def set_policy_limiter(self, project_id):
+        """Rate limiter of IAM policy writes of given project.
+
+        Args:
+            project_id (string): project id
+
+        Returns:
+            retry_policy.TokenBucket: rate limiter shared by all writes to the project's IAM policy
+        """
+        with self.__lock:
+            return self.__set_policy_limiters.setdefault(project_id, TokenBucket())
+
+    def __get_iam_discovery_document(self):
+        """IAM API discovery document bundled with googleapiclient.
+
+        Document is read once per process and reused by IAM services of all threads, so building a service needs no network.
+
+        Returns:
+            string: discovery document or None if it is not bundled.
+        """
+        with self.__lock:
+            if self.__iam_discovery_document is None:
+                from googleapiclient import discovery_cache
+                self.__iam_discovery_document = discovery_cache.get_static_doc(serviceName="iam", version="v1") or ""
+        return self.__iam_discovery_document
+
+    def close(self):
+        """Close all created clients and their channels."""
+
+        if self.__projects_client is not None:
+            self.__projects_client.transport.close()
+            self.__projects_client = None
+        if self.__storage_client is not None:
+            self.__storage_client.close()
+            self.__storage_client = None
+        with self.__lock:
+            for iam_service in self.__iam_services:
+                iam_service.close()
+            self.__iam_services = []
+        self.__local = threading.local()
+        self.__log.debug("Clients closed.")
@@ -0,0 +1,113 @@
+# Copyright (c) 2024-2025 Accenture, All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+class DriftReport:
+    """Configuration Drift Report Class
+
+    Complete comparison of users' configuration with users' GCP roles, computed in one pass over one IAM policy snapshot.
+    For every configured user, union of GCP roles of all their Horizon roles is compared with roles they actually have.
+    Users who have roles in the project but are not configured are reported as unknown.
+    """
+
+    def __init__(self):
+        """Configuration Drift Report Class Constructor"""
+        # {user_id: {"missing": [role1], "extra": [role2]}} - only users whose roles differ
+        self.__drifted_users = {}
+        # {user_id: [role1, role2]}
+        self.__unknown_users = {}
+        self.__users_checked = 0
+
+    @classmethod
+    def compute(cls, desired_roles, actual_roles):
+        """Compute drift between desired and actual users' roles.
+
+        Args:
+            desired_roles (dict): Roles users shall have. Format: {user_id: set of roles ids}
+            actual_roles (dict): Roles all users in the project have. Format: {user_id: list of roles ids}
+
+        Returns:
+            DriftReport: computed report.
+        """
+
+        report = cls()
+        report.__users_checked = len(desired_roles)
+
+        for user_id, desired in desired_roles.items():
+            actual = set(actual_roles.get(user_id, ()))
+            if actual != desired:
+                report.__drifted_users[user_id] = {
+                    "missing": sorted(desired - actual),
+                    "extra": sorted(actual - desired),
+                }
+
+        for user_id, roles in actual_roles.items():
+            if user_id not in desired_roles and roles:
+                report.__unknown_users[user_id] = sorted(roles)
+
+        return report
+
+    def matches(self):
+        """Check if configured users have exactly the configured roles.
+
+        Returns:
+            bool: True if no configured user has missing or extra roles.
+        """
+        return not self.__drifted_users
+
+    def to_dict(self):
+        """Retrieve report as dictionary.
+
+        Returns:
+            dict: Format:
+                    {
+                        "match": bool,
+                        "summary": {"users_checked", "users_matching", "users_drifted", "missing_roles", "extra_roles", "unknown_users"},
+                        "drifted_users": {user_id: {"missing": [role1], "extra": [role2]}},
+                        "unknown_users": {user_id: [role1, role2]}
+                    }
+        """
+        return {
+            "match": self.matches(),
+            "summary": {
+                "users_checked": self.__users_checked,
+                "users_matching": self.__users_checked - len(self.__drifted_users),
+                "users_drifted": len(self.__drifted_users),
+                "missing_roles": sum(len(entry["missing"]) for entry in self.__drifted_users.values()),
+                "extra_roles": sum(len(entry["extra"]) for entry in self.__drifted_users.values()),
+                "unknown_users": len(self.__unknown_users),
+            },
+            "drifted_users": self.__drifted_users,
+            "unknown_users": self.__unknown_users,
+        }
+
+    def log(self, logger):
+        """Log the report.
+
+        Args:
+            logger (logging.Logger): logger
+        """
+
+        for user_id, entry in self.__drifted_users.items():
+            for role in entry["missing"]:
+                logger.info(f"Drift: user {user_id} is missing {role}")
+            for role in entry["extra"]:
+                logger.info(f"Drift: user {user_id} has extra {role}")
+        for user_id, roles in self.__unknown_users.items():
+            logger.debug(f"Drift: user {user_id} is not configured and has roles: {roles}")
+
+        summary = self.to_dict()["summary"]
+        logger.info(f"Drift: {summary['users_checked']} users checked, {summary['users_matching']} match, "
+                    f"{summary['users_drifted']} drifted ({summary['missing_roles']} missing roles, {summary['extra_roles']} extra roles), "
+                    f"{summary['unknown_users']} users with roles are not configured.")
@@ -0,0 +1,281 @@
+# Copyright (c) 2024-2025 Accenture, All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import sqlite3
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+from backup_store import BackupStore
+
+
+HISTORY_FILENAME = "history.db"
+BUSY_TIMEOUT = 30  # seconds - projects handled in parallel write to the same database
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    project TEXT NOT NULL,
+    timestamp REAL NOT NULL,
+    etag TEXT,
+    members INTEGER NOT NULL,
+    PRIMARY KEY (project, timestamp)
+);
+CREATE UNIQUE INDEX IF NOT EXISTS snapshots_etag ON snapshots (project, etag);
+CREATE TABLE IF NOT EXISTS memberships (
+    project TEXT NOT NULL,
+    member TEXT NOT NULL,
+    role TEXT NOT NULL,
+    start_time REAL NOT NULL,
+    end_time REAL
+);
+CREATE INDEX IF NOT EXISTS memberships_member ON memberships (project, member, start_time);
+CREATE INDEX IF NOT EXISTS memberships_role ON memberships (project, role, start_time);
+CREATE INDEX IF NOT EXISTS memberships_start ON memberships (project, start_time);
+CREATE INDEX IF NOT EXISTS memberships_end ON memberships (project, end_time);
+"""
+
+
+class HistoryStore:
+    """Policy History Store Class
+
+    Keeps history of users' roles of all projects in a local SQLite database.
+    Every ingested snapshot is keyed by project, timestamp and IAM policy etag. Instead of full copies, the database keeps
+    one row per period in which a member held a role (`start_time` - first snapshot with the role,
+    `end_time` - first snapshot without it, NULL while the role is held), so point-in-time and change queries
+    are answered from indexes, without reading whole snapshots.
+    """
+
+    def __init__(self, db_path, logger):
+        """Policy History Store Class Constructor
+
+        Args:
+            db_path (string): Path to the SQLite database file
+            logger (logging.Logger): logger
+        """
+        self.__db_path = Path(db_path)
+        self.__log = logger
+        self.__schema_ready = False
+
+    @staticmethod
+    def format_time(timestamp):
+        """Format UNIX timestamp.
+
+        Args:
+            timestamp (float): UNIX timestamp or None
+
+        Returns:
+            string: ISO 8601 date/time in UTC or None.
+        """
+        if timestamp is None:
+            return None
+        return datetime.fromtimestamp(timestamp, tz=timezone.utc).isoformat()
+
+    @contextmanager
+    def __connect(self):
+        """Open connection to the database.
+
+        Changes are committed when the block ends without an error and rolled back otherwise.
+
+        Yields:
+            sqlite3.Connection: connection
+        """
+
+        self.__db_path.parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(self.__db_path, timeout=BUSY_TIMEOUT)
+        try:
+            if not self.__schema_ready:
+                connection.executescript(SCHEMA)
+                self.__schema_ready = True
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def snapshots(self, project):
+        """Retrieve snapshots ingested for the project.
+
+        Args:
+            project (string): project id
+
+        Returns:
+            list: snapshots ordered by time. Format:
+                    [{"time", "timestamp", "etag", "members"}]
+        """
+
+        with self.__connect() as connection:
+            rows = connection.execute("SELECT timestamp, etag, members FROM snapshots WHERE project = ? ORDER BY timestamp",
+                                      (project,)).fetchall()
+        return [{"time": self.format_time(timestamp), "timestamp": timestamp, "etag": etag, "members": members}
+                for timestamp, etag, members in rows]
+
+    def ingest(self, project, users_roles, etag, timestamp=None):
+        """Ingest snapshot of users' roles.
+
+        Only differences against the latest snapshot of the project are written.
+        Snapshot is skipped if the etag was already ingested or if it is older than the latest snapshot.
+
+        Args:
+            project (string): project id
+            users_roles (dict): users' roles. Format: {member: [role1, role2]}
+            etag (bytes or string): etag of IAM policy the roles were read from
+            timestamp (float): UNIX timestamp of the snapshot. Current time if not given.
+
+        Returns:
+            bool: True if snapshot was ingested.
+        """
+
+        timestamp = time.time() if timestamp is None else timestamp
+        etag = BackupStore.encode_etag(etag)
+
+        with self.__connect() as connection:
+            if etag is not None and connection.execute("SELECT 1 FROM snapshots WHERE project = ? AND etag = ?",
+                                                       (project, etag)).fetchone():
+                self.__log.debug(f"Snapshot of project {project} with etag {etag} is already in the history.")
+                return False
+
+            latest = connection.execute("SELECT MAX(timestamp) FROM snapshots WHERE project = ?", (project,)).fetchone()[0]
+            if latest is not None and timestamp <= latest:
+                self.__log.warning(f"Snapshot of project {project} from {self.format_time(timestamp)} is not newer than "
+                                   f"the latest one in the history ({self.format_time(latest)}). It is skipped.")
+                return False
+
+            # {(member, role): rowid} - periods are closed by rowid, so each update touches exactly one row
+            held = {(member, role): rowid for rowid, member, role in connection.execute(
+                "SELECT rowid, member, role FROM memberships WHERE project = ? AND end_time IS NULL", (project,))}
+            current = {(member, role) for member, roles in users_roles.items() for role in roles}
+
+            connection.executemany("UPDATE memberships SET end_time = ? WHERE rowid = ?",
+                                   [(timestamp, held[key]) for key in held.keys() - current])
+            connection.executemany(
+                "INSERT INTO memberships (project, member, role, start_time) VALUES (?, ?, ?, ?)",
+                [(project, member, role, timestamp) for member, role in current - held.keys()])
+            connection.execute("INSERT INTO snapshots (project, timestamp, etag, members) VALUES (?, ?, ?, ?)",
+                               (project, timestamp, etag, len(users_roles)))
+
+        self.__log.info(f"Snapshot of project {project} from {self.format_time(timestamp)} is stored in the history "
+                        f"({len(current - held.keys())} roles granted, {len(held.keys() - current)} roles revoked since the previous one).")
+        return True
+
+    def import_backups(self, project, backup_store):
+        """Ingest all backups of the project which are not in the history yet.
+
+        Args:
+            project (string): project id
+            backup_store (backup_store.BackupStore): backup store of the project
+
+        Returns:
+            int: number of ingested backups.
+        """
+
+        latest = max((snapshot["timestamp"] for snapshot in self.snapshots(project)), default=None)
+        ingested = 0
+        for entry, users_roles in backup_store.history():
+            if latest is None or entry["timestamp"] > latest:
+                ingested += self.ingest(project=project, users_roles=users_roles, etag=entry["etag"], timestamp=entry["timestamp"])
+        return ingested
+
+    def state_at(self, project, timestamp=None):
+        """Reconstruct users' roles at given point in time.
+
+        Args:
+            project (string): project id
+            timestamp (float): UNIX timestamp. If None - the latest snapshot is reconstructed.
+
+        Returns:
+            tuple (dict, dict): users' roles ({member: [role1, role2]}) and the latest snapshot taken not later than given time
+                                (see `snapshots`). (None, None) if there is no such snapshot.
+        """
+
+        with self.__connect() as connection:
+            if timestamp is None:
+                snapshot = connection.execute("SELECT timestamp, etag, members FROM snapshots WHERE project = ? "
+                                              "ORDER BY timestamp DESC LIMIT 1", (project,)).fetchone()
+            else:
+                snapshot = connection.execute("SELECT timestamp, etag, members FROM snapshots WHERE project = ? AND timestamp <= ? "
+                                              "ORDER BY timestamp DESC LIMIT 1", (project, timestamp)).fetchone()
+            if snapshot is None:
+                return None, None
+
+            rows = connection.execute("SELECT member, role FROM memberships WHERE project = ? AND start_time <= ? "
+                                      "AND (end_time IS NULL OR end_time > ?) ORDER BY member, role",
+                                      (project, snapshot[0], snapshot[0]))
+            users_roles = {}
+            for member, role in rows:
+                users_roles.setdefault(member, []).append(role)
+
+        return users_roles, {"time": self.format_time(snapshot[0]), "timestamp": snapshot[0], "etag": snapshot[1], "members": snapshot[2]}
+
+    def role_members(self, project, role, timestamp):
+        """Retrieve members who held the role at given point in time.
+
+        Args:
+            project (string): project id
+            role (string): role id (e.g. "roles/editor")
+            timestamp (float): UNIX timestamp
+
+        Returns:
+            list: members, sorted.
+        """
+
+        with self.__connect() as connection:
+            rows = connection.execute("SELECT member FROM memberships WHERE project = ? AND role = ? AND start_time <= ? "
+                                      "AND (end_time IS NULL OR end_time > ?) ORDER BY member",
+                                      (project, role, timestamp, timestamp)).fetchall()
+        return [member for member, in rows]
+
+    def member_history(self, project, member, since=None, until=None):
+        """Retrieve periods in which the member held roles.
+
+        Args:
+            project (string): project id
+            member (string): member (e.g. "user:user@accenture.com")
+            since (float): UNIX timestamp. Only periods not finished before this time are returned.
+            until (float): UNIX timestamp. Only periods started not later than this time are returned.
+
+        Returns:
+            list: periods ordered by start. Format:
+                    [{"role", "from", "to"}] - "to" is None if the role is still held.
+        """
+
+        with self.__connect() as connection:
+            rows = connection.execute("SELECT role, start_time, end_time FROM memberships WHERE project = ? AND member = ? "
+                                      "AND start_time <= ? AND (end_time IS NULL OR end_time > ?) ORDER BY start_time, role",
+                                      (project, member, float("inf") if until is None else until,
+                                       float("-inf") if since is None else since)).fetchall()
+        return [{"role": role, "from": self.format_time(start_time), "to": self.format_time(end_time)}
+                for role, start_time, end_time in rows]
+
+    def changes(self, project, since, until):
+        """Retrieve roles granted and revoked between two points in time.
+
+        Args:
+            project (string): project id
+            since (float): UNIX timestamp (exclusive)
+            until (float): UNIX timestamp (inclusive)
+
+        Returns:
+            list: changes ordered by time. Format:
+                    [{"time", "member", "role", "change": "granted" or "revoked"}]
+        """
+
+        with self.__connect() as connection:
+            rows = connection.execute(
+                "SELECT start_time, member, role, 'granted' FROM memberships WHERE project = ? AND start_time > ? AND start_time <= ? "
+                "UNION ALL "
+                "SELECT end_time, member, role, 'revoked' FROM memberships WHERE project = ? AND end_time > ? AND end_time <= ? "
+                "ORDER BY 1, 2, 3",
+                (project, since, until, project, since, until)).fetchall()
+        return [{"time": self.format_time(moment), "member": member, "role": role, "change": change}
+                for moment, member, role, change in rows]
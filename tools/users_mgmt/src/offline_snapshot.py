@@ -0,0 +1,188 @@
+# Copyright (c) 2024-2025 Accenture, All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+from collections import namedtuple
+from pathlib import Path
+
+from backup_store import BackupStore
+from policy_index import PolicyIndex
+
+
+LATEST = "latest"
+
+# Minimal IAM policy structure - only the fields read by policy_index.PolicyIndex
+Policy = namedtuple("Policy", ["bindings", "etag"])
+Binding = namedtuple("Binding", ["role", "members"])
+
+
+class OfflinePolicySnapshot:
+    """Offline IAM Policy Snapshot Class
+
+    Serves a saved IAM policy in place of `policy_snapshot.PolicySnapshot`, so read operations are answered
+    through the same index without credentials and without calling Google Cloud Platform.
+    The policy is loaded from a file (users' roles as saved by backups and `GET_USER` with "*", or an IAM policy
+    as returned by `gcloud projects get-iam-policy --format=json`) or reconstructed from the history store or backups.
+    Writes are refused.
+    """
+
+    def __init__(self, policy, resource, logger, stats, retry_policy, source):
+        """Offline IAM Policy Snapshot Class Constructor
+
+        Args:
+            policy (offline_snapshot.Policy): saved IAM policy
+            resource (string): Resource name. Format: "projects/<project_id>"
+            logger (logging.Logger): logger
+            stats (rpc_stats.RpcStats): statistics of calls (no calls are made)
+            retry_policy (retry_policy.RetryPolicy): retry policy (not used for calls)
+            source (string): description of the snapshot origin, used in logs
+        """
+        self.resource = resource
+        self.project_id = resource.split("/", 1)[-1]
+        self.stats = stats
+        self.retry_policy = retry_policy
+        self.source = source
+        self.__log = logger
+        self.__policy = policy
+        self.__index = None
+
+    @staticmethod
+    def from_users_roles(users_roles, etag=None):
+        """Build policy from users' roles.
+
+        Args:
+            users_roles (dict): users' roles. Format: {member: [role1, role2]}
+            etag (string): etag of the policy the roles were read from
+
+        Returns:
+            offline_snapshot.Policy: policy
+        """
+
+        members_by_roles = {}
+        for member, roles in users_roles.items():
+            for role in roles:
+                members_by_roles.setdefault(role, []).append(member)
+        return Policy(bindings=[Binding(role=role, members=members) for role, members in members_by_roles.items()], etag=etag)
+
+    @staticmethod
+    def read_file(file_path):
+        """Read saved policy from file.
+
+        Args:
+            file_path (string): Path to JSON file with users' roles ({member: [role1, role2]})
+                                or IAM policy ({"bindings": [{"role", "members"}], "etag"})
+
+        Raises:
+            json.decoder.JSONDecodeError: Raised if file is not correct JSON.
+            ValueError: Raised if file content has none of the supported formats.
+
+        Returns:
+            offline_snapshot.Policy: policy
+        """
+
+        with open(file_path, "r", encoding="utf-8") as file:
+            content = json.load(file)
+
+        if isinstance(content, dict) and isinstance(content.get("bindings"), list):
+            return Policy(bindings=[Binding(role=binding["role"], members=list(binding.get("members", [])))
+                                    for binding in content["bindings"]],
+                          etag=content.get("etag"))
+        if isinstance(content, dict) and all(isinstance(roles, list) for roles in content.values()):
+            return OfflinePolicySnapshot.from_users_roles(content)
+        raise ValueError(f"File {file_path} contains neither users' roles nor IAM policy.")
+
+    @classmethod
+    def load(cls, source, resource, history_store, backup_store, logger, stats, retry_policy):
+        """Load saved policy.
+
+        Args:
+            source (string): Path to JSON file with saved policy (see `read_file`), "latest" or point in time
+                             (ISO 8601 date/time or UNIX timestamp) of a snapshot from the history store or backups.
+            resource (string): Resource name. Format: "projects/<project_id>"
+            history_store (history_store.HistoryStore): history store of the project
+            backup_store (backup_store.BackupStore): backup store of the project
+            logger (logging.Logger): logger
+            stats (rpc_stats.RpcStats): statistics of calls
+            retry_policy (retry_policy.RetryPolicy): retry policy
+
+        Raises:
+            ValueError: Raised if there is no snapshot matching the source or the source is incorrect.
+            json.decoder.JSONDecodeError: Raised if file is not correct JSON.
+
+        Returns:
+            offline_snapshot.OfflinePolicySnapshot: snapshot
+        """
+
+        project_id = resource.split("/", 1)[-1]
+
+        if Path(source).is_file():
+            policy = cls.read_file(source)
+            description = f"file {source}"
+        else:
+            timestamp = None if source == LATEST else BackupStore.parse_time(source)
+            users_roles, snapshot = history_store.state_at(project=project_id, timestamp=timestamp)
+            description = f"history snapshot from {snapshot['time']}" if snapshot else None
+            if snapshot is None:
+                users_roles, snapshot = backup_store.restore(point_in_time=timestamp)
+                description = f"backup from {snapshot['time']}" if snapshot else None
+            if snapshot is None:
+                raise ValueError(f"There is no snapshot of project {project_id} taken before {source}.")
+            policy = cls.from_users_roles(users_roles, etag=snapshot["etag"])
+
+        logger.info(f"Offline mode. IAM policy of project {project_id} is served from {description} (etag {policy.etag}).")
+        return cls(policy=policy, resource=resource, logger=logger, stats=stats, retry_policy=retry_policy, source=description)
+
+    @property
+    def etag(self):
+        """Etag of the saved policy.
+
+        Returns:
+            string: etag or None if it is not known.
+        """
+        return self.__policy.etag
+
+    def get(self, refresh=False):
+        """Retrieve saved IAM policy.
+
+        Args:
+            refresh (bool): ignored - saved policy never changes
+
+        Returns:
+            offline_snapshot.Policy: saved policy.
+        """
+        return self.__policy
+
+    def set(self, policy):
+        """Refuse to write IAM policy.
+
+        Args:
+            policy (object): IAM policy to be set.
+
+        Raises:
+            RuntimeError: Always - IAM policy cannot be changed in offline mode.
+        """
+        raise RuntimeError(f"IAM policy of project {self.project_id} cannot be changed in offline mode.")
+
+    def index(self):
+        """Retrieve users <-> roles index of the saved policy.
+
+        Returns:
+            policy_index.PolicyIndex: index of the saved policy.
+        """
+        if self.__index is None:
+            self.__index = PolicyIndex(self.__policy)
+        return self.__index
+
+    def invalidate(self):
+        """Keep the saved policy - there is nothing to fetch again."""
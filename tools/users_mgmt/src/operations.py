@@ -14,13 +14,26 @@
 
 import json
 import logging
-import os
+import time
 from pathlib import Path
 from enum import Enum, auto
-from google.cloud import resourcemanager_v3
+
+from backup_store import BackupStore, BACKUP_DIR
+from history_store import HistoryStore, HISTORY_FILENAME
+from offline_snapshot import OfflinePolicySnapshot
+from permission_index import PermissionIndex
+from result_sink import ResultSink
+from policy_batch import PolicyBatch
+from policy_snapshot import PolicySnapshot
+from roles_catalog import RolesCatalog, CACHE_DIR, DEFAULT_TTL
+from structured_logging import operation_context
 
 
 USER_KEYWORD = "user:"
+JSON_LINES_EXTENSIONS = (".jsonl", ".ndjson")
+READ_CHUNK_SIZE = 64 * 1024  # characters
+# Longest JSON token (\uXXXX escape) which cannot be decoded when split between chunks, except strings
+MAX_SPLIT_TOKEN = 6  # characters
 
 
 class Operation:
@@ -29,21 +42,71 @@ class Operation:
     Class for executing operations on Google Cloud Platform.
     """
 
-    def __init__(self, service, project_id, logger, output_dir, exec_user_id):
+    def __init__(self, clients, project_id, logger, output_dir, exec_user_id, roles_cache_ttl=DEFAULT_TTL, refresh_roles=False,
+                 offline_snapshot=None, output_format=None, compress_output=False, project_lock=None):
         """Operation Class Constructor
 
         Args:
-            service (googleapiclient.discovery.Resource): A Resource object with methods for interacting with the service
+            clients (clients.Clients): Google Cloud Platform clients shared by the script
             project_id (string): project id
             logger (logging.Logger): logger
             output_dir (dir): Path to directory where to store generated, output files
             exec_user_id (str): Id of user who is executing the script
+            roles_cache_ttl (int): Time (in seconds) after which cached GCP roles catalog is fetched again
+            refresh_roles (bool): If True - fetch GCP roles catalog again, even if the cached one is still valid
+            offline_snapshot (string): If provided - GCP is not called and read operations are served from the saved snapshot:
+                                       path to JSON file, "latest" or point in time (see `offline_snapshot.OfflinePolicySnapshot.load`)
+            output_format (result_sink.ResultSink.Format): format of operations' output files. Indented JSON if not given.
+            compress_output (bool): If True - operations' output files are compressed with gzip
+            project_lock (project_lock.ProjectLock): lock serializing IAM policy commits of concurrent runs.
+                                                      Commits are not serialized if not given.
         """
-        self.service = service
+        self.clients = clients
         self.resource = f'projects/{project_id}'
         self.__log = logger
         self.out_dir = output_dir
         self.exec_user_id = exec_user_id
+        self.offline = offline_snapshot is not None
+        self.__batch = None
+        self.project_lock = project_lock
+        # (policy_index.PolicyIndex, version, permission_index.PermissionIndex) - permission index and policy index (with its version) it was built for
+        self.__permission_index = (None, None, None)
+        self.result_sink = ResultSink(output_dir=output_dir, logger=logger, output_format=output_format, compress=compress_output)
+        self.backup_store = BackupStore(backup_dir=Path(output_dir) / BACKUP_DIR, logger=logger)
+        self.history_store = HistoryStore(db_path=Path(output_dir) / HISTORY_FILENAME, logger=logger)
+
+        if self.offline:
+            self.policy_snapshot = OfflinePolicySnapshot.load(source=offline_snapshot, resource=self.resource,
+                                                              history_store=self.history_store, backup_store=self.backup_store,
+                                                              logger=logger, stats=clients.stats, retry_policy=clients.retry_policy)
+            # Cached roles never expire and missing roles are not fetched
+            self.roles_catalog = RolesCatalog(service_provider=self.__offline_service, cache_dir=Path(output_dir) / CACHE_DIR,
+                                              logger=logger, ttl=float("inf"), refresh=False, stats=clients.stats,
+                                              project=project_id, retry_policy=clients.retry_policy)
+        else:
+            self.policy_snapshot = PolicySnapshot(clients=clients, resource=self.resource, logger=logger)
+            self.roles_catalog = RolesCatalog(service_provider=lambda: self.clients.iam_service,
+                                              cache_dir=Path(output_dir) / CACHE_DIR, logger=logger,
+                                              ttl=roles_cache_ttl, refresh=refresh_roles,
+                                              stats=clients.stats, project=project_id, retry_policy=clients.retry_policy)
+
+    @staticmethod
+    def __offline_service():
+        """IAM API service in offline mode.
+
+        Raises:
+            RuntimeError: Always - GCP is not called in offline mode.
+        """
+        raise RuntimeError("GCP roles are not in the roles catalog cache. They cannot be fetched in offline mode.")
+
+    @property
+    def service(self):
+        """IAM API service.
+
+        Returns:
+            googleapiclient.discovery.Resource: A Resource object with methods for interacting with the service
+        """
+        return self.clients.iam_service
 
     class OperationsKey(Enum):
         """Operation Keys Enum
@@ -54,6 +117,11 @@ class Operation:
         USER = "user"
         ROLE = "role"
         ROLES = "roles"
+        TIME = "time"
+        FROM = "from"
+        TO = "to"
+        PERMISSION = "permission"
+        PERMISSIONS = "permissions"
 
     class Operations(Enum):
         """Possible operations' ids Enum
@@ -68,29 +136,44 @@ class Operation:
         SET_ROLE_TO_USER = auto()
         DELETE_ROLE_FROM_USER = auto()
         DELETE_ALL_ROLES_FROM_USER = auto()
+        GET_USER_HISTORY = auto()
+        GET_ROLE_MEMBERS_AT = auto()
+        GET_CHANGES = auto()
+        GET_USERS_WITH_PERMISSION = auto()
+        GET_USER_PERMISSIONS = auto()
+
+    # Operations changing IAM policy
+    WRITE_OPERATIONS = (Operations.SET_ROLE_TO_USER.name, Operations.DELETE_ROLE_FROM_USER.name,
+                        Operations.DELETE_ALL_ROLES_FROM_USER.name)
+    # Status of a change in the results file until it is committed
+    PENDING = "pending"
+    # Parameters each operation requires. Format: {operation id: ((key, alternative key), ...)}
+    REQUIRED_KEYS = {
+        Operations.GET_USER.name: ((OperationsKey.USER.value,),),
+        Operations.GET_ROLES_WITH_USERS.name: ((OperationsKey.ROLES.value,),),
+        Operations.GET_ROLE_INFO.name: ((OperationsKey.ROLE.value, OperationsKey.ROLES.value),),
+        Operations.SET_ROLE_TO_USER.name: ((OperationsKey.USER.value,), (OperationsKey.ROLE.value,)),
+        Operations.DELETE_ROLE_FROM_USER.name: ((OperationsKey.USER.value,), (OperationsKey.ROLE.value,)),
+        Operations.DELETE_ALL_ROLES_FROM_USER.name: ((OperationsKey.USER.value,),),
+        Operations.GET_USER_HISTORY.name: ((OperationsKey.USER.value,),),
+        Operations.GET_ROLE_MEMBERS_AT.name: ((OperationsKey.ROLE.value,), (OperationsKey.TIME.value,)),
+        Operations.GET_CHANGES.name: ((OperationsKey.FROM.value,),),
+        Operations.GET_USERS_WITH_PERMISSION.name: ((OperationsKey.PERMISSION.value, OperationsKey.PERMISSIONS.value),),
+        Operations.GET_USER_PERMISSIONS.name: ((OperationsKey.USER.value,),),
+    }
 
     def __get_roles_list(self):
         """Get all GCP roles
 
-        Lists every predefined Role that IAM supports, or every custom role that is defined for an organization or project.
+        Lists every predefined Role that IAM supports. Roles are served from the local roles catalog cache.
 
         Returns:
             list: List of all possible GCP roles
         """
 
-        request = self.service.roles().list()
-        roles_ls = []
-
-        while True:
-            response = request.execute()
-            for role in response.get('roles', []):
-                roles_ls.append(role)
-            request = self.service.roles().list_next(
-                previous_request=request, previous_response=response)
-            if request is None:
-                break
-
-        return roles_ls
+        # Keep the output as returned by GCP basic view - without permissions
+        return [{key: value for key, value in role.items() if key != "includedPermissions"}
+                for role in self.roles_catalog.get_all()]
 
     def __get_role_info(self, role):
         """Get info about specified role
@@ -103,36 +186,119 @@ class Operation:
                     "name", "title", "description", "includedPermissions", "stage", "etag"
         """
 
-        name = f"roles/{role}"
-        request = self.service.roles().get(name=name)
-        response = request.execute()
-        print(type(response))
-        return response
+        return self.roles_catalog.get(role=f"roles/{role}")
+
+    def __get_roles_info(self, roles_list):
+        """Get info about specified roles
+
+        Roles which are not cached yet are retrieved with batch requests.
+
+        Args:
+            roles_list (list): list of roles id. Format info: role id without the "roles/" keyword.
+
+        Returns:
+            dict:   Information about given roles. Format:
+                        {
+                            "role1": {"name", "title", "description", "includedPermissions", "stage", "etag"},
+                            "role2": {...}
+                        }
+        """
+
+        roles_info = self.roles_catalog.get_many(roles=[f"roles/{role}" for role in roles_list])
+        return {role: roles_info[f"roles/{role}"] for role in roles_list if f"roles/{role}" in roles_info}
+
+    def __policy_index(self):
+        """Retrieve users <-> roles index used to serve read operations.
+
+        If there are collected, not yet committed changes, the index reflects them,
+        so reads always see changes requested before them.
+
+        Returns:
+            policy_index.PolicyIndex: index of the current policy.
+        """
+
+        if self.__batch is not None and len(self.__batch):
+            return self.__batch.preview(self.policy_snapshot.get())
+        return self.policy_snapshot.index()
+
+    def __get_permission_index(self):
+        """Retrieve permission <-> role <-> user index used to serve permission queries.
+
+        Index is built from the current policy index (with not yet committed changes) and definitions of roles used in it.
+        It is rebuilt only when the policy index (or its content) changes.
+
+        Raises:
+            RuntimeError: Raised in offline mode if definitions of some roles are not cached.
+
+        Returns:
+            permission_index.PermissionIndex: permission index of the current policy.
+        """
+
+        policy_index = self.__policy_index()
+        indexed_policy, indexed_version, permission_index = self.__permission_index
+        if indexed_policy is not policy_index or indexed_version != policy_index.version:
+            roles_definitions = self.roles_catalog.get_many(roles=policy_index.roles())
+            permission_index = PermissionIndex(policy_index=policy_index, roles_definitions=roles_definitions)
+            if permission_index.undefined_roles():
+                self.__log.warning(f"Definitions of roles {permission_index.undefined_roles()} are not available. "
+                                   f"Their permissions are not taken into account.")
+            self.__permission_index = (policy_index, policy_index.version, permission_index)
+        return permission_index
+
+    def __get_users_with_permissions(self, permissions):
+        """Retrieve users who effectively have given permissions and roles granting them.
+
+        Args:
+            permissions (list): permissions (e.g. "storage.objects.get")
+
+        Returns:
+            dict: Format:
+                    {permission: {"roles": [role1, role2], "users": [user1, user2]}}
+        """
+
+        permission_index = self.__get_permission_index()
+        return {
+            permission: {
+                "roles": permission_index.roles_with(permission),
+                "users": [user.removeprefix(USER_KEYWORD) for user in permission_index.users_with(permission)],
+            }
+            for permission in permissions
+        }
+
+    def __get_users_permissions(self, user):
+        """Retrieve permissions given users effectively have.
+
+        Args:
+            user (string or list of strings): User id, list of users ids or "*" for all users.
+
+        Raises:
+            ValueError: Raised if provided argument `user` is not in correct type.
+
+        Returns:
+            generator: (user, [permission1, permission2]) pairs. Permissions are computed while the pairs are consumed.
+        """
+
+        users = self.get_user_and_assigned_roles(user=user)
+        permission_index = self.__get_permission_index()
+        return (
+            (u, permission_index.permissions_of(u if u.startswith(USER_KEYWORD) else f"{USER_KEYWORD}{u}"))
+            for u in users
+        )
 
     def __get_users_by_roles(self):
         """Retrieve all roles and users that are assigned to them.
 
-        Returns:
-            dict:   Format:
-                    {role: [user1, user2]}
+        Yields:
+            tuple (string, list): role and users assigned to it. Only roles with assigned users are returned.
         """
 
-        users_by_roles_dict = {}
-        client = resourcemanager_v3.ProjectsClient()
-        policy = client.get_iam_policy(request={"resource": self.resource})
+        index = self.__policy_index()
 
-        for binding in policy.bindings:
-            role = binding.role
-            members = binding.members
-            users_by_roles_dict[role] = []
-            for member in members:
-                if member.startswith(USER_KEYWORD):
-                    users_by_roles_dict[role].append(member)
+        for role in index.roles():
             # Only show roles with assigned users
-            if not users_by_roles_dict[role]:
-                del users_by_roles_dict[role]
-
-        return users_by_roles_dict
+            users = index.users_of(role)
+            if users:
+                yield role, users
 
     def get_user_and_assigned_roles(self, user):
         """Retrieve roles assigned to given user.
@@ -152,35 +318,22 @@ class Operation:
                         {user: [role1, role2]}
         """
 
-        users_by_roles = self.__get_users_by_roles()
+        if not (user == "*" or isinstance(user, (str, list))):
+            raise ValueError("Invalid user parameter. Must be '*', a user ID (string), or a list of user IDs.")
+
+        index = self.__policy_index()
         users_and_roles_dict = {}
 
         if user == "*":
             # Retrieve all users
-            for role, users in users_by_roles.items():
-                for user in users:
-                    if user.startswith(USER_KEYWORD):
-                        if user not in users_and_roles_dict:
-                            users_and_roles_dict[user] = []
-                        users_and_roles_dict[user].append(role)
-        elif isinstance(user, str):
-            # Retrieve only one user
-            for role, users in users_by_roles.items():
-                for u in users:
-                    if user in u:
-                        if user not in users_and_roles_dict:
-                            users_and_roles_dict[user] = []
-                        users_and_roles_dict[user].append(role)
-        elif isinstance(user, list):
-            # Retrieve information about given users.
-            for role, users in users_by_roles.items():
-                for u in user:
-                    if f"{USER_KEYWORD}{u}" in users:
-                        if u not in users_and_roles_dict:
-                            users_and_roles_dict[u] = []
-                        users_and_roles_dict[u].append(role)
+            for member in index.users():
+                users_and_roles_dict[member] = index.roles_of(member)
         else:
-            raise ValueError("Invalid user parameter. Must be '*', a user ID (string), or a list of user IDs.")
+            # Retrieve only one user or information about given users.
+            for u in [user] if isinstance(user, str) else user:
+                roles = index.roles_of(f"{USER_KEYWORD}{u}")
+                if roles:
+                    users_and_roles_dict[u] = roles
 
         return users_and_roles_dict
 
@@ -200,22 +353,74 @@ class Operation:
                         }
         """
 
+        index = self.__policy_index()
         chosen_roles_dict = {}
-        client = resourcemanager_v3.ProjectsClient()
-        policy = client.get_iam_policy(request={"resource": self.resource})
-
-        for binding in policy.bindings:
-            role = binding.role
-            role = role.replace("roles/", "")
-            if role in roles_list:
-                chosen_roles_dict[role] = []
-                members = binding.members
-                for member in members:
-                    if member.startswith(USER_KEYWORD):
-                        chosen_roles_dict[role].append(member)
+
+        for role in roles_list:
+            if index.has_binding(f"roles/{role}"):
+                chosen_roles_dict[role] = index.users_of(f"roles/{role}")
 
         return chosen_roles_dict
 
+    def start_batch(self):
+        """Start collecting IAM policy changes.
+
+        Until `commit_batch` is called, adding and removing roles does not write the IAM policy.
+        All changes are collected and committed later with a single `set_iam_policy` call.
+        """
+
+        if self.__batch is None:
+            self.__batch = PolicyBatch(policy_snapshot=self.policy_snapshot, logger=self.__log)
+
+    def commit_batch(self):
+        """Commit collected IAM policy changes.
+
+        Returns:
+            int: number of changes written to the policy.
+        """
+
+        batch, self.__batch = self.__batch, None
+        if batch is None:
+            return 0
+        return self.__commit(batch)
+
+    def discard_batch(self):
+        """Drop collected IAM policy changes without writing them."""
+
+        self.__batch = None
+
+    def __write(self, record):
+        """Record a change in the open batch or commit it immediately if no batch is open.
+
+        Args:
+            record (function): function which records the change in given policy_batch.PolicyBatch
+        """
+
+        if self.__batch is not None:
+            record(self.__batch)
+        else:
+            batch = PolicyBatch(policy_snapshot=self.policy_snapshot, logger=self.__log)
+            record(batch)
+            self.__commit(batch)
+
+    def __commit(self, batch):
+        """Commit the batch, under the project's lock if one is used.
+
+        Args:
+            batch (policy_batch.PolicyBatch): changes to commit
+
+        Returns:
+            int: number of changes written to the policy.
+        """
+
+        if self.project_lock is None:
+            return batch.commit()
+        changes = self.project_lock.commit(batch)
+        if self.project_lock.committed_by_other:
+            # Policy was written by the run which merged queued changes - cached snapshot is outdated
+            self.policy_snapshot.invalidate()
+        return changes
+
     def add_role_to_user(self, user, role):
         """Add role for given user.
 
@@ -227,30 +432,10 @@ class Operation:
             bool: operation status - If operation is successful return True.
         """
 
-        client = resourcemanager_v3.ProjectsClient()
-        policy = client.get_iam_policy(request={"resource": self.resource})
-        role = f"roles/{role}"
-
-        for binding in policy.bindings:
-            if binding.role == role and f"{USER_KEYWORD}{user}" in binding.members:
-                self.__log.debug(f"User {user} already has the role {role}.")
-                return True
-
-        binding = policy.bindings.add()
-        binding.role = role
-        binding.members.append(f"{USER_KEYWORD}{user}")
-
-        client.set_iam_policy(
-            request={
-                "resource": self.resource,
-                "policy": policy
-            }
-        )
-
-        self.__log.debug(f"Added role {role} to user {user} in project {self.resource}.")
+        self.__write(lambda batch: batch.add_role(user=user, role=f"roles/{role}"))
         return True
 
-    def __remove_role_from_user(self, user, role_id):
+    def remove_role_from_user(self, user, role_id):
         """Removes a specific role from a user in a GCP.
 
         Args:
@@ -261,28 +446,7 @@ class Operation:
         if user == self.exec_user_id:
             self.__log.info(f"User {user} executes the script. Their permissions will not be deleted.")
         else:
-            client = resourcemanager_v3.ProjectsClient()
-            policy = client.get_iam_policy(request={"resource": self.resource})
-            role_id = f"roles/{role_id}"
-
-            for binding in policy.bindings:
-                if binding.role == role_id:
-                    if f"{USER_KEYWORD}{user}" in binding.members:
-                        binding.members.remove(f"{USER_KEYWORD}{user}")
-                        self.__log.debug(f"Removed {user} from {role_id}")
-                    # Only keep bindings that still have members
-                    if not binding.members:
-                        policy.bindings.remove(binding)
-
-            # Update policy bindings
-            client.set_iam_policy(
-                request={
-                    "resource": self.resource,
-                    "policy": policy
-                }
-            )
-
-            self.__log.debug(f"Updated IAM policy for project {self.resource}.")
+            self.__write(lambda batch: batch.remove_role(user=user, role=f"roles/{role_id}"))
 
     def remove_all_roles_from_user(self, user):
         """Removes all roles from a user in a Google Cloud project.
@@ -294,44 +458,129 @@ class Operation:
         if user == self.exec_user_id:
             self.__log.info(f"User {user} executes the script. Their permissions will not be deleted.")
         else:
-            client = resourcemanager_v3.ProjectsClient()
-            policy = client.get_iam_policy(request={"resource": self.resource})
-
-            for binding in policy.bindings[:]:
-                if f"{USER_KEYWORD}{user}" in binding.members:
-                    binding.members.remove(f"{USER_KEYWORD}{user}")
-                    self.__log.debug(f"Removed {user} form {binding.role}")
-                # Only keep bindings that still have members
-                if not binding.members:
-                    policy.bindings.remove(binding)
-
-            # Update policy bindings
-            client.set_iam_policy(
-                request={
-                    "resource": self.resource,
-                    "policy": policy
-                }
-            )
-
-            self.__log.debug(f"Updated IAM policy for project {self.resource}.")
+            self.__write(lambda batch: batch.remove_all_roles(user=user))
 
     def __save_data_to_json_file(self, out_file_name, data):
-        """Save provided data into JSON file.
+        """Save provided data into a new output file.
+
+        Data is streamed to the file by the results sink, in the format chosen for the run (see `result_sink.ResultSink`).
+
+        Args:
+            out_file_name (string): Name of output file, without extension.
+            data (object): Data to be saved. Dictionary, list or data marked with `result_sink.ResultSink.items`.
+
+        Returns:
+            pathlib.Path: path of the saved file.
+        """
+        return self.result_sink.write(name=out_file_name, data=data)
+
+    def backup(self):
+        """Store backup of all users and roles assigned to them.
+
+        Backup is stored incrementally in the backup store (see `backup_store.BackupStore`)
+        and ingested into the history store (see `history_store.HistoryStore`).
+        Backups taken before the project had any history are ingested first.
+
+        Returns:
+            bool: status of operation - If operation is successful return True.
+        """
+
+        users_and_roles_dict = self.get_user_and_assigned_roles(user="*")
+        project_id = self.policy_snapshot.project_id
+        if not self.history_store.snapshots(project=project_id):
+            imported = self.history_store.import_backups(project=project_id, backup_store=self.backup_store)
+            if imported:
+                self.__log.info(f"{imported} previous backups were imported into the history.")
+
+        self.backup_store.save(users_roles=users_and_roles_dict, etag=self.policy_snapshot.etag)
+        self.history_store.ingest(project=project_id, users_roles=users_and_roles_dict, etag=self.policy_snapshot.etag)
+        return True
+
+    def __get_user_history(self, user, since=None, until=None):
+        """Retrieve history of roles held by given user.
+
+        Args:
+            user (string): user id
+            since (string): ISO 8601 date/time or UNIX timestamp. If None - from the first snapshot.
+            until (string): ISO 8601 date/time or UNIX timestamp. If None - until now.
+
+        Raises:
+            ValueError: Raised if a point in time has incorrect format.
+
+        Returns:
+            dict: Format:
+                    {user: [{"role", "from", "to"}]}
+        """
+
+        since = None if since is None else BackupStore.parse_time(since)
+        until = None if until is None else BackupStore.parse_time(until)
+        return {user: self.history_store.member_history(project=self.policy_snapshot.project_id, member=f"{USER_KEYWORD}{user}",
+                                                        since=since, until=until)}
+
+    def __get_role_members_at(self, role, point_in_time):
+        """Retrieve users who held given role at given point in time.
+
+        Args:
+            role (string): role id. Format info: role id without the "roles/" keyword.
+            point_in_time (string): ISO 8601 date/time or UNIX timestamp
+
+        Raises:
+            ValueError: Raised if point in time has incorrect format.
+
+        Returns:
+            dict: Format:
+                    {"role": [user1, user2]}
+        """
+
+        members = self.history_store.role_members(project=self.policy_snapshot.project_id, role=f"roles/{role}",
+                                                  timestamp=BackupStore.parse_time(point_in_time))
+        return {role: [member.removeprefix(USER_KEYWORD) for member in members]}
+
+    def __get_changes(self, since, until=None):
+        """Retrieve roles granted and revoked between two points in time.
 
         Args:
-            out_file_name (string): Name of output file.
-            data (object): Data to be saved.
+            since (string): ISO 8601 date/time or UNIX timestamp
+            until (string): ISO 8601 date/time or UNIX timestamp. If None - until now.
+
+        Raises:
+            ValueError: Raised if a point in time has incorrect format.
+
+        Returns:
+            list: Format:
+                    [{"time", "member", "role", "change": "granted" or "revoked"}]
         """
 
-        output_path = Path(self.out_dir)
-        output_path.mkdir(parents=True, exist_ok=True)
-        file_path = output_path / out_file_name
+        return self.history_store.changes(project=self.policy_snapshot.project_id, since=BackupStore.parse_time(since),
+                                          until=float("inf") if until is None else BackupStore.parse_time(until))
 
-        # Ensure the folder exists
-        os.makedirs(self.out_dir, exist_ok=True)
-        with file_path.open("w+", encoding="utf-8") as file:
-            json.dump(data, file, indent=4)
-        self.__log.info(f"Data is saved in a file  '{file_path}'.")
+    def restore_backup(self, point_in_time):
+        """Reconstruct backup of users and their roles from given point in time.
+
+        Reconstructed backup is saved in file `Backup_<time>.json`. IAM policy is not changed.
+
+        Args:
+            point_in_time (string): ISO 8601 date/time (UTC if no offset is given), UNIX timestamp or "latest"
+
+        Returns:
+            bool: status of operation - If operation is successful return True.
+        """
+
+        try:
+            timestamp = None if point_in_time == "latest" else BackupStore.parse_time(point_in_time)
+        except ValueError as e:
+            self.__log.error(f"Incorrect point in time was provided: {point_in_time}. \nError: {e}")
+            return False
+
+        users_and_roles_dict, entry = self.backup_store.restore(point_in_time=timestamp)
+        if entry is None:
+            self.__log.error(f"There is no backup taken before {point_in_time}.")
+            return False
+
+        self.__log.info(f"Backup from {entry['time']} (etag {entry['etag']}) was reconstructed.")
+        self.__save_data_to_json_file(out_file_name=f"Backup_{entry['file'].split('_', 1)[1].split('.')[0]}",
+                                      data=users_and_roles_dict)
+        return True
 
     def operations_handler(self, operation, **kwargs):
         """Handling operations.
@@ -344,12 +593,22 @@ class Operation:
                                 Key is one of the values listed in enum self.OperationsKey
 
         Returns:
-            bool: status of operation - If operation is successful return True.
+            tuple (bool, pathlib.Path): status and output file of operation - If operation is successful return True.
+                                        Path of the file with output data or None if operation does not save one.
         """
 
         return_status = False
+        output_path = None
+        missing_keys = [" or ".join(f"'{key}'" for key in keys) for keys in self.REQUIRED_KEYS.get(operation, ())
+                        if not any(key in kwargs for key in keys)]
 
-        if operation in self.Operations.__members__:
+        if missing_keys:
+            self.__log.error(f"Operation {operation} requires parameters: {', '.join(missing_keys)}.")
+
+        elif self.offline and operation in self.WRITE_OPERATIONS:
+            self.__log.error(f"Operation {operation} changes IAM policy. It cannot be performed in offline mode.")
+
+        elif operation in self.Operations.__members__:
             self.__log.info(f"Handling operation {operation}")
 
             if operation == self.Operations.GET_USER.name:
@@ -359,37 +618,91 @@ class Operation:
                     self.__log.error(f"There is a problem with operation {operation} \nError: {e}")
                     return_status = False
                 else:
-                    self.__save_data_to_json_file(out_file_name="User_and_assigned_roles.json",
-                                                  data=users_and_their_roles_dict)
+                    output_path = self.__save_data_to_json_file(out_file_name="User_and_assigned_roles",
+                                                                data=users_and_their_roles_dict)
                     return_status = True
 
             elif operation == self.Operations.GET_ALL_ROLES.name:
-                roles_ls = self.__get_roles_list()
-                self.__save_data_to_json_file(out_file_name="Roles.json", data=roles_ls)
-                return_status = True
+                try:
+                    roles_ls = self.__get_roles_list()
+                except RuntimeError as e:
+                    self.__log.error(f"There is a problem with operation {operation} \nError: {e}")
+                else:
+                    output_path = self.__save_data_to_json_file(out_file_name="Roles", data=roles_ls)
+                    return_status = True
 
             elif operation == self.Operations.GET_ALL_ROLES_WITH_USERS.name:
-                users_by_roles_dict = self.__get_users_by_roles()
-                self.__save_data_to_json_file(out_file_name="Users_by_roles.json", data=users_by_roles_dict)
+                output_path = self.__save_data_to_json_file(out_file_name="Users_by_roles", data=ResultSink.items(self.__get_users_by_roles()))
                 return_status = True
 
             elif operation == self.Operations.GET_ROLES_WITH_USERS.name:
                 chosen_roles_dict = self.__get_given_roles_and_asigned_users(
                     roles_list=kwargs[self.OperationsKey.ROLES.value])
-                self.__save_data_to_json_file(out_file_name="Chosen_roles_with_asigned_users.json", data=chosen_roles_dict)
+                output_path = self.__save_data_to_json_file(out_file_name="Chosen_roles_with_asigned_users", data=chosen_roles_dict)
                 return_status = True
 
             elif operation == self.Operations.GET_ROLE_INFO.name:
-                role_info = self.__get_role_info(role=kwargs[self.OperationsKey.ROLE.value])
-                self.__save_data_to_json_file(out_file_name="Role_info.json", data=role_info)
-                return_status = True
+                try:
+                    if self.OperationsKey.ROLES.value in kwargs:
+                        roles_list = kwargs[self.OperationsKey.ROLES.value]
+                        roles_info = self.__get_roles_info(roles_list=roles_list)
+                        output_path = self.__save_data_to_json_file(out_file_name="Roles_info", data=roles_info)
+                        return_status = len(roles_info) == len(set(roles_list))
+                    else:
+                        role_info = self.__get_role_info(role=kwargs[self.OperationsKey.ROLE.value])
+                        output_path = self.__save_data_to_json_file(out_file_name="Role_info", data=role_info)
+                        return_status = True
+                except RuntimeError as e:
+                    self.__log.error(f"There is a problem with operation {operation} \nError: {e}")
+
+            elif operation in (self.Operations.GET_USER_HISTORY.name, self.Operations.GET_ROLE_MEMBERS_AT.name,
+                               self.Operations.GET_CHANGES.name):
+                try:
+                    if operation == self.Operations.GET_USER_HISTORY.name:
+                        history = self.__get_user_history(user=kwargs[self.OperationsKey.USER.value],
+                                                          since=kwargs.get(self.OperationsKey.FROM.value),
+                                                          until=kwargs.get(self.OperationsKey.TO.value))
+                        out_file_name = "User_history"
+                    elif operation == self.Operations.GET_ROLE_MEMBERS_AT.name:
+                        history = self.__get_role_members_at(role=kwargs[self.OperationsKey.ROLE.value],
+                                                             point_in_time=kwargs[self.OperationsKey.TIME.value])
+                        out_file_name = "Role_members_at"
+                    else:
+                        history = self.__get_changes(since=kwargs[self.OperationsKey.FROM.value],
+                                                     until=kwargs.get(self.OperationsKey.TO.value))
+                        out_file_name = "Changes"
+                except ValueError as e:
+                    self.__log.error(f"There is a problem with operation {operation} \nError: {e}")
+                    return_status = False
+                else:
+                    output_path = self.__save_data_to_json_file(out_file_name=out_file_name, data=history)
+                    return_status = True
+
+            elif operation == self.Operations.GET_USERS_WITH_PERMISSION.name:
+                try:
+                    permissions = kwargs.get(self.OperationsKey.PERMISSIONS.value) or [kwargs[self.OperationsKey.PERMISSION.value]]
+                    users_with_permissions = self.__get_users_with_permissions(permissions=permissions)
+                except RuntimeError as e:
+                    self.__log.error(f"There is a problem with operation {operation} \nError: {e}")
+                else:
+                    output_path = self.__save_data_to_json_file(out_file_name="Users_with_permissions", data=users_with_permissions)
+                    return_status = True
+
+            elif operation == self.Operations.GET_USER_PERMISSIONS.name:
+                try:
+                    users_permissions = self.__get_users_permissions(user=kwargs[self.OperationsKey.USER.value])
+                except (RuntimeError, ValueError) as e:
+                    self.__log.error(f"There is a problem with operation {operation} \nError: {e}")
+                else:
+                    output_path = self.__save_data_to_json_file(out_file_name="User_permissions", data=ResultSink.items(users_permissions))
+                    return_status = True
 
             elif operation == self.Operations.SET_ROLE_TO_USER.name:
                 self.add_role_to_user(user=kwargs[self.OperationsKey.USER.value], role=kwargs[self.OperationsKey.ROLE.value])
                 return_status = True
 
             elif operation == self.Operations.DELETE_ROLE_FROM_USER.name:
-                self.__remove_role_from_user(user=kwargs[self.OperationsKey.USER.value],
+                self.remove_role_from_user(user=kwargs[self.OperationsKey.USER.value],
                                              role_id=kwargs[self.OperationsKey.ROLE.value])
                 return_status = True
 
@@ -399,12 +712,185 @@ class Operation:
         else:
             self.__log.error(f"There is no such operation as {operation}")
 
-        return return_status
+        # Roles fetched one by one during the operation are saved to the cache once
+        self.roles_catalog.flush()
+        return return_status, output_path
+
+    def __prepare_operations(self, operations_list):
+        """Prepare operations from file to be handled.
+
+        Consecutive GET_ROLE_INFO operations are merged into one operation retrieving information about all their roles,
+        so roles are fetched together and saved in one output file.
+
+        Args:
+            operations_list (iterable): operations loaded from file
+
+        Yields:
+            tuple (string, dict, int): operation id, operation parameters and number of operations from file it covers.
+        """
+
+        role_info_roles = []
+
+        def merged_role_info_operation():
+            if len(role_info_roles) == 1:
+                return self.Operations.GET_ROLE_INFO.name, {self.OperationsKey.ROLE.value: role_info_roles[0]}, 1
+            return self.Operations.GET_ROLE_INFO.name, {self.OperationsKey.ROLES.value: list(role_info_roles)}, len(role_info_roles)
+
+        for op in operations_list:
+            if not isinstance(op, dict):
+                # Not an operation - reported by the handler as an unknown operation
+                op = {self.OperationsKey.OPERATION.value: json.dumps(op)}
+            operation_name = op.get(self.OperationsKey.OPERATION.value)
+            if not isinstance(operation_name, str):
+                operation_name = json.dumps(operation_name)
+            kwargs = {
+                key.value: op[key.value] for key in self.OperationsKey if key != self.OperationsKey.OPERATION and key.value in op
+            }
+
+            if operation_name == self.Operations.GET_ROLE_INFO.name and list(kwargs) == [self.OperationsKey.ROLE.value]:
+                role_info_roles.append(kwargs[self.OperationsKey.ROLE.value])
+                continue
+
+            if role_info_roles:
+                yield merged_role_info_operation()
+                role_info_roles.clear()
+            yield operation_name, kwargs, 1
+
+        if role_info_roles:
+            yield merged_role_info_operation()
+
+    @staticmethod
+    def __read_json_lines(file):
+        """Read operations from JSON Lines file one by one.
+
+        Args:
+            file (io.TextIOBase): opened file. Each line contains one operation. Empty lines are skipped.
+
+        Raises:
+            json.decoder.JSONDecodeError: Raised if a line is not correct JSON.
+
+        Yields:
+            dict: operation
+        """
+
+        for line in file:
+            if line.strip():
+                yield json.loads(line)
+
+    @staticmethod
+    def __read_json_array(file):
+        """Read operations from JSON array file one by one, without loading the whole file.
+
+        Args:
+            file (io.TextIOBase): opened file with JSON array of operations.
+
+        Raises:
+            json.decoder.JSONDecodeError: Raised if file content is not correct JSON array or anything but whitespace
+                                          follows it. Raised as soon as the incorrect operation is read.
+
+        Yields:
+            dict: operation
+        """
+
+        decoder = json.JSONDecoder()
+        buffer = ""
+        array_started = False
+        array_closed = False
+        # True after an operation - only "," or "]" may follow
+        expect_separator = False
+        # True after "," - an operation must follow
+        expect_operation = False
+        end_of_file = False
+
+        while True:
+            buffer = buffer.lstrip()
+
+            if buffer:
+                if array_closed:
+                    raise json.decoder.JSONDecodeError("Extra data after the end of the array", buffer, 0)
+                if not array_started:
+                    if buffer[0] != "[":
+                        raise json.decoder.JSONDecodeError("Expecting '['", buffer, 0)
+                    array_started = True
+                    buffer = buffer[1:]
+                    continue
+                if expect_separator or (buffer[0] == "]" and not expect_operation):
+                    if buffer[0] not in ",]":
+                        raise json.decoder.JSONDecodeError("Expecting ',' delimiter or ']'", buffer, 0)
+                    array_closed = buffer[0] == "]"
+                    expect_operation = buffer[0] == ","
+                    expect_separator = False
+                    buffer = buffer[1:]
+                    continue
+                if buffer[0] in ",]":
+                    raise json.decoder.JSONDecodeError("Expecting value", buffer, 0)
+                try:
+                    operation, end = decoder.raw_decode(buffer)
+                except json.decoder.JSONDecodeError as e:
+                    # Operation can be split between chunks - then decoding fails at its last, incomplete token.
+                    # Error before it is final, so a broken operation is reported without reading the rest of the file.
+                    if end_of_file or (len(buffer) - e.pos > MAX_SPLIT_TOKEN and not e.msg.startswith("Unterminated string")):
+                        raise
+                else:
+                    # Value ending with the buffer (e.g. a number) may continue in the next chunk
+                    if end < len(buffer) or end_of_file:
+                        buffer = buffer[end:]
+                        expect_separator = True
+                        expect_operation = False
+                        yield operation
+                        continue
+
+            if end_of_file:
+                if array_closed:
+                    return
+                raise json.decoder.JSONDecodeError("Unexpected end of file", buffer, len(buffer))
+            chunk = file.read(READ_CHUNK_SIZE)
+            end_of_file = not chunk
+            buffer += chunk
+
+    def __commit_pending(self, results_file, pending, operations_file_path):
+        """Commit changes collected from operations file and append their final status to the results file.
+
+        Args:
+            results_file (io.TextIOBase): opened `Operations_results.jsonl` file
+            pending (list): changes waiting for the commit. Format: [(index, operation)]
+            operations_file_path (string): Path to operations file, used in logs
+
+        Returns:
+            bool: True if changes were applied (or there were none).
+        """
+
+        if self.offline:
+            # Changes are refused in offline mode - there is nothing to commit
+            self.discard_batch()
+            return True
+
+        from google.api_core.exceptions import GoogleAPICallError
+
+        error = None
+        try:
+            changes = self.commit_batch()
+        except (GoogleAPICallError, TimeoutError, RuntimeError) as e:
+            error = str(e)
+            self.__log.error(f"Changes requested in file {operations_file_path} were NOT applied. \nError: {e}")
+        else:
+            self.__log.info(f"{changes} changes from file {operations_file_path} were applied.")
+
+        for index, operation in pending:
+            results_file.write(json.dumps({"index": index, "operation": operation, "count": 1, "status": error is None,
+                                           "committed": error is None, "error": error}) + "\n")
+        results_file.flush()
+        return error is None
 
     def retrieve_operations_list_from_json(self, operations_file_path):
         """Load operations list from file.
 
         Handling json file which contains list of operations that shall be performed.
+        File is streamed: each operation is handled as soon as it is read, so memory usage does not depend on file size.
+        Changes of IAM policy are collected and committed with a single write after the last operation (or, if the file
+        turns out to be malformed, after the last operation read before the error).
+        Result of each operation is appended to `Operations_results.jsonl` file in output directory as soon as it completes.
+        Changes are recorded with status "pending" and their final status is appended after the commit.
 
         Args:
             operations_file_path (string):  Path to Json file with mapping between GCP roles to Horizon roles.
@@ -414,6 +900,9 @@ class Operation:
                                                     {"operation": "GET_USER", "user": "*"},
                                                     {"operation": "GET_ALL_ROLES"}
                                                 ]
+                                            Files with `.jsonl` or `.ndjson` extension are read as JSON Lines - one operation per line:
+                                                {"operation": "GET_USER", "user": "*"}
+                                                {"operation": "GET_ALL_ROLES"}
 
         Returns:
             bool: operation_result - return True if operation was done successfully. Otherwise return False.
@@ -423,25 +912,72 @@ class Operation:
         self.__log.info(f"I will look through the list of operations in the provided file: {operations_file_path}")
 
         try:
-            with open(operations_file_path, "r") as file:
-                operations_list = json.load(file)
+            file = open(operations_file_path, "r")
         except FileNotFoundError as e:
             self.__log.error(f"No such file or directory: {operations_file_path}. Cannot perform operations.")
             return False
-        except json.decoder.JSONDecodeError as e:
-            self.__log.error(f"File {operations_file_path} is incorrect. Check formatting. Cannot perform operations.")
-            return False
 
-        success_score = 0
-        for op in operations_list:
-            operation_name = op[self.OperationsKey.OPERATION.value]
-            kwargs = {
-                key.value: op[key.value] for key in self.OperationsKey if key != self.OperationsKey.OPERATION and key.value in op
-            }
-            if self.operations_handler(operation_name, **kwargs):
-                success_score += 1
+        if Path(operations_file_path).suffix in JSON_LINES_EXTENSIONS:
+            operations = self.__read_json_lines(file)
+        else:
+            operations = self.__read_json_array(file)
+
+        results_dir = Path(self.out_dir)
+        results_dir.mkdir(parents=True, exist_ok=True)
+        results_file_path = results_dir / "Operations_results.jsonl"
 
-        num_failed_op = len(operations_list) - success_score
+        operations_count = 0
+        success_score = 0
+        # [(index, operation)] - changes recorded in the batch, waiting for the commit
+        pending = []
+        with file, results_file_path.open("w", encoding="utf-8") as results_file:
+            # All reads share one policy snapshot and see changes requested before them (not committed yet).
+            # All changes from the file are committed together at the end, also if the file turns out to be malformed.
+            self.start_batch()
+            try:
+                for operation_name, kwargs, ops_count in self.__prepare_operations(operations):
+                    start_time = time.perf_counter()
+                    # All records logged while handling the operation carry its id
+                    with operation_context(operation_id=operations_count, operation=operation_name):
+                        operation_status, output_path = self.operations_handler(operation_name, **kwargs)
+                    elapsed_ms = round((time.perf_counter() - start_time) * 1000, 3)
+                    is_change = operation_name in self.WRITE_OPERATIONS and not self.offline
+                    if operation_status:
+                        success_score += ops_count
+                        if is_change:
+                            pending.append((operations_count, operation_name))
+
+                    self.__log.info(f"Operation {operation_name} ({operations_count}) {('recorded' if is_change else 'done') if operation_status else 'FAILED'} "
+                                    f"in {elapsed_ms} ms.",
+                                    extra={"operation_id": operations_count, "operation": operation_name,
+                                           "user": kwargs.get(self.OperationsKey.USER.value),
+                                           "role": kwargs.get(self.OperationsKey.ROLE.value, kwargs.get(self.OperationsKey.ROLES.value)),
+                                           "elapsed_ms": elapsed_ms})
+                    results_file.write(json.dumps({"index": operations_count, "operation": operation_name,
+                                                   "count": ops_count,
+                                                   "status": self.PENDING if operation_status and is_change else operation_status,
+                                                   "elapsed_ms": elapsed_ms,
+                                                   "output": str(output_path) if output_path else None}) + "\n")
+                    results_file.flush()
+                    operations_count += ops_count
+            except json.decoder.JSONDecodeError as e:
+                self.__log.error(f"File {operations_file_path} is incorrect. Check formatting. "
+                                 f"{operations_count} operations were performed before the error. "
+                                 f"{len(pending)} changes requested before the error will be applied. \nError: {e}")
+                self.__commit_pending(results_file=results_file, pending=pending, operations_file_path=operations_file_path)
+                return False
+            except Exception as e:
+                # Batch is never left open - changes recorded before the error are handled as after a parse error
+                self.__log.error(f"Handling operations from file {operations_file_path} stopped at operation {operations_count}. "
+                                 f"{len(pending)} changes requested before the error will be applied. \nError: {e}")
+                self.__commit_pending(results_file=results_file, pending=pending, operations_file_path=operations_file_path)
+                return False
+
+            if not self.__commit_pending(results_file=results_file, pending=pending, operations_file_path=operations_file_path):
+                return False
+
+        self.__log.info(f"Results of {operations_count} operations are saved in a file '{results_file_path}'.")
+        num_failed_op = operations_count - success_score
         if num_failed_op:
             self.__log.error(f"There were: {num_failed_op} incorrect operations.")
         else:
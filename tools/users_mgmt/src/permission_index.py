@@ -0,0 +1,139 @@
+# Copyright (c) 2024-2025 Accenture, All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+class PermissionIndex:
+    """Permission Index Class
+
+    Index connecting permissions, roles and users, built once from IAM policy index and roles definitions.
+    Permissions, roles and users are numbered (in alphabetical order) and sets of them are kept as bitsets (Python integers):
+    roles granting each permission, permissions of each role, users of each role and roles of each user.
+    Questions "who has permission P" and "what can user U do" are answered with a few bitwise ORs,
+    without joining lists of permissions with lists of users.
+    """
+
+    def __init__(self, policy_index, roles_definitions):
+        """Permission Index Class Constructor
+
+        Args:
+            policy_index (policy_index.PolicyIndex): index of IAM policy
+            roles_definitions (dict): definitions of roles used in the policy. Format:
+                                      {"roles/role_id": {"includedPermissions": [permission1, permission2], ...}}
+                                      Roles without definition grant no permissions.
+        """
+
+        self.__roles = sorted(policy_index.roles())
+        self.__users = sorted(policy_index.users())
+        self.__permissions = sorted({permission for role in self.__roles
+                                     for permission in roles_definitions.get(role, {}).get("includedPermissions", [])})
+        role_ids = {role: i for i, role in enumerate(self.__roles)}
+        user_ids = {user: i for i, user in enumerate(self.__users)}
+        self.__permission_ids = {permission: i for i, permission in enumerate(self.__permissions)}
+        self.__undefined_roles = [role for role in self.__roles if role not in roles_definitions]
+
+        # Bitset of permissions of each role (indexed by role number)
+        self.__role_permissions = [0] * len(self.__roles)
+        # Bitset of roles granting each permission (indexed by permission number)
+        self.__permission_roles = [0] * len(self.__permissions)
+        for role, role_id in role_ids.items():
+            role_bit = 1 << role_id
+            permissions = 0
+            for permission in roles_definitions.get(role, {}).get("includedPermissions", []):
+                permission_id = self.__permission_ids[permission]
+                permissions |= 1 << permission_id
+                self.__permission_roles[permission_id] |= role_bit
+            self.__role_permissions[role_id] = permissions
+
+        # Bitset of users of each role (indexed by role number)
+        self.__role_users = [0] * len(self.__roles)
+        # {"user:user_id": bitset of roles}
+        self.__user_roles = {}
+        for user, user_id in user_ids.items():
+            roles = 0
+            for role in policy_index.roles_of(user):
+                roles |= 1 << role_ids[role]
+                self.__role_users[role_ids[role]] |= 1 << user_id
+            self.__user_roles[user] = roles
+
+    @staticmethod
+    def __bits(bitset):
+        """Numbers of set bits, in ascending order.
+
+        Args:
+            bitset (int): bitset
+
+        Yields:
+            int: number of a set bit
+        """
+        digits = bin(bitset)[:1:-1]
+        position = digits.find("1")
+        while position != -1:
+            yield position
+            position = digits.find("1", position + 1)
+
+    def undefined_roles(self):
+        """Retrieve roles used in the policy whose definitions were not provided.
+
+        Returns:
+            list: roles ids
+        """
+        return list(self.__undefined_roles)
+
+    def roles_with(self, permission):
+        """Retrieve roles from the policy which grant given permission.
+
+        Args:
+            permission (string): permission (e.g. "storage.objects.get")
+
+        Returns:
+            list: roles ids, sorted.
+        """
+        permission_id = self.__permission_ids.get(permission)
+        if permission_id is None:
+            return []
+        return [self.__roles[role_id] for role_id in self.__bits(self.__permission_roles[permission_id])]
+
+    def users_with(self, permission):
+        """Retrieve users who effectively have given permission through any of their roles.
+
+        Args:
+            permission (string): permission (e.g. "storage.objects.get")
+
+        Returns:
+            list: users (e.g. "user:user_id"), sorted.
+        """
+
+        permission_id = self.__permission_ids.get(permission)
+        if permission_id is None:
+            return []
+
+        users = 0
+        for role_id in self.__bits(self.__permission_roles[permission_id]):
+            users |= self.__role_users[role_id]
+        return [self.__users[user_id] for user_id in self.__bits(users)]
+
+    def permissions_of(self, user):
+        """Retrieve permissions user effectively has through all their roles.
+
+        Args:
+            user (string): user (e.g. "user:user_id")
+
+        Returns:
+            list: permissions, sorted.
+        """
+
+        permissions = 0
+        for role_id in self.__bits(self.__user_roles.get(user, 0)):
+            permissions |= self.__role_permissions[role_id]
+        return [self.__permissions[permission_id] for permission_id in self.__bits(permissions)]
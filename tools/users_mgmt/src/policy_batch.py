@@ -0,0 +1,269 @@
+# Copyright (c) 2024-2025 Accenture, All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from enum import Enum, auto
+
+from policy_index import PolicyIndex
+
+
+USER_KEYWORD = "user:"
+MAX_COMMIT_ATTEMPTS = 5
+
+
+class PolicyBatch:
+    """IAM Policy Mutation Batch Class
+
+    Collects adds and removes of users' roles, applies them to one in-memory IAM policy
+    and commits them with a single `set_iam_policy` call carrying the policy etag.
+    If the etag does not match (policy was changed by someone else), the policy is read again,
+    the whole batch is re-applied and the commit is retried after a randomized exponential backoff.
+    """
+
+    def __init__(self, policy_snapshot, logger):
+        """IAM Policy Mutation Batch Class Constructor
+
+        Args:
+            policy_snapshot (policy_snapshot.PolicySnapshot): Snapshot of the project's IAM policy
+            logger (logging.Logger): logger
+        """
+        self.__snapshot = policy_snapshot
+        self.__log = logger
+        self.__mutations = []
+        # Index of the policy with mutations applied, used to serve reads before the commit
+        self.__preview_index = None
+        self.__preview_etag = None
+        self.__preview_applied = 0
+
+    class Mutation(Enum):
+        """Mutation Types Enum
+
+        All possible types of changes collected in the batch.
+        """
+        ADD_ROLE = auto()
+        REMOVE_ROLE = auto()
+        REMOVE_ALL_ROLES = auto()
+
+    def __len__(self):
+        return len(self.__mutations)
+
+    def add_role(self, user, role):
+        """Add role to user.
+
+        Args:
+            user (string): user id
+            role (string): role id. Format info: role id with the "roles/" keyword.
+        """
+        self.__mutations.append((self.Mutation.ADD_ROLE, user, role))
+
+    def remove_role(self, user, role):
+        """Remove role from user.
+
+        Args:
+            user (string): user id
+            role (string): role id. Format info: role id with the "roles/" keyword.
+        """
+        self.__mutations.append((self.Mutation.REMOVE_ROLE, user, role))
+
+    def remove_all_roles(self, user):
+        """Remove all roles from user.
+
+        Args:
+            user (string): user id
+        """
+        self.__mutations.append((self.Mutation.REMOVE_ALL_ROLES, user, None))
+
+    def export(self):
+        """Export collected mutations in JSON serializable form.
+
+        Returns:
+            list: mutations. Format: [[mutation name, user id, role id or None]]
+        """
+        return [[mutation.name, user, role] for mutation, user, role in self.__mutations]
+
+    def extend(self, mutations):
+        """Add exported mutations (e.g. of another run) after the collected ones.
+
+        Args:
+            mutations (list): mutations returned by `export`
+        """
+        self.__mutations.extend((self.Mutation[name], user, role) for name, user, role in mutations)
+
+    def clear(self):
+        """Drop all collected mutations."""
+        self.__mutations = []
+        self.__preview_index = None
+
+    @staticmethod
+    def __is_unconditional(binding):
+        """Check if binding has no IAM condition attached.
+
+        Args:
+            binding (google.iam.v1.policy_pb2.Binding): policy binding
+
+        Returns:
+            bool: True if binding has no condition.
+        """
+        condition = getattr(binding, "condition", None)
+        return not (condition and condition.expression)
+
+    def apply(self, policy):
+        """Apply collected mutations to given policy.
+
+        Policy is modified in place.
+
+        Args:
+            policy (google.iam.v1.policy_pb2.Policy): IAM policy
+
+        Returns:
+            int: number of changes made in the policy.
+        """
+        return self.__apply_mutations(policy=policy, mutations=self.__mutations, log_changes=True)
+
+    def preview(self, policy):
+        """Retrieve users <-> roles index of given policy as if collected mutations were already committed.
+
+        Given policy is not modified. The policy is indexed once (again only if its etag changes) and the index
+        is updated in place with mutations collected since the previous call, so reads between writes cost
+        only the new mutations.
+
+        Args:
+            policy (google.iam.v1.policy_pb2.Policy): IAM policy
+
+        Returns:
+            policy_index.PolicyIndex: index of the policy with collected mutations applied.
+        """
+
+        if self.__preview_index is None or self.__preview_etag != policy.etag:
+            self.__preview_index = PolicyIndex(policy)
+            self.__preview_etag = policy.etag
+            self.__preview_applied = 0
+
+        for mutation, user, role in self.__mutations[self.__preview_applied:]:
+            member = f"{USER_KEYWORD}{user}"
+            if mutation == self.Mutation.ADD_ROLE:
+                self.__preview_index.add_role(member, role)
+            elif mutation == self.Mutation.REMOVE_ROLE:
+                self.__preview_index.remove_role(member, role)
+            else:
+                self.__preview_index.remove_all_roles(member)
+        self.__preview_applied = len(self.__mutations)
+
+        return self.__preview_index
+
+    def __apply_mutations(self, policy, mutations, log_changes):
+        """Apply mutations to given policy.
+
+        Policy is modified in place.
+
+        Args:
+            policy (google.iam.v1.policy_pb2.Policy): IAM policy
+            mutations (list): mutations to apply
+            log_changes (bool): If True - each change is logged.
+
+        Returns:
+            int: number of changes made in the policy.
+        """
+
+        changes = 0
+        # Bindings without conditions by role - new members are added only to them
+        role_bindings = {}
+        for binding in policy.bindings:
+            if self.__is_unconditional(binding):
+                role_bindings.setdefault(binding.role, binding)
+
+        for mutation, user, role in mutations:
+            member = f"{USER_KEYWORD}{user}"
+
+            if mutation == self.Mutation.ADD_ROLE:
+                binding = role_bindings.get(role)
+                if binding is not None and member in binding.members:
+                    if log_changes:
+                        self.__log.debug(f"User {user} already has the role {role}.", extra={"user": user, "role": role})
+                    continue
+                if binding is None:
+                    binding = policy.bindings.add()
+                    binding.role = role
+                    role_bindings[role] = binding
+                binding.members.append(member)
+                changes += 1
+                if log_changes:
+                    self.__log.debug(f"Added role {role} to user {user}.", extra={"user": user, "role": role})
+            else:
+                for binding in policy.bindings[:]:
+                    if mutation == self.Mutation.REMOVE_ROLE and binding.role != role:
+                        continue
+                    if member in binding.members:
+                        binding.members.remove(member)
+                        changes += 1
+                        if log_changes:
+                            self.__log.debug(f"Removed {user} from {binding.role}", extra={"user": user, "role": binding.role})
+                    # Only keep bindings that still have members
+                    if not binding.members:
+                        policy.bindings.remove(binding)
+                        if role_bindings.get(binding.role) is binding:
+                            del role_bindings[binding.role]
+
+        return changes
+
+    def commit(self, before_write=None):
+        """Commit collected mutations with a single IAM policy write.
+
+        Args:
+            before_write (function): If provided - called before each write attempt, e.g. to check that a lock is still held.
+                                     Exception raised by it stops the commit.
+
+        Raises:
+            google.api_core.exceptions.Aborted: Raised if the policy kept changing concurrently
+                                                 for all MAX_COMMIT_ATTEMPTS attempts.
+
+        Returns:
+            int: number of changes written to the policy.
+        """
+
+        if not self.__mutations:
+            return 0
+
+        # Imported at first commit - read-only runs do not load google.api_core
+        from google.api_core.exceptions import Aborted
+
+        for attempt in range(1, MAX_COMMIT_ATTEMPTS + 1):
+            # Re-read the policy for every retry - etag conflict means the snapshot is outdated
+            policy = self.__snapshot.get(refresh=attempt > 1)
+            changes = self.apply(policy)
+
+            if not changes:
+                self.__log.debug("No changes in IAM policy. Nothing to commit.")
+                break
+
+            if before_write is not None:
+                try:
+                    before_write()
+                except Exception:
+                    # Mutations were applied to the snapshot's policy in place - it must not be served any more
+                    self.__snapshot.invalidate()
+                    raise
+            try:
+                self.__snapshot.set(policy)
+            except Aborted as e:
+                self.__log.warning(f"IAM policy was changed concurrently (attempt {attempt}/{MAX_COMMIT_ATTEMPTS}). "
+                                   f"Batch will be re-applied. \nError: {e}")
+                if attempt == MAX_COMMIT_ATTEMPTS:
+                    raise
+                self.__snapshot.retry_policy.backoff("set_iam_policy", self.__snapshot.project_id, attempt)
+            else:
+                self.__log.info(f"Committed {changes} IAM policy changes in a single write.")
+                break
+
+        self.clear()
+        return changes
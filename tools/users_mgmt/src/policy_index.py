@@ -0,0 +1,163 @@
+# Copyright (c) 2024-2025 Accenture, All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+USER_KEYWORD = "user:"
+
+
+class PolicyIndex:
+    """IAM Policy Index Class
+
+    Two-way index of users and roles built once from an IAM policy.
+    Lookups by user or by role are exact matches done in constant time.
+    Roles and users are kept in the order in which they appear in the policy.
+    Index can be updated in place with roles added and removed, as if the change was made in the policy and indexed again.
+    """
+
+    def __init__(self, policy):
+        """IAM Policy Index Class Constructor
+
+        Args:
+            policy (google.iam.v1.policy_pb2.Policy): IAM policy to be indexed.
+        """
+        # {"user:user_id": {"roles/role_id": None}} - dict is used as an ordered set
+        self.__user_to_roles = {}
+        # {"roles/role_id": {"user:user_id": None}}
+        self.__role_to_users = {}
+        # {"roles/role_id": number of members which are not users} - role without any members is dropped from the policy
+        self.__other_members = {}
+        # Incremented on every change of the index
+        self.version = 0
+
+        for binding in policy.bindings:
+            role_users = self.__role_to_users.setdefault(binding.role, {})
+            for member in binding.members:
+                if member.startswith(USER_KEYWORD):
+                    role_users[member] = None
+                    self.__user_to_roles.setdefault(member, {})[binding.role] = None
+                else:
+                    self.__other_members[binding.role] = self.__other_members.get(binding.role, 0) + 1
+
+    def add_role(self, member, role):
+        """Add role to user.
+
+        Args:
+            member (string): user id. Format info: with the "user:" keyword.
+            role (string): role id. Format info: with the "roles/" keyword.
+
+        Returns:
+            bool: True if index was changed.
+        """
+        if self.has_role(member, role):
+            return False
+        self.__role_to_users.setdefault(role, {})[member] = None
+        self.__user_to_roles.setdefault(member, {})[role] = None
+        self.version += 1
+        return True
+
+    def remove_role(self, member, role):
+        """Remove role from user.
+
+        Args:
+            member (string): user id. Format info: with the "user:" keyword.
+            role (string): role id. Format info: with the "roles/" keyword.
+
+        Returns:
+            bool: True if index was changed.
+        """
+        if not self.has_role(member, role):
+            return False
+        del self.__user_to_roles[member][role]
+        if not self.__user_to_roles[member]:
+            del self.__user_to_roles[member]
+        del self.__role_to_users[role][member]
+        if not self.__role_to_users[role] and not self.__other_members.get(role):
+            del self.__role_to_users[role]
+        self.version += 1
+        return True
+
+    def remove_all_roles(self, member):
+        """Remove all roles from user.
+
+        Args:
+            member (string): user id. Format info: with the "user:" keyword.
+
+        Returns:
+            bool: True if index was changed.
+        """
+        changed = False
+        for role in self.roles_of(member):
+            changed = self.remove_role(member, role) or changed
+        return changed
+
+    def users(self):
+        """Retrieve all indexed users.
+
+        Returns:
+            list: users ids. Format info: with the "user:" keyword.
+        """
+        return list(self.__user_to_roles)
+
+    def roles(self):
+        """Retrieve all roles present in the policy.
+
+        Returns:
+            list: roles ids. Format info: with the "roles/" keyword.
+        """
+        return list(self.__role_to_users)
+
+    def roles_of(self, member):
+        """Retrieve roles assigned to given user.
+
+        Args:
+            member (string): user id. Format info: with the "user:" keyword.
+
+        Returns:
+            list: roles ids assigned to the user. Empty list if user has no roles.
+        """
+        return list(self.__user_to_roles.get(member, ()))
+
+    def users_of(self, role):
+        """Retrieve users assigned to given role.
+
+        Args:
+            role (string): role id. Format info: with the "roles/" keyword.
+
+        Returns:
+            list: users ids assigned to the role. Empty list if nobody has the role.
+        """
+        return list(self.__role_to_users.get(role, ()))
+
+    def has_role(self, member, role):
+        """Check if user has given role.
+
+        Args:
+            member (string): user id. Format info: with the "user:" keyword.
+            role (string): role id. Format info: with the "roles/" keyword.
+
+        Returns:
+            bool: True if user has the role.
+        """
+        return role in self.__user_to_roles.get(member, ())
+
+    def has_binding(self, role):
+        """Check if there is a binding for given role in the policy.
+
+        Args:
+            role (string): role id. Format info: with the "roles/" keyword.
+
+        Returns:
+            bool: True if role is present in the policy.
+        """
+        return role in self.__role_to_users
@@ -0,0 +1,159 @@
+# Copyright (c) 2024-2025 Accenture, All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from policy_index import PolicyIndex
+
+
+class PolicySnapshot:
+    """IAM Policy Snapshot Class
+
+    Keeps a single in-memory copy of the project's IAM policy, so that all read operations
+    performed during one script execution are served without calling Google Cloud Platform again.
+    The copy is replaced only when a write returns a policy with a new etag.
+    """
+
+    def __init__(self, clients, resource, logger):
+        """IAM Policy Snapshot Class Constructor
+
+        Args:
+            clients (clients.Clients): Google Cloud Platform clients shared by the script
+            resource (string): Resource name. Format: "projects/<project_id>"
+            logger (logging.Logger): logger
+        """
+        self.__clients = clients
+        self.resource = resource
+        self.project_id = resource.split("/", 1)[-1]
+        self.stats = clients.stats
+        self.retry_policy = clients.retry_policy
+        self.__log = logger
+        self.__policy = None
+        self.__index = None
+
+    @property
+    def etag(self):
+        """Etag of the policy held in the snapshot.
+
+        Returns:
+            bytes: etag of the current policy or None if the policy was not fetched yet.
+        """
+        return self.__policy.etag if self.__policy is not None else None
+
+    @staticmethod
+    def __policy_size(policy):
+        """Size of serialized policy.
+
+        Args:
+            policy (google.iam.v1.policy_pb2.Policy): IAM policy
+
+        Returns:
+            int: size in bytes or 0 if it cannot be determined.
+        """
+        byte_size = getattr(policy, "ByteSize", None)
+        return byte_size() if callable(byte_size) else 0
+
+    def __get_iam_policy(self):
+        """Single get_iam_policy call.
+
+        Returns:
+            google.iam.v1.policy_pb2.Policy: IAM policy of the project.
+        """
+        with self.stats.track("get_iam_policy", self.project_id) as call:
+            policy = self.__clients.projects_client.get_iam_policy(request={"resource": self.resource})
+            call.bytes = self.__policy_size(policy)
+        return policy
+
+    def __set_iam_policy(self, policy):
+        """Single set_iam_policy call, limited by the project's rate limiter.
+
+        Args:
+            policy (google.iam.v1.policy_pb2.Policy): IAM policy to be set.
+
+        Returns:
+            google.iam.v1.policy_pb2.Policy: IAM policy returned by GCP after update.
+        """
+        self.__clients.set_policy_limiter(self.project_id).acquire()
+        with self.stats.track("set_iam_policy", self.project_id) as call:
+            new_policy = self.__clients.projects_client.set_iam_policy(
+                request={
+                    "resource": self.resource,
+                    "policy": policy
+                }
+            )
+            call.bytes = self.__policy_size(policy) + self.__policy_size(new_policy)
+        return new_policy
+
+    def get(self, refresh=False):
+        """Retrieve IAM policy.
+
+        The policy is fetched from GCP only at first call, when snapshot was invalidated or when refresh is requested.
+
+        Args:
+            refresh (bool): If True - fetch the policy from GCP even if the snapshot already holds one.
+
+        Returns:
+            google.iam.v1.policy_pb2.Policy: IAM policy of the project.
+        """
+
+        if self.__policy is None or refresh:
+            self.__policy = self.__clients.retry_policy.call("get_iam_policy", self.project_id, self.__get_iam_policy)
+            self.__index = None
+            self.__log.debug(f"Fetched IAM policy for {self.resource}. Etag: {self.etag}")
+
+        return self.__policy
+
+    def set(self, policy):
+        """Write IAM policy.
+
+        Policy returned by GCP (with new etag) replaces the snapshot.
+        If the write fails the snapshot is invalidated, so the next read fetches current policy.
+
+        Args:
+            policy (google.iam.v1.policy_pb2.Policy): IAM policy to be set.
+
+        Returns:
+            google.iam.v1.policy_pb2.Policy: IAM policy returned by GCP after update.
+        """
+
+        try:
+            self.__policy = self.__clients.retry_policy.call("set_iam_policy", self.project_id,
+                                                             lambda: self.__set_iam_policy(policy))
+        except Exception:
+            self.invalidate()
+            raise
+        self.__index = None
+
+        self.__log.debug(f"Updated IAM policy for {self.resource}. New etag: {self.etag}")
+        return self.__policy
+
+    def index(self):
+        """Retrieve users <-> roles index of the policy.
+
+        Index is built once per policy version and rebuilt only when the policy changes.
+
+        Returns:
+            policy_index.PolicyIndex: index of the current policy.
+        """
+
+        policy = self.get()
+        if self.__index is None:
+            self.__index = PolicyIndex(policy)
+        return self.__index
+
+    def invalidate(self):
+        """Drop the policy held in the snapshot.
+
+        Next call of `get` fetches the policy from GCP.
+        """
+        self.__policy = None
+        self.__index = None
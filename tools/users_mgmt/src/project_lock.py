@@ -0,0 +1,551 @@
+# Copyright (c) 2024-2025 Accenture, All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import getpass
+import json
+import os
+import socket
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:
+    # Windows
+    fcntl = None
+    import msvcrt
+
+
+LOCK_DIRNAME = "locks"  # directory with lock files and queues in the output directory
+DEFAULT_LOCK_WAIT = 300  # seconds
+LOCK_TTL = 300  # seconds after which a GCS lock of a crashed run is taken over
+POLL_INTERVAL = 0.2  # seconds
+GCS_LOCK_PREFIX = "users_mgmt_locks/"
+
+
+def owner_description():
+    """Describe the current process as a lock owner.
+
+    Returns:
+        dict: Format:
+                {"owner": "user@host:pid", "acquired_at": ISO 8601 string}
+    """
+    try:
+        user = getpass.getuser()
+    except Exception:
+        user = "unknown"
+    return {"owner": f"{user}@{socket.gethostname()}:{os.getpid()}", "acquired_at": datetime.now(timezone.utc).isoformat()}
+
+
+class LocalLock:
+    """Local Lock File Class
+
+    Advisory, exclusive lock of a project held with a lock file, shared by all runs on the machine.
+    The operating system releases the lock when the holding process ends, so a crashed run never blocks others.
+    The file contains description of the current holder.
+    """
+
+    def __init__(self, lock_dir, project_id, logger):
+        """Local Lock File Class Constructor
+
+        Args:
+            lock_dir (string): Path to directory with lock files
+            project_id (string): project id
+            logger (logging.Logger): logger
+        """
+        self.__path = Path(lock_dir) / f"{project_id}.lock"
+        self.__log = logger
+        self.__file = None
+
+    def __try_lock(self, file):
+        """Try to lock opened lock file without waiting.
+
+        Args:
+            file (io.TextIOBase): opened lock file
+
+        Returns:
+            bool: True if lock was acquired.
+        """
+        try:
+            if fcntl is not None:
+                fcntl.flock(file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                # Byte at the current position is locked - all runs must lock the first byte
+                file.seek(0)
+                msvcrt.locking(file.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError:
+            return False
+        return True
+
+    def holder(self):
+        """Retrieve description of the current holder.
+
+        Returns:
+            dict: holder description (see `owner_description`) or None if it is not known.
+        """
+        try:
+            with self.__path.open("r", encoding="utf-8") as file:
+                return json.loads(file.read() or "null")
+        except (OSError, ValueError):
+            return None
+
+    def acquire(self, timeout):
+        """Acquire the lock.
+
+        Args:
+            timeout (float): Maximal time (in seconds) to wait for the lock
+
+        Returns:
+            bool: True if lock was acquired.
+
+        Raises:
+            RuntimeError: Raised if the lock file cannot be created or opened (e.g. it belongs to another user).
+        """
+
+        try:
+            self.__path.parent.mkdir(parents=True, exist_ok=True)
+            file = open(self.__path, "a+", encoding="utf-8")
+        except PermissionError as e:
+            raise RuntimeError(f"Lock file {self.__path} cannot be opened. All runs sharing the lock directory "
+                               f"must be able to write to it. \nError: {e}")
+        deadline = time.monotonic() + timeout
+
+        while not self.__try_lock(file):
+            if time.monotonic() >= deadline:
+                file.close()
+                return False
+            time.sleep(POLL_INTERVAL)
+
+        file.seek(0)
+        file.truncate()
+        file.write(json.dumps(owner_description()))
+        file.flush()
+        self.__file = file
+        return True
+
+    def release(self):
+        """Release the lock."""
+
+        if self.__file is None:
+            return
+        self.__file.seek(0)
+        self.__file.truncate()
+        self.__file.flush()
+        if fcntl is None:
+            self.__file.seek(0)
+            msvcrt.locking(self.__file.fileno(), msvcrt.LK_UNLCK, 1)
+        # Closing the file releases the lock
+        self.__file.close()
+        self.__file = None
+
+    def renew(self):
+        """Confirm the lock is still held. Lock file is held until it is released, so there is nothing to renew."""
+
+
+class GcsLock:
+    """Cloud Storage Lock Class
+
+    Advisory, exclusive lock of a project held as an object in a Cloud Storage bucket, shared by runs on all machines.
+    The object is created only if it does not exist (generation precondition) and deleted only by its holder.
+    The holder renews the object before each write done under the lock, so a lock whose TTL passed (holder crashed)
+    is taken over, but a working holder never loses it unnoticed.
+    """
+
+    def __init__(self, bucket, project_id, logger, ttl=LOCK_TTL):
+        """Cloud Storage Lock Class Constructor
+
+        Args:
+            bucket (google.cloud.storage.Bucket): bucket where lock objects are stored
+            project_id (string): project id
+            logger (logging.Logger): logger
+            ttl (float): Time (in seconds) after which the lock is considered abandoned
+        """
+        self.__bucket = bucket
+        self.__name = f"{GCS_LOCK_PREFIX}{project_id}.lock"
+        self.__log = logger
+        self.__ttl = ttl
+        self.__generation = None
+        self.__description = None
+
+    def holder(self):
+        """Retrieve description of the current holder.
+
+        Returns:
+            dict: holder description (see `owner_description`) with "expires_at" key or None if the lock is free.
+        """
+        from google.api_core.exceptions import NotFound, PreconditionFailed
+
+        blob = self.__bucket.get_blob(self.__name)
+        if blob is None:
+            return None
+        try:
+            return dict(json.loads(blob.download_as_bytes(if_generation_match=blob.generation)), generation=blob.generation)
+        except (NotFound, PreconditionFailed, ValueError):
+            # Lock was released or renewed in the meantime
+            return None
+
+    def __try_lock(self):
+        """Try to create the lock object without waiting.
+
+        Abandoned lock object is deleted first.
+
+        Returns:
+            bool: True if lock was acquired.
+        """
+        from google.api_core.exceptions import NotFound, PreconditionFailed
+
+        description = owner_description()
+        description["expires_at"] = time.time() + self.__ttl
+        blob = self.__bucket.blob(self.__name)
+        try:
+            blob.upload_from_string(json.dumps(description), content_type="application/json", if_generation_match=0)
+        except PreconditionFailed:
+            holder = self.holder()
+            if holder is not None and holder.get("expires_at", 0) < time.time():
+                self.__log.warning(f"Lock {self.__name} held by {holder.get('owner')} expired. It is taken over.")
+                try:
+                    self.__bucket.blob(self.__name).delete(if_generation_match=holder["generation"])
+                except (NotFound, PreconditionFailed):
+                    pass
+            return False
+
+        self.__generation = blob.generation
+        self.__description = description
+        return True
+
+    def acquire(self, timeout):
+        """Acquire the lock.
+
+        Args:
+            timeout (float): Maximal time (in seconds) to wait for the lock
+
+        Returns:
+            bool: True if lock was acquired.
+        """
+
+        deadline = time.monotonic() + timeout
+        while not self.__try_lock():
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(POLL_INTERVAL)
+        return True
+
+    def release(self):
+        """Release the lock."""
+        from google.api_core.exceptions import NotFound, PreconditionFailed
+
+        if self.__generation is None:
+            return
+        try:
+            self.__bucket.blob(self.__name).delete(if_generation_match=self.__generation)
+        except (NotFound, PreconditionFailed):
+            self.__log.warning(f"Lock {self.__name} was taken over before it was released.")
+        self.__generation = None
+
+    def renew(self):
+        """Extend the lock's TTL, if it is still held by this run.
+
+        Raises:
+            RuntimeError: Raised if the lock is not held (e.g. it expired and was taken over by another run).
+        """
+        from google.api_core.exceptions import NotFound, PreconditionFailed
+
+        if self.__generation is None:
+            raise RuntimeError(f"Lock {self.__name} is not held.")
+        description = dict(self.__description, expires_at=time.time() + self.__ttl)
+        blob = self.__bucket.blob(self.__name)
+        try:
+            blob.upload_from_string(json.dumps(description), content_type="application/json",
+                                    if_generation_match=self.__generation)
+        except (NotFound, PreconditionFailed):
+            self.__generation = None
+            raise RuntimeError(f"Lock {self.__name} expired and was taken over by another run.")
+        self.__generation = blob.generation
+        self.__description = description
+
+
+class MutationQueue:
+    """Mutation Queue Class
+
+    Queue of IAM policy mutations of runs waiting for a project's lock. Each waiting run puts its mutations in the queue,
+    the lock holder merges them into its commit and leaves the result for each of them.
+    Entries are files: `<id>.json` - waiting, `<id>.claimed` - taken by the holder, `<id>.result` - result of the commit.
+    """
+
+    def __init__(self, lock_dir, project_id, logger):
+        """Mutation Queue Class Constructor
+
+        Args:
+            lock_dir (string): Path to directory with lock files
+            project_id (string): project id
+            logger (logging.Logger): logger
+        """
+        self.__dir = Path(lock_dir) / f"{project_id}.queue"
+        self.__log = logger
+
+    def enqueue(self, mutations):
+        """Put mutations in the queue.
+
+        Args:
+            mutations (list): mutations exported from policy_batch.PolicyBatch
+
+        Returns:
+            string: entry id
+        """
+
+        self.__dir.mkdir(parents=True, exist_ok=True)
+        entry_id = f"{time.time_ns()}_{uuid.uuid4().hex}"
+        tmp_path = self.__dir / f"{entry_id}.tmp"
+        with tmp_path.open("w", encoding="utf-8") as file:
+            json.dump(dict(owner_description(), mutations=mutations), file)
+        os.replace(tmp_path, self.__dir / f"{entry_id}.json")
+        return entry_id
+
+    def withdraw(self, entry_id):
+        """Remove entry which was not taken by the holder yet.
+
+        Args:
+            entry_id (string): entry id
+
+        Returns:
+            bool: True if entry was removed. False if the holder already took it.
+        """
+        try:
+            os.remove(self.__dir / f"{entry_id}.json")
+        except FileNotFoundError:
+            return False
+        return True
+
+    def claim(self):
+        """Take all waiting entries. Called by the lock holder.
+
+        Returns:
+            list: entries in order of arrival. Format:
+                    [{"id", "owner", "mutations"}]
+        """
+
+        entries = []
+        for path in sorted(self.__dir.glob("*.json")) if self.__dir.is_dir() else []:
+            claimed_path = path.with_suffix(".claimed")
+            try:
+                # Rename is atomic - entry withdrawn in the meantime is skipped
+                os.replace(path, claimed_path)
+            except FileNotFoundError:
+                continue
+            with claimed_path.open("r", encoding="utf-8") as file:
+                entries.append(dict(json.load(file), id=path.stem))
+        return entries
+
+    def resolve(self, entry_id, result):
+        """Leave result for the run which queued the entry. Called by the lock holder.
+
+        Args:
+            entry_id (string): entry id
+            result (dict): result. Format: {"status": bool, "changes": int, "holder": string, "error": string or None}
+        """
+
+        tmp_path = self.__dir / f"{entry_id}.tmp"
+        with tmp_path.open("w", encoding="utf-8") as file:
+            json.dump(result, file)
+        os.replace(tmp_path, self.__dir / f"{entry_id}.result")
+        (self.__dir / f"{entry_id}.claimed").unlink(missing_ok=True)
+
+    def result(self, entry_id):
+        """Take result of the entry.
+
+        Args:
+            entry_id (string): entry id
+
+        Returns:
+            dict: result (see `resolve`) or None if it is not available yet.
+        """
+        result_path = self.__dir / f"{entry_id}.result"
+        try:
+            with result_path.open("r", encoding="utf-8") as file:
+                result = json.load(file)
+        except FileNotFoundError:
+            return None
+        result_path.unlink(missing_ok=True)
+        return result
+
+
+class ProjectLock:
+    """Project Lock Class
+
+    Serializes IAM policy commits of all runs (processes, also on other machines if a Cloud Storage bucket is used)
+    for one project. Only the commit is done under the lock, so runs read, plan and collect their changes concurrently.
+    In queue-and-merge mode, a run which finds the lock taken puts its changes in the queue instead of waiting;
+    the holder merges all queued changes into its commit, so many waiting runs cost a single IAM policy write.
+    """
+
+    def __init__(self, project_id, logger, lock_dir, bucket=None, wait=DEFAULT_LOCK_WAIT, queue_merge=False):
+        """Project Lock Class Constructor
+
+        Args:
+            project_id (string): project id
+            logger (logging.Logger): logger
+            lock_dir (string): Path to directory with local lock files and queues
+            bucket (google.cloud.storage.Bucket): bucket for lock objects shared by machines. Local lock only, if not given.
+            wait (float): Maximal time (in seconds) to wait for the lock or for the result of queued changes
+            queue_merge (bool): If True - changes are queued for the holder instead of waiting for the lock
+        """
+        self.__project_id = project_id
+        self.__log = logger
+        self.__locks = [LocalLock(lock_dir=lock_dir, project_id=project_id, logger=logger)]
+        if bucket is not None:
+            self.__locks.append(GcsLock(bucket=bucket, project_id=project_id, logger=logger))
+        self.__queue = MutationQueue(lock_dir=lock_dir, project_id=project_id, logger=logger)
+        self.__wait = wait
+        self.__queue_merge = queue_merge
+        # True if changes of the last commit were merged into a commit of another run
+        self.committed_by_other = False
+
+    def holder(self):
+        """Describe the current holder of the lock.
+
+        Returns:
+            string: holder or "unknown".
+        """
+        for lock in reversed(self.__locks):
+            holder = lock.holder()
+            if holder:
+                return holder.get("owner", "unknown")
+        return "unknown"
+
+    def acquire(self, timeout):
+        """Acquire all locks.
+
+        Args:
+            timeout (float): Maximal time (in seconds) to wait
+
+        Returns:
+            bool: True if all locks were acquired.
+        """
+
+        deadline = time.monotonic() + timeout
+        acquired = []
+        for lock in self.__locks:
+            if not lock.acquire(timeout=max(deadline - time.monotonic(), 0)):
+                for held_lock in reversed(acquired):
+                    held_lock.release()
+                return False
+            acquired.append(lock)
+        return True
+
+    def release(self):
+        """Release all locks."""
+        for lock in reversed(self.__locks):
+            lock.release()
+
+    def renew(self):
+        """Renew all held locks. Called before each IAM policy write done under the lock.
+
+        Raises:
+            RuntimeError: Raised if a lock is no longer held.
+        """
+        for lock in self.__locks:
+            lock.renew()
+
+    def __commit_as_holder(self, batch):
+        """Commit the batch together with queued changes of other runs. Lock must be held.
+
+        Args:
+            batch (policy_batch.PolicyBatch): changes of this run
+
+        Raises:
+            Exception: error of the commit. Runs whose changes were merged get it as their result.
+
+        Returns:
+            int: number of changes written to the policy.
+        """
+
+        entries = self.__queue.claim()
+        for entry in entries:
+            batch.extend(entry["mutations"])
+        if entries:
+            self.__log.info(f"Changes of {len(entries)} waiting runs ({', '.join(entry['owner'] for entry in entries)}) "
+                            f"are merged into this commit.")
+
+        holder = owner_description()["owner"]
+        try:
+            changes = batch.commit(before_write=self.renew)
+        except Exception as e:
+            for entry in entries:
+                self.__queue.resolve(entry["id"], {"status": False, "changes": 0, "holder": holder, "error": str(e)})
+            raise
+        for entry in entries:
+            self.__queue.resolve(entry["id"], {"status": True, "changes": changes, "holder": holder, "error": None})
+        return changes
+
+    def commit(self, batch):
+        """Commit the batch under the project's lock.
+
+        Args:
+            batch (policy_batch.PolicyBatch): changes to commit
+
+        Raises:
+            TimeoutError: Raised if the lock (or the result of queued changes) was not available within the wait time.
+            RuntimeError: Raised if queued changes were merged into a commit of another run which failed,
+                          if the lock was lost before the IAM policy write or the lock file cannot be opened.
+
+        Returns:
+            int: number of changes written to the policy (in queue-and-merge mode possibly by another run, with its changes).
+        """
+
+        self.committed_by_other = False
+        if not len(batch):
+            return 0
+
+        if self.acquire(timeout=0 if self.__queue_merge else self.__wait):
+            try:
+                return self.__commit_as_holder(batch)
+            finally:
+                self.release()
+
+        if not self.__queue_merge:
+            raise TimeoutError(f"Lock of project {self.__project_id} is held by {self.holder()} for more than {self.__wait}s. "
+                               f"Changes were not applied.")
+
+        entry_id = self.__queue.enqueue(batch.export())
+        self.__log.info(f"Lock of project {self.__project_id} is held by {self.holder()}. "
+                        f"{len(batch)} changes are queued to be merged into its commit.")
+        deadline = time.monotonic() + self.__wait
+
+        while True:
+            result = self.__queue.result(entry_id)
+            if result is None and self.acquire(timeout=POLL_INTERVAL):
+                try:
+                    # Holder which took the entry left its result before releasing the lock
+                    result = self.__queue.result(entry_id)
+                    if result is None:
+                        # Holder finished without taking the entry - this run commits its own and queued changes
+                        self.__queue.withdraw(entry_id)
+                        return self.__commit_as_holder(batch)
+                finally:
+                    self.release()
+
+            if result is not None:
+                if not result["status"]:
+                    raise RuntimeError(f"Queued changes were merged into commit of {result['holder']} which failed. "
+                                       f"\nError: {result['error']}")
+                batch.clear()
+                self.committed_by_other = True
+                self.__log.info(f"Queued changes were committed by {result['holder']} ({result['changes']} changes in the merged commit).")
+                return result["changes"]
+
+            if time.monotonic() >= deadline and self.__queue.withdraw(entry_id):
+                raise TimeoutError(f"Queued changes of project {self.__project_id} were not committed within {self.__wait}s. "
+                                   f"They were withdrawn and not applied.")
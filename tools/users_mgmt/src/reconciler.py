@@ -0,0 +1,201 @@
+# Copyright (c) 2024-2025 Accenture, All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from backup_store import BackupStore
+
+
+DEFAULT_INTERVAL = 15 * 60  # seconds
+CYCLES_FILENAME = "Reconcile_cycles.jsonl"
+
+
+class Reconciler:
+    """Continuous Reconciliation Class
+
+    Keeps users' GCP roles in line with users' configuration. Every interval the IAM policy is polled (one read) and
+    the plan is computed only if the policy etag or the configuration files changed since the previous cycle.
+    Only the planned delta is applied, with a single write. Clients and credentials are reused by all cycles.
+    Each cycle is recorded in `Reconcile_cycles.jsonl` in the output directory.
+    """
+
+    def __init__(self, roles_management, operations_management, horizon_roles_file_path, users_file_path, logger,
+                 interval=DEFAULT_INTERVAL, force_overwrite=False, dry_run=False, max_cycles=0, stop_event=None):
+        """Continuous Reconciliation Class Constructor
+
+        Args:
+            roles_management (roles_mgmt.RolesMgmt): Roles Management class instance
+            operations_management (operations.Operation): Operations class instance
+            horizon_roles_file_path (string): Path to JSON file with Horizon roles mapping
+            users_file_path (string): Path to JSON file with users' configuration
+            logger (logging.Logger): logger
+            interval (float): Time (in seconds) between starts of consecutive cycles
+            force_overwrite (bool): if True - roles not listed in configuration are removed. If False - only missing roles are added.
+            dry_run (bool): If True - plans are only logged, IAM policy is not changed.
+            max_cycles (int): Number of cycles after which reconciliation stops. 0 - run until stopped.
+            stop_event (threading.Event): event which stops reconciliation when set
+        """
+        self.__roles_mgmt = roles_management
+        self.__operation_mgmt = operations_management
+        self.__horizon_roles_file_path = horizon_roles_file_path
+        self.__users_file_path = users_file_path
+        self.__log = logger
+        self.__interval = interval
+        self.__force_overwrite = force_overwrite
+        self.__dry_run = dry_run
+        self.__max_cycles = max_cycles
+        self.__stop_event = stop_event if stop_event is not None else threading.Event()
+        self.__files_fingerprint = None
+        self.__users_conf_list = None
+        self.__reconciled_etag = None
+
+    @staticmethod
+    def __fingerprint(file_paths):
+        """Fingerprint of files' content versions.
+
+        Args:
+            file_paths (list): Paths to files
+
+        Returns:
+            tuple: modification time and size of each file (None for missing files).
+        """
+        fingerprint = []
+        for file_path in file_paths:
+            try:
+                stat = os.stat(file_path)
+                fingerprint.append((stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                fingerprint.append(None)
+        return tuple(fingerprint)
+
+    def __reload_configuration(self):
+        """Load configuration files if they changed since the previous cycle.
+
+        If changed files are incorrect, the previous configuration is kept.
+
+        Returns:
+            bool: True if configuration was (re)loaded in this cycle.
+        """
+
+        fingerprint = self.__fingerprint([self.__horizon_roles_file_path, self.__users_file_path])
+        if fingerprint == self.__files_fingerprint:
+            return False
+        self.__files_fingerprint = fingerprint
+
+        self.__log.info("Configuration files changed. Configuration is reloaded.")
+        if not self.__roles_mgmt.horizon_roles_mgmt(horizon_roles_file_path=self.__horizon_roles_file_path):
+            self.__log.error("Horizon roles file is incorrect. Previous configuration is kept.")
+            return False
+        try:
+            users_conf_list = self.__roles_mgmt.load_users_configuration(users_list_file_path=self.__users_file_path)
+        except (FileNotFoundError, json.decoder.JSONDecodeError):
+            users_conf_list = None
+        if users_conf_list is None:
+            self.__log.error("Users file is incorrect. Previous configuration is kept.")
+            return False
+
+        self.__users_conf_list = users_conf_list
+        return True
+
+    def cycle(self, number):
+        """Run single reconciliation cycle.
+
+        Args:
+            number (int): number of the cycle
+
+        Returns:
+            dict: record of the cycle. Format:
+                    {
+                        "cycle", "started_at", "elapsed_s", "etag", "files_changed", "policy_changed",
+                        "planned_changes", "applied_changes", "error"
+                    }
+        """
+
+        start_time = time.perf_counter()
+        record = {"cycle": number, "started_at": datetime.now(timezone.utc).isoformat(), "elapsed_s": None, "etag": None,
+                  "files_changed": False, "policy_changed": False, "planned_changes": 0, "applied_changes": 0, "error": None}
+
+        try:
+            record["files_changed"] = self.__reload_configuration()
+            if self.__users_conf_list is None:
+                raise ValueError("There is no correct configuration to reconcile.")
+
+            # Polling the policy is the only read of the cycle - plan and commit reuse the fetched policy
+            policy = self.__operation_mgmt.policy_snapshot.get(refresh=True)
+            record["etag"] = BackupStore.encode_etag(policy.etag)
+            record["policy_changed"] = policy.etag != self.__reconciled_etag
+
+            if record["files_changed"] or record["policy_changed"]:
+                plan, _ = self.__roles_mgmt.plan_users_mgmt(users_conf_list=self.__users_conf_list, force_overwrite=self.__force_overwrite)
+                plan.log(self.__log)
+                record["planned_changes"] = plan.changes_count()
+
+                if self.__dry_run:
+                    self.__log.info("Dry run. Planned changes are not applied.")
+                else:
+                    record["applied_changes"] = self.__roles_mgmt.apply_plan(plan=plan)
+                # In dry run the same drift is not planned again until the policy or configuration changes
+                self.__reconciled_etag = self.__operation_mgmt.policy_snapshot.etag
+                record["etag"] = BackupStore.encode_etag(self.__reconciled_etag)
+            else:
+                self.__log.info("IAM policy and configuration did not change. Nothing to reconcile.")
+        except Exception as e:
+            self.__log.error(f"Reconciliation cycle {number} failed. \nError: {e}")
+            record["error"] = str(e)
+            # Next cycle computes the plan again, even if nothing changes in the meantime
+            self.__reconciled_etag = None
+
+        record["elapsed_s"] = round(time.perf_counter() - start_time, 3)
+        return record
+
+    def __save_cycle(self, record):
+        """Append cycle record to the cycles file.
+
+        Args:
+            record (dict): record of the cycle
+        """
+        output_path = Path(self.__operation_mgmt.out_dir)
+        output_path.mkdir(parents=True, exist_ok=True)
+        with (output_path / CYCLES_FILENAME).open("a", encoding="utf-8") as file:
+            file.write(json.dumps(record) + "\n")
+
+    def run(self):
+        """Run reconciliation cycles until stopped or until `max_cycles` cycles are done.
+
+        Returns:
+            bool: True if the last cycle succeeded.
+        """
+
+        self.__log.info(f"Reconciliation started. Interval: {self.__interval}s.")
+        number = 0
+        record = None
+
+        while not self.__stop_event.is_set():
+            number += 1
+            record = self.cycle(number)
+            self.__save_cycle(record)
+            self.__log.info(f"Reconciliation cycle {number}: {record['applied_changes']} changes applied "
+                            f"({record['planned_changes']} planned) in {record['elapsed_s']}s.")
+
+            if self.__max_cycles and number >= self.__max_cycles:
+                break
+            self.__stop_event.wait(max(self.__interval - record["elapsed_s"], 0))
+
+        self.__log.info(f"Reconciliation stopped after {number} cycles.")
+        return record is not None and record["error"] is None
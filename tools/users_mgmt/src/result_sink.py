@@ -0,0 +1,196 @@
+# Copyright (c) 2024-2025 Accenture, All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import gzip
+import json
+from enum import Enum
+from itertools import islice
+from pathlib import Path
+
+try:
+    # Optional, faster encoder - standard json module is used if it is not installed
+    import orjson
+except ImportError:
+    orjson = None
+
+
+INDENT = 4
+COMPRESS_LEVEL = 6
+CHUNK_SIZE = 1000  # records encoded together
+
+
+class ResultSink:
+    """Operations Results Sink Class
+
+    Writes results of operations to files in the output directory. Records are encoded and written in chunks
+    as they are produced, so results are never held in memory as one big encoded document.
+    Results can be written as indented JSON (default), compact JSON or JSON Lines, optionally compressed with gzip.
+    Compact formats are encoded with `orjson` if it is installed.
+    Every result gets its own file: if a file name was already used during the run, a number is appended to it.
+    """
+
+    def __init__(self, output_dir, logger, output_format=None, compress=False):
+        """Operations Results Sink Class Constructor
+
+        Args:
+            output_dir (string): Path to directory where to store output files
+            logger (logging.Logger): logger
+            output_format (result_sink.ResultSink.Format): format of output files. Indented JSON if not given.
+            compress (bool): If True - files are compressed with gzip
+        """
+        self.__dir = Path(output_dir)
+        self.__log = logger
+        self.__format = output_format or self.Format.JSON
+        self.__compress = compress
+        self.__dir_ready = False
+        # {file name: number of results saved under this name}
+        self.__names = {}
+
+    class Format(Enum):
+        """Output Formats Enum
+
+        Possible formats of output files. Values are used as command line choices.
+        """
+        JSON = "json"
+        COMPACT = "compact"
+        JSONL = "jsonl"
+
+    def __encode(self, value):
+        """Encode single value.
+
+        Args:
+            value (object): value to be encoded
+
+        Returns:
+            bytes: encoded value
+        """
+        if self.__format == self.Format.JSON:
+            return json.dumps(value, indent=INDENT).encode("utf-8")
+        if orjson is not None:
+            return orjson.dumps(value)
+        return json.dumps(value, separators=(",", ":")).encode("utf-8")
+
+    def __path(self, name):
+        """Path of the next output file with given name.
+
+        Args:
+            name (string): file name without extension
+
+        Returns:
+            pathlib.Path: file path
+        """
+
+        count = self.__names.get(name, 0) + 1
+        self.__names[name] = count
+        extension = ".jsonl" if self.__format == self.Format.JSONL else ".json"
+        if self.__compress:
+            extension += ".gz"
+        return self.__dir / f"{name if count == 1 else f'{name}_{count}'}{extension}"
+
+    def __records(self, data):
+        """Split data into records.
+
+        Args:
+            data (dict, list or iterable): data to be saved. Iterables of (key, value) pairs are marked with `ResultSink.items`.
+
+        Returns:
+            tuple (bool, iterable): True if data is a mapping, and its records - (key, value) pairs or values.
+        """
+        if isinstance(data, dict):
+            return True, data.items()
+        if isinstance(data, self.__Items):
+            return True, data.items
+        return False, data
+
+    class __Items:
+        """Lazily produced mapping - iterable of (key, value) pairs."""
+
+        def __init__(self, items):
+            self.items = items
+
+    @classmethod
+    def items(cls, pairs):
+        """Mark iterable of (key, value) pairs, so it is saved as JSON object.
+
+        Args:
+            pairs (iterable): (key, value) pairs. They are consumed while the file is written.
+
+        Returns:
+            object: data which can be passed to `write`.
+        """
+        return cls.__Items(pairs)
+
+    def __write_records(self, file, is_mapping, records):
+        """Write records to opened file.
+
+        Args:
+            file (io.BufferedIOBase): file opened in binary mode
+            is_mapping (bool): True if records are (key, value) pairs
+            records (iterable): records
+
+        Returns:
+            int: number of written records.
+        """
+
+        count = 0
+        if self.__format == self.Format.JSONL:
+            for record in records:
+                file.write(self.__encode(dict([record]) if is_mapping else record) + b"\n")
+                count += 1
+            return count
+
+        # Each chunk is encoded as a whole object or array and written without its brackets,
+        # so the file is the same as if the whole data was encoded at once
+        pretty = self.__format == self.Format.JSON
+        separator, margin = (b",\n", 2) if pretty else (b",", 1)
+        opening, closing = (b"{", b"}") if is_mapping else (b"[", b"]")
+        records = iter(records)
+
+        file.write(opening)
+        while chunk := list(islice(records, CHUNK_SIZE)):
+            encoded = self.__encode(dict(chunk) if is_mapping else chunk)
+            file.write(separator if count else (b"\n" if pretty else b""))
+            file.write(encoded[margin:-margin])
+            count += len(chunk)
+        file.write((b"\n" if pretty and count else b"") + closing)
+        return count
+
+    def write(self, name, data):
+        """Save data to a new output file.
+
+        Args:
+            name (string): file name without extension
+            data (dict, list or iterable): data to be saved. Dictionaries and pairs marked with `ResultSink.items`
+                                           are saved as JSON objects (JSON Lines: one single-key object per line),
+                                           other iterables as JSON arrays (JSON Lines: one value per line).
+
+        Returns:
+            pathlib.Path: path of the saved file.
+        """
+
+        if not self.__dir_ready:
+            self.__dir.mkdir(parents=True, exist_ok=True)
+            self.__dir_ready = True
+
+        file_path = self.__path(name)
+        is_mapping, records = self.__records(data)
+        if self.__compress:
+            file = gzip.open(file_path, "wb", compresslevel=COMPRESS_LEVEL)
+        else:
+            file = open(file_path, "wb")
+        with file:
+            count = self.__write_records(file, is_mapping, records)
+
+        self.__log.info(f"Data ({count} records) is saved in a file '{file_path}'.")
+        return file_path
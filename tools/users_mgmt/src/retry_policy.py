@@ -0,0 +1,168 @@
+# Copyright (c) 2024-2025 Accenture, All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import random
+import threading
+import time
+
+
+MAX_ATTEMPTS = 6
+INITIAL_DELAY = 1.0  # seconds
+MAX_DELAY = 32.0  # seconds
+MULTIPLIER = 2.0
+# Status codes of errors which are worth retrying (quota exceeded and server errors)
+RETRYABLE_STATUS_CODES = (429, 500, 502, 503, 504)
+SET_POLICY_RATE = 1.0  # set_iam_policy calls per second per project
+SET_POLICY_BURST = 5
+
+
+class RetryPolicy:
+    """Retry Policy Class
+
+    Retries calls failing with transient errors (quota exceeded, server errors)
+    with exponential backoff and full jitter, so concurrent clients do not retry in lockstep.
+    The same policy is shared by all calls made by the script.
+    """
+
+    def __init__(self, logger, stats, max_attempts=MAX_ATTEMPTS, initial_delay=INITIAL_DELAY, max_delay=MAX_DELAY,
+                 multiplier=MULTIPLIER, sleep=time.sleep):
+        """Retry Policy Class Constructor
+
+        Args:
+            logger (logging.Logger): logger
+            stats (rpc_stats.RpcStats): statistics where retries are counted
+            max_attempts (int): Maximal number of attempts of one call (including the first one)
+            initial_delay (float): Upper bound of the delay (in seconds) before the first retry
+            max_delay (float): Maximal delay (in seconds) before a retry
+            multiplier (float): Factor by which the delay bound grows with every retry
+            sleep (function): function used to wait
+        """
+        self.__log = logger
+        self.__stats = stats
+        self.max_attempts = max_attempts
+        self.__initial_delay = initial_delay
+        self.__max_delay = max_delay
+        self.__multiplier = multiplier
+        self.__sleep = sleep
+
+    @staticmethod
+    def is_retryable(error):
+        """Check if error is transient and call can be retried.
+
+        Args:
+            error (Exception): error raised by the call
+
+        Returns:
+            bool: True if call can be retried.
+        """
+        # Imported only when a call fails - the libraries are already loaded by the call itself
+        from google.api_core.exceptions import GoogleAPICallError
+        from googleapiclient.errors import HttpError
+
+        if isinstance(error, HttpError):
+            return getattr(error.resp, "status", None) in RETRYABLE_STATUS_CODES
+        if isinstance(error, GoogleAPICallError):
+            return error.code in RETRYABLE_STATUS_CODES
+        return False
+
+    def delay(self, attempt):
+        """Compute delay before next attempt.
+
+        Args:
+            attempt (int): number of the failed attempt (starting from 1)
+
+        Returns:
+            float: delay in seconds, drawn uniformly from 0 to the exponential bound.
+        """
+        return random.uniform(0, min(self.__max_delay, self.__initial_delay * self.__multiplier ** (attempt - 1)))
+
+    def backoff(self, rpc, project, attempt):
+        """Wait before next attempt and count the retry.
+
+        Args:
+            rpc (string): RPC type name
+            project (string): project the call is made for
+            attempt (int): number of the failed attempt (starting from 1)
+        """
+        self.__stats.record_retry(rpc, project)
+        self.__sleep(self.delay(attempt))
+
+    def call(self, rpc, project, function):
+        """Call function and retry it on transient errors.
+
+        Args:
+            rpc (string): RPC type name
+            project (string): project the call is made for
+            function (function): function making the call
+
+        Raises:
+            Exception: error of the last attempt, or the first error which is not retryable.
+
+        Returns:
+            Result of the function.
+        """
+
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                return function()
+            except Exception as e:
+                if not self.is_retryable(e) or attempt == self.max_attempts:
+                    raise
+                self.__log.warning(f"Call {rpc} ({project or '-'}) failed with a transient error "
+                                   f"(attempt {attempt}/{self.max_attempts}). It will be retried. \nError: {e}")
+                self.backoff(rpc, project, attempt)
+
+
+class TokenBucket:
+    """Token Bucket Rate Limiter Class
+
+    Allows bursts of up to `capacity` calls and then limits calls to `rate` per second.
+    Safe to use from many threads; callers wait outside of the lock.
+    """
+
+    def __init__(self, rate=SET_POLICY_RATE, capacity=SET_POLICY_BURST, clock=time.monotonic, sleep=time.sleep):
+        """Token Bucket Rate Limiter Class Constructor
+
+        Args:
+            rate (float): Number of tokens added per second
+            capacity (int): Maximal number of tokens in the bucket
+            clock (function): function returning current time in seconds
+            sleep (function): function used to wait
+        """
+        self.__rate = rate
+        self.__capacity = capacity
+        self.__tokens = float(capacity)
+        self.__clock = clock
+        self.__sleep = sleep
+        self.__updated = clock()
+        self.__lock = threading.Lock()
+
+    def acquire(self):
+        """Take one token, waiting until it is available.
+
+        Returns:
+            float: time (in seconds) spent waiting.
+        """
+
+        with self.__lock:
+            now = self.__clock()
+            self.__tokens = min(self.__capacity, self.__tokens + (now - self.__updated) * self.__rate)
+            self.__updated = now
+            # Token is reserved even if it is not available yet, so waiting callers are served in order
+            self.__tokens -= 1
+            wait = -self.__tokens / self.__rate if self.__tokens < 0 else 0.0
+
+        if wait:
+            self.__sleep(wait)
+        return wait
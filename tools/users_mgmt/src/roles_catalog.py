@@ -0,0 +1,268 @@
+# Copyright (c) 2024-2025 Accenture, All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import atexit
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from retry_policy import RetryPolicy
+from rpc_stats import RpcStats
+
+
+CACHE_DIR = "cache"
+CATALOG_FILENAME = "roles_catalog.json"
+DEFAULT_TTL = 24 * 60 * 60  # seconds
+BATCH_SIZE = 100  # maximal number of requests sent in one batch HTTP request
+
+
+class RolesCatalog:
+    """GCP Roles Catalog Class
+
+    Local, on-disk cache of GCP roles definitions (including permissions and etags).
+    Roles are fetched from GCP only when the cache does not exist, is older than the configured TTL
+    or refresh was requested. Otherwise all roles queries are served locally.
+    """
+
+    def __init__(self, service_provider, cache_dir, logger, ttl=DEFAULT_TTL, refresh=False, stats=None, project=None,
+                 retry_policy=None):
+        """GCP Roles Catalog Class Constructor
+
+        Args:
+            service_provider (function): function returning googleapiclient.discovery.Resource for the IAM service.
+                                         Service is requested only when GCP has to be called.
+            cache_dir (string): Path to directory where the catalog file is stored
+            logger (logging.Logger): logger
+            ttl (int): Time (in seconds) after which cached roles are fetched again
+            refresh (bool): If True - ignore existing cache and fetch roles from GCP at first use
+            stats (rpc_stats.RpcStats): statistics of calls made to GCP. New one is created if not given.
+            project (string): project on whose behalf roles are fetched (used only in statistics)
+            retry_policy (retry_policy.RetryPolicy): retry policy of calls made to GCP. Default one is created if not given.
+        """
+        self.__service_provider = service_provider
+        self.__file_path = Path(cache_dir) / CATALOG_FILENAME
+        self.__log = logger
+        self.__ttl = ttl
+        self.__refresh = refresh
+        self.__catalog = None
+        # True if roles were fetched with `get` and are not yet saved to disk
+        self.__dirty = False
+        self.__stats = stats if stats is not None else RpcStats()
+        self.__project = project
+        self.__retry_policy = retry_policy if retry_policy is not None else RetryPolicy(logger=logger, stats=self.__stats)
+        # Roles fetched after the last flush are saved before the script exits
+        atexit.register(self.flush)
+
+    def __load(self):
+        """Load catalog from disk.
+
+        Returns:
+            dict: Catalog. Format:
+                    {
+                        "fetched_at": timestamp,
+                        "complete": True if all roles were listed,
+                        "roles": {"roles/role_id": {role definition}}
+                    }
+        """
+
+        if self.__catalog is not None:
+            return self.__catalog
+
+        self.__catalog = {"fetched_at": time.time(), "complete": False, "roles": {}}
+
+        if self.__refresh:
+            self.__log.info("Roles catalog refresh was requested. Roles will be fetched from GCP.")
+            self.__refresh = False
+            return self.__catalog
+
+        try:
+            with self.__file_path.open("r", encoding="utf-8") as file:
+                catalog = json.load(file)
+        except FileNotFoundError:
+            self.__log.debug(f"There is no roles catalog cache in {self.__file_path}.")
+        except (json.decoder.JSONDecodeError, OSError) as e:
+            self.__log.warning(f"Roles catalog cache {self.__file_path} cannot be read. It will be rebuilt. \nError: {e}")
+        else:
+            age = time.time() - catalog.get("fetched_at", 0)
+            if age < self.__ttl:
+                self.__catalog = catalog
+                self.__log.debug(f"Roles catalog loaded from cache ({len(catalog['roles'])} roles, age {int(age)}s).")
+            else:
+                self.__log.info(f"Roles catalog cache is older than {self.__ttl}s. Roles will be fetched from GCP.")
+
+        return self.__catalog
+
+    def __save(self):
+        """Save catalog to disk.
+
+        File is written to a temporary file (unique for each run sharing the cache) first and then replaced,
+        so a broken run never leaves a corrupted cache. The cache is only an optimization - if it cannot be saved,
+        a warning is logged and roles are still served from memory.
+        """
+
+        tmp_path = None
+        try:
+            self.__file_path.parent.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=self.__file_path.parent,
+                                             prefix=f"{self.__file_path.stem}.", suffix=".tmp", delete=False) as file:
+                tmp_path = file.name
+                json.dump(self.__catalog, file)
+            os.replace(tmp_path, self.__file_path)
+        except OSError as e:
+            self.__log.warning(f"Roles catalog cache {self.__file_path} cannot be saved. \nError: {e}")
+            if tmp_path is not None:
+                Path(tmp_path).unlink(missing_ok=True)
+            return
+        self.__dirty = False
+
+    def flush(self):
+        """Save roles fetched with `get` since the last save to disk.
+
+        Single roles are only cached in memory when fetched, so a series of `get` calls writes the catalog once.
+        """
+
+        if self.__dirty:
+            self.__save()
+
+    def __execute(self, rpc, request):
+        """Execute request, retrying it on transient errors.
+
+        Args:
+            rpc (string): RPC type name
+            request (googleapiclient.http.HttpRequest): request to execute
+
+        Returns:
+            dict: response.
+        """
+
+        def attempt():
+            with self.__stats.track(rpc, self.__project) as call:
+                response = request.execute()
+                call.bytes = len(json.dumps(response))
+            return response
+
+        return self.__retry_policy.call(rpc, self.__project, attempt)
+
+    def get_all(self):
+        """Get all GCP roles
+
+        Lists every predefined Role that IAM supports with its permissions.
+
+        Returns:
+            list: List of all possible GCP roles
+        """
+
+        catalog = self.__load()
+
+        if not catalog["complete"]:
+            service = self.__service_provider()
+            request = service.roles().list(view="FULL", pageSize=1000)
+            roles = {}
+
+            while request is not None:
+                response = self.__execute("roles.list", request)
+                for role in response.get('roles', []):
+                    roles[role["name"]] = role
+                request = service.roles().list_next(previous_request=request, previous_response=response)
+
+            catalog.update({"fetched_at": time.time(), "complete": True, "roles": roles})
+            self.__save()
+            self.__log.info(f"Roles catalog with {len(roles)} roles fetched from GCP and cached.")
+
+        return list(catalog["roles"].values())
+
+    def get(self, role):
+        """Get info about specified role
+
+        Args:
+            role (string): Role id. Format info: with the "roles/" keyword.
+
+        Returns:
+            dict:   Information about given role. Output includes:
+                    "name", "title", "description", "includedPermissions", "stage", "etag"
+        """
+
+        catalog = self.__load()
+
+        if role not in catalog["roles"]:
+            catalog["roles"][role] = self.__execute("roles.get", self.__service_provider().roles().get(name=role))
+            # Saved to disk with `flush`
+            self.__dirty = True
+            self.__log.debug(f"Role {role} fetched from GCP and cached.")
+
+        return catalog["roles"][role]
+
+    def __execute_batch(self, batch, roles):
+        """Execute batch request.
+
+        Args:
+            batch (googleapiclient.http.BatchHttpRequest): batch request
+            roles (list): roles requested in the batch
+        """
+        with self.__stats.track("roles.batch_get", self.__project) as call:
+            batch.execute()
+            call.bytes = sum(len(json.dumps(self.__catalog["roles"][role])) for role in roles if role in self.__catalog["roles"])
+
+    def get_many(self, roles):
+        """Get info about specified roles
+
+        Roles missing in the cache are fetched from GCP with batch requests (up to BATCH_SIZE roles per HTTP request).
+
+        Args:
+            roles (list): Roles ids. Format info: with the "roles/" keyword.
+
+        Returns:
+            dict:   Information about given roles. Roles which could not be retrieved are skipped. Format:
+                    {"roles/role_id": {role definition}}
+        """
+
+        catalog = self.__load()
+        missing_roles = list(dict.fromkeys(role for role in roles if role not in catalog["roles"]))
+
+        if missing_roles:
+            service = self.__service_provider()
+            pending_roles = missing_roles
+
+            for attempt in range(1, self.__retry_policy.max_attempts + 1):
+                # Roles whose requests failed with transient errors are requested again in the next round
+                failed_roles = []
+
+                def callback(request_id, response, exception):
+                    if exception is None:
+                        catalog["roles"][request_id] = response
+                    elif self.__retry_policy.is_retryable(exception) and attempt < self.__retry_policy.max_attempts:
+                        failed_roles.append(request_id)
+                    else:
+                        self.__log.error(f"Cannot retrieve information about role {request_id}. \nError: {exception}")
+
+                for i in range(0, len(pending_roles), BATCH_SIZE):
+                    chunk = pending_roles[i:i + BATCH_SIZE]
+                    batch = service.new_batch_http_request(callback=callback)
+                    for role in chunk:
+                        batch.add(service.roles().get(name=role), request_id=role)
+                    self.__retry_policy.call("roles.batch_get", self.__project, lambda: self.__execute_batch(batch, chunk))
+
+                if not failed_roles:
+                    break
+                self.__log.warning(f"Retrieving {len(failed_roles)} roles failed with transient errors "
+                                   f"(attempt {attempt}/{self.__retry_policy.max_attempts}). They will be requested again.")
+                self.__retry_policy.backoff("roles.batch_get", self.__project, attempt)
+                pending_roles = failed_roles
+
+            self.__save()
+            self.__log.debug(f"{len(missing_roles)} roles fetched from GCP in batches and cached.")
+
+        return {role: catalog["roles"][role] for role in roles if role in catalog["roles"]}
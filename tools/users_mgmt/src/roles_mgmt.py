@@ -14,8 +14,18 @@
 
 import json
 import logging
+import re
 from enum import Enum
 
+from drift_report import DriftReport
+from roles_plan import RolesPlan
+
+
+# Predefined GCP role id, e.g. "roles/compute.instanceAdmin.v1"
+GCP_ROLE_ID_PATTERN = re.compile(r"^roles/[A-Za-z][A-Za-z0-9_.]*$")
+USER_KEYWORD = "user:"
+CHECK_REPORT_NAME = "Check_report"
+
 
 class RolesMgmt:
     """Roles Management Class
@@ -32,6 +42,8 @@ class RolesMgmt:
             exec_user_id (str): Id of user who is executing the script
         """
         self.__horizon_roles_list = []
+        # Index of Horizon roles: {horizon_role_name: frozenset of GCP roles ids}
+        self.__horizon_roles = {}
         self.__operation_mgmt = operation_manager
         self.__log = logger
         self.exec_user_id = exec_user_id
@@ -62,11 +74,152 @@ class RolesMgmt:
         """
         return self.__horizon_roles_list
 
+    def get_horizon_role(self, horizon_role):
+        """Retrieve GCP roles of given Horizon role.
+
+        Args:
+            horizon_role (string): Horizon role name
+
+        Returns:
+            frozenset: GCP roles ids or None if Horizon role is not defined.
+        """
+        return self.__horizon_roles.get(horizon_role)
+
+    def __validate_horizon_roles(self, horizon_roles_list):
+        """Validate Horizon roles definitions and build their index.
+
+        Args:
+            horizon_roles_list (list): Horizon roles definitions loaded from JSON file
+
+        Returns:
+            tuple (dict, list): index ({horizon_role_name: frozenset of GCP roles ids}) and list of found errors.
+        """
+
+        name_key = self.HorizonRolesKey.NAME.value
+        gcp_roles_key = self.HorizonRolesKey.GCP_ROLE.value
+        horizon_roles = {}
+        errors = []
+
+        if not isinstance(horizon_roles_list, list):
+            return horizon_roles, ["File shall contain a list of Horizon roles definitions."]
+
+        for position, definition in enumerate(horizon_roles_list):
+            if not isinstance(definition, dict):
+                errors.append(f"Definition #{position} is not an object.")
+                continue
+
+            name = definition.get(name_key)
+            gcp_roles = definition.get(gcp_roles_key)
+            if not isinstance(name, str) or not name:
+                errors.append(f"Definition #{position} has no correct `{name_key}` (non-empty string).")
+                continue
+            if not isinstance(gcp_roles, list) or not all(isinstance(role, str) for role in gcp_roles):
+                errors.append(f"Horizon role {name} has no correct `{gcp_roles_key}` (list of GCP roles ids).")
+                continue
+
+            unknown_keys = set(definition) - {name_key, gcp_roles_key}
+            if unknown_keys:
+                self.__log.warning(f"Horizon role {name} has unknown keys, they are ignored: {sorted(unknown_keys)}")
+            if name in horizon_roles:
+                errors.append(f"Horizon role {name} is defined more than once.")
+            for role in gcp_roles:
+                if not GCP_ROLE_ID_PATTERN.match(role):
+                    errors.append(f"Horizon role {name} has incorrect GCP role id: {role}. Expected format: roles/<role_id>.")
+            if len(set(gcp_roles)) != len(gcp_roles):
+                self.__log.warning(f"Horizon role {name} lists some GCP roles more than once.")
+
+            horizon_roles[name] = frozenset(gcp_roles)
+
+        return horizon_roles, errors
+
+    def validate_users_configuration(self, users_conf_list):
+        """Validate users' configuration against loaded Horizon roles.
+
+        Validation is done locally, without any call to Google Cloud Platform,
+        so incorrect configuration is rejected before any change is made.
+
+        Args:
+            users_conf_list (list): entries from JSON file with user-horizon roles and horizon role-users mapping.
+
+        Returns:
+            list: found errors. Empty if configuration is correct.
+        """
+
+        errors = []
+        undefined_roles = set()
+
+        if not isinstance(users_conf_list, list):
+            return ["File shall contain a list of users' configurations."]
+
+        for position, conf_dict in enumerate(users_conf_list):
+            if not isinstance(conf_dict, dict):
+                errors.append(f"Entry #{position} is not an object.")
+                continue
+
+            if self.UsersKey.USER.value in conf_dict:
+                users = [conf_dict[self.UsersKey.USER.value]]
+                horizon_roles = conf_dict.get(self.UsersKey.HORIZON_ROLES_ROLE.value)
+                roles_key = self.UsersKey.HORIZON_ROLES_ROLE.value
+            elif self.UsersKey.GROUP_H_ROLE.value in conf_dict:
+                users = conf_dict.get(self.UsersKey.USERS.value)
+                horizon_roles = [conf_dict[self.UsersKey.GROUP_H_ROLE.value]]
+                roles_key = self.UsersKey.GROUP_H_ROLE.value
+            else:
+                errors.append(f"Entry #{position} has neither `{self.UsersKey.USER.value}` nor `{self.UsersKey.GROUP_H_ROLE.value}` key.")
+                continue
+
+            if not isinstance(users, list) or not all(isinstance(user, str) and user for user in users):
+                errors.append(f"Entry #{position} has incorrect users (non-empty strings are expected).")
+            if not isinstance(horizon_roles, list) or not all(isinstance(role, str) for role in horizon_roles):
+                errors.append(f"Entry #{position} has incorrect `{roles_key}`.")
+                continue
+
+            undefined_roles.update(role for role in horizon_roles if role not in self.__horizon_roles)
+
+        if undefined_roles:
+            errors.append(f"Horizon roles are not defined: {sorted(undefined_roles)}")
+
+        return errors
+
+    def load_users_configuration(self, users_list_file_path):
+        """Load and validate users' configuration.
+
+        Args:
+            users_list_file_path (string): Path to Json file with users' configuration.
+
+        Raises:
+            FileNotFoundError: Raised if file does not exist.
+            json.decoder.JSONDecodeError: Raised if file is not correct JSON.
+
+        Returns:
+            list: users' configuration or None if it is incorrect.
+        """
+
+        try:
+            with open(users_list_file_path, "r") as file:
+                users_conf_list = json.load(file)
+        except FileNotFoundError as e:
+            self.__log.error(f"No such file or directory: {users_list_file_path}. Users roles mapping cannot be performed.")
+            raise
+        except json.decoder.JSONDecodeError as e:
+            self.__log.error(f"File {users_list_file_path} is incorrect. Check formatting. Cannot perform operations.")
+            raise
+
+        errors = self.validate_users_configuration(users_conf_list=users_conf_list)
+        for error in errors:
+            self.__log.error(f"File {users_list_file_path}: {error}")
+        if errors:
+            self.__log.error(f"File {users_list_file_path} is incorrect. No changes will be made.")
+            return None
+
+        return users_conf_list
+
     def horizon_roles_mgmt(self, horizon_roles_file_path):
         """Loads Horizon role mappings from a JSON file.
 
         This function processes a JSON file that defines Horizon roles and their corresponding GCP role mappings.
-        The loaded role definitions are stored in the global variable `self.__horizon_roles_list` for use in the script.
+        The definitions are validated (structure, duplicated names, GCP role id format) and indexed by Horizon role name.
+        If any definition is incorrect, no Horizon role is loaded.
 
         Args:
             horizon_roles_file_path (string):   Path to a JSON file containing mappings between GCP roles and Horizon roles.
@@ -91,121 +244,35 @@ class RolesMgmt:
 
         try:
             with open(horizon_roles_file_path, "r") as file:
-                self.__horizon_roles_list = json.load(file)
-                operation_result = True
+                horizon_roles_list = json.load(file)
         except FileNotFoundError as e:
             self.__log.error(f"No such file or directory: {horizon_roles_file_path}. Cannot load Horizon roles mapping.")
             operation_result = False
         except json.decoder.JSONDecodeError as e:
             self.__log.error(f"File {horizon_roles_file_path} is incorrect. Check formatting. Cannot perform operations.")
             operation_result = False
+        else:
+            horizon_roles, errors = self.__validate_horizon_roles(horizon_roles_list=horizon_roles_list)
+            for error in errors:
+                self.__log.error(f"File {horizon_roles_file_path}: {error}")
 
-        return operation_result
-
-    def __check_single_user_configuration(self, user_conf):
-        """Check provided configuration for single user.
-
-        Check provided configuration for single user with configuration in GCP. User has assigned list of Horizon roles.
-
-        Args:
-            user_conf (dict): single dictionary entry from JSON file with user-horizon roles mapping.
-
-        Returns:
-            bool: comparison_result - True if configuration match, False if they do not match.
-        """
-
-        comparison_result = False
-        user_id = user_conf[self.UsersKey.USER.value]
-        for horizon_role in user_conf[self.UsersKey.HORIZON_ROLES_ROLE.value]:
-            # Check if provided horizon role is correct
-            if any(hr[self.HorizonRolesKey.NAME.value] == horizon_role for hr in self.__horizon_roles_list):
-                expected_gcp_roles = next((hr[self.HorizonRolesKey.GCP_ROLE.value]
-                                          for hr in self.__horizon_roles_list if hr[self.HorizonRolesKey.NAME.value] == horizon_role), None)
-
-                if expected_gcp_roles:
-                    self.__log.debug(
-                        f"User {user_id} is expected to have assigned following GCP roles: {expected_gcp_roles}")
-
-                    # Check if user has those GCP roles assigned
-                    actual_user_gcp_roles_dict = self.__operation_mgmt.get_user_and_assigned_roles(user=user_id)
-
-                    # User already has some roles assigned
-                    if user_id in actual_user_gcp_roles_dict:
-                        self.__log.debug(
-                            f"User {user_id} already has following GCP roles: {actual_user_gcp_roles_dict[user_id]}")
-                    else:
-                        self.__log.debug(f"User {user_id} has no GCP roles assigned.")
-
-                    # Compare expected GCP roles with actually assigned user's roles
-                    expected_gcp_roles.sort()
-                    actual_user_gcp_roles_dict[user_id].sort()
-
-                    if actual_user_gcp_roles_dict[user_id] == expected_gcp_roles:
-                        comparison_result = True
-                    else:
-                        comparison_result = False
-                        # If the comparison is already showing configs don't match, no need to check further
-                        break
-
+            if errors:
+                self.__log.error(f"File {horizon_roles_file_path} is incorrect. Cannot load Horizon roles mapping.")
             else:
-                self.__log.error(f"Provided horizon role {horizon_role} is incorrect. Make it correct.")
-                comparison_result = None
-
-        return comparison_result
-
-    def __check_users_group_configuration(self, group_conf):
-        """Check provided configuration for group of users.
-
-        Check provided configuration for group of users with configuration in GCP. Single Horizon role has assigned list of users.
-
-        Args:
-            user_conf (dict): single dictionary entry from JSON file with horizon role - users mapping.
-
-        Returns:
-            bool: comparison_result - True if configuration match, False if they do not match.
-        """
-
-        comparison_result = False
-        horizon_role = group_conf[self.UsersKey.GROUP_H_ROLE.value]
-
-        # Check if provided horizon role is correct
-        if any(hr[self.HorizonRolesKey.NAME.value] == horizon_role for hr in self.__horizon_roles_list):
-            expected_gcp_roles = next((hr[self.HorizonRolesKey.GCP_ROLE.value]
-                                      for hr in self.__horizon_roles_list if hr[self.HorizonRolesKey.NAME.value] == horizon_role), None)
-
-            if expected_gcp_roles:
-                self.__log.debug(f"Users are expected to have assigned following GCP roles: {expected_gcp_roles}")
-
-                for user_id in group_conf[self.UsersKey.USERS.value]:
-                    # Check if user has those GCP roles assigned
-                    actual_user_gcp_roles_dict = self.__operation_mgmt.get_user_and_assigned_roles(user=user_id)
-
-                    # User already has some roles assigned
-                    if user_id in actual_user_gcp_roles_dict:
-                        self.__log.debug(
-                            f"User {user_id} already has following GCP roles: {actual_user_gcp_roles_dict[user_id]}")
-                    else:
-                        self.__log.debug(f"User {user_id} has no GCP roles assigned.")
-
-                    # Compare expected GCP roles with actually assigned user's roles
-                    expected_gcp_roles.sort()
-                    actual_user_gcp_roles_dict[user_id].sort()
-
-                    if actual_user_gcp_roles_dict[user_id] == expected_gcp_roles:
-                        comparison_result = True
-                    else:
-                        comparison_result = False
-                        # If the comparison is already showing configs don't match, no need to check further
-                        break
-        else:
-            self.__log.error(f"Provided horizon role {horizon_role} is incorrect. Make it correct.")
-            comparison_result = None
+                self.__horizon_roles_list = horizon_roles_list
+                self.__horizon_roles = horizon_roles
+                self.__log.info(f"{len(horizon_roles)} Horizon roles loaded.")
+                operation_result = True
 
-        return comparison_result
+        return operation_result
 
     def check_users_configurations(self, users_list_file_path):
         """Compare users' roles configurtions in provided json file and in Google Cloud Platform.
 
+        All users are compared in one pass over one IAM policy snapshot. Each user's union of GCP roles of all their Horizon roles
+        (assigned directly and through groups) is compared with roles they have. Complete report with missing and extra roles of each user
+        and with users who have roles but are not configured is saved in file `Check_report.json` (in the format of operations' output files).
+
         Args:
             users_list_file_path (string):  Path to Json file with mapping between GCP roles to Horizon roles.
                                             File structure:
@@ -222,34 +289,25 @@ class RolesMgmt:
 
         Returns:
             bool: comparison_result - result of comparison. True if configuration match, False if they do not match.
+                  None if the file is incorrect (e.g. references undefined Horizon roles).
         """
 
         self.__log.info("------")
         self.__log.info(f"Checking Users roles configuration from the provided file: {users_list_file_path}")
 
-        comparison_result = False
+        users_conf_list = self.load_users_configuration(users_list_file_path=users_list_file_path)
+        if users_conf_list is None:
+            return None
 
-        try:
-            with open(users_list_file_path, "r") as file:
-                users_conf_list = json.load(file)
-        except FileNotFoundError as e:
-            self.__log.error(f"No such file or directory: {users_list_file_path}. Users roles mapping cannot be performed.")
-            raise
-        except json.decoder.JSONDecodeError as e:
-            self.__log.error(f"File {users_list_file_path} is incorrect. Check formatting. Cannot perform operations.")
-            raise
+        desired_roles, _ = self.__compile_desired_roles(users_conf_list=users_conf_list)
+        actual_roles = {member[len(USER_KEYWORD):]: roles
+                        for member, roles in self.__operation_mgmt.get_user_and_assigned_roles(user="*").items()}
 
-        self.__log.debug(f"======")
-        for conf_dict in users_conf_list:
-            if self.UsersKey.USER.value in conf_dict:
-                comparison_result = self.__check_single_user_configuration(user_conf=conf_dict)
-            elif self.UsersKey.GROUP_H_ROLE.value in conf_dict:
-                comparison_result = self.__check_users_group_configuration(group_conf=conf_dict)
-            self.__log.debug(f"======")
+        report = DriftReport.compute(desired_roles=desired_roles, actual_roles=actual_roles)
+        report.log(self.__log)
+        self.__operation_mgmt.result_sink.write(name=CHECK_REPORT_NAME, data=report.to_dict())
 
-            # If the comparison is already showing configs don't match, no need to check further
-            if not comparison_result:
-                break
+        comparison_result = report.matches()
         if comparison_result:
             self.__log.info(f"Configurations match.")
         else:
@@ -257,118 +315,96 @@ class RolesMgmt:
 
         return comparison_result
 
-    def __asign_roles_to_single_user(self, user_conf, force_overwrite):
-        """Asign roles to user according to configuration.
+    def __compile_desired_roles(self, users_conf_list):
+        """Compile desired GCP roles of users from users' configuration.
 
-        Assign proper GCP roles to single user according to provided configuration.
+        Horizon roles assigned to user directly and through groups are merged, so each user gets union of their GCP roles.
 
         Args:
-            user_conf (dict): single dictionary entry from JSON file with user-horizon roles mapping.
-            force_overwrite (bool): if True - overwrite existing user's roles. If False - assign new roles as addition to existing ones.
+            users_conf_list (list): entries from JSON file with user-horizon roles and horizon role-users mapping.
 
         Returns:
-            bool: operation_result - return True if operation was done successfully. Otherwise return False.
+            tuple (dict, bool): desired roles ({user_id: set of GCP roles ids}) and status - False if any Horizon role was incorrect.
         """
 
-        operation_result = False
-        user_id = user_conf[self.UsersKey.USER.value]
+        desired_roles = {}
+        operation_result = True
 
-        for horizon_role in user_conf[self.UsersKey.HORIZON_ROLES_ROLE.value]:
-            # Check if provided horizon role is correct
-            if any(hr[self.HorizonRolesKey.NAME.value] == horizon_role for hr in self.__horizon_roles_list):
-                # Retreive GCP roles assigned to given Horizon role
-                gcp_roles = next((hr[self.HorizonRolesKey.GCP_ROLE.value]
-                                 for hr in self.__horizon_roles_list if hr[self.HorizonRolesKey.NAME.value] == horizon_role), None)
-
-                if gcp_roles:
-                    self.__log.debug(f"User: {user_id} will be now assigned with roles {gcp_roles}")
-
-                    # Check if user has those GCP roles assigned
-                    user_gcp_roles_dict = self.__operation_mgmt.get_user_and_assigned_roles(user=user_id)
-
-                    # User already has some roles assigned
-                    if user_id in user_gcp_roles_dict:
-                        self.__log.debug(f"User: {user_id} already has gcp roles: {user_gcp_roles_dict[user_id]}")
-
-                        # Check `force` flag. If it is True, overwrite user's existing roles.
-                        if force_overwrite and self.exec_user_id != user_id:
-                            self.__log.debug("User's roles will be overwritten.")
-                            self.__operation_mgmt.remove_all_roles_from_user(user=user_id)
-                        else:
-                            self.__log.debug("User's roles will not be overwritten.")
-
-                    else:
-                        self.__log.debug(f"User: {user_id} has no gcp roles assigned.")
+        for conf_dict in users_conf_list:
+            if self.UsersKey.USER.value in conf_dict:
+                users = [conf_dict[self.UsersKey.USER.value]]
+                horizon_roles = conf_dict[self.UsersKey.HORIZON_ROLES_ROLE.value]
+            elif self.UsersKey.GROUP_H_ROLE.value in conf_dict:
+                users = conf_dict[self.UsersKey.USERS.value]
+                horizon_roles = [conf_dict[self.UsersKey.GROUP_H_ROLE.value]]
+            else:
+                continue
 
-                    # Add roles to the user
-                    for gcp_r in gcp_roles:
-                        self.__operation_mgmt.add_role_to_user(user=user_id, role=gcp_r.replace("roles/", ""))
+            for horizon_role in horizon_roles:
+                # Check if provided horizon role is correct
+                gcp_roles = self.__horizon_roles.get(horizon_role)
+                if gcp_roles is not None:
+                    for user_id in users:
+                        desired_roles.setdefault(user_id, set()).update(gcp_roles)
+                else:
+                    self.__log.error(f"Provided horizon role {horizon_role} is incorrect. Make it correct.")
+                    operation_result = False
 
-                    operation_result = True
-            else:
-                self.__log.error(f"Provided horizon role {horizon_role} is incorrect. Make it correct.")
-                operation_result = False
-        return operation_result
+        return desired_roles, operation_result
 
-    def __asign_role_to_group_of_users(self, group_conf, force_overwrite):
-        """Asign role to group of users according to configuration.
+    def plan_users_mgmt(self, users_conf_list, force_overwrite=False):
+        """Compute plan of changes required to apply users' configuration.
 
-        Assign proper GCP roles to group of users according to provided configuration.
+        Desired users' GCP roles are compared with current IAM policy. Only differences are planned.
 
         Args:
-            group_conf (dict): single dictionary entry from JSON file with horizon role - users mapping.
-            force_overwrite (bool): if True - overwrite existing user's roles. If False - assign new roles as addition to existing ones.
+            users_conf_list (list): entries from JSON file with user-horizon roles and horizon role-users mapping.
+            force_overwrite (bool): if True - roles not listed in configuration are removed. If False - only missing roles are added.
 
         Returns:
-            bool: operation_result - return True if operation was done successfully. Otherwise return False.
+            tuple (roles_plan.RolesPlan, bool): plan and status - False if any Horizon role was incorrect.
         """
 
-        operation_result = False
-        horizon_role = group_conf[self.UsersKey.GROUP_H_ROLE.value]
-
-        # Check if provided horizon role is correct
-        if any(hr[self.HorizonRolesKey.NAME.value] == horizon_role for hr in self.__horizon_roles_list):
-            # Retreive GCP roles assigned to given Horizon role
-            gcp_roles = next((hr[self.HorizonRolesKey.GCP_ROLE.value]
-                             for hr in self.__horizon_roles_list if hr[self.HorizonRolesKey.NAME.value] == horizon_role), None)
+        desired_roles, operation_result = self.__compile_desired_roles(users_conf_list=users_conf_list)
+        actual_roles = self.__operation_mgmt.get_user_and_assigned_roles(user=list(desired_roles))
 
-            if gcp_roles:
-                self.__log.debug(f"Users will be now assigned with roles {gcp_roles}")
-                for user_id in group_conf[self.UsersKey.USERS.value]:
+        if force_overwrite and self.exec_user_id in desired_roles:
+            self.__log.info(f"User {self.exec_user_id} executes the script. Their roles will not be overwritten.")
 
-                    # Check if user has those GCP roles assigned
-                    user_gcp_roles_dict = self.__operation_mgmt.get_user_and_assigned_roles(user=user_id)
+        plan = RolesPlan.compute(desired_roles=desired_roles, actual_roles=actual_roles,
+                                 force_overwrite=force_overwrite, protected_users=(self.exec_user_id,))
+        return plan, operation_result
 
-                    # User already has some roles assigned
-                    if user_id in user_gcp_roles_dict:
-                        self.__log.debug(f"User: {user_id} already has gcp roles: {user_gcp_roles_dict[user_id]}")
+    def apply_plan(self, plan):
+        """Apply plan of changes to IAM policy.
 
-                        # Check `force` flag. If it is True, overwrite user's existing roles.
-                        if force_overwrite and self.exec_user_id != user_id:
-                            self.__log.debug("User's roles will be overwritten.")
-                            self.__operation_mgmt.remove_all_roles_from_user(user=user_id)
-                        else:
-                            self.__log.debug("User's roles will not be overwritten.")
+        All changes are written with a single IAM policy write. Users without changes cost no writes.
 
-                    else:
-                        self.__log.debug(f"User: {user_id} has no gcp roles assigned.")
+        Args:
+            plan (roles_plan.RolesPlan): plan to apply
 
-                    # Add roles to the user
-                    for gcp_r in gcp_roles:
-                        self.__operation_mgmt.add_role_to_user(user=user_id, role=gcp_r.replace("roles/", ""))
+        Returns:
+            int: number of changes written to the policy.
+        """
 
-                    operation_result = True
-        else:
-            self.__log.error(f"Provided horizon role {horizon_role} is incorrect. Make it correct.")
-            operation_result = False
+        if not plan.changes_count():
+            self.__log.info("Configuration is already applied. Nothing to change.")
+            return 0
 
-        return operation_result
+        self.__operation_mgmt.start_batch()
+        for user_id in plan.users():
+            for gcp_r in plan.roles_to_remove(user_id):
+                self.__operation_mgmt.remove_role_from_user(user=user_id, role_id=gcp_r.replace("roles/", ""))
+            for gcp_r in plan.roles_to_add(user_id):
+                self.__operation_mgmt.add_role_to_user(user=user_id, role=gcp_r.replace("roles/", ""))
+        return self.__operation_mgmt.commit_batch()
 
-    def users_mgmt(self, users_list_file_path, force_overwrite=False):
+    def users_mgmt(self, users_list_file_path, force_overwrite=False, dry_run=False):
         """Assign roles to users according to JSON configuration.
 
         Handling json file which contains list of users and assigned to them Horizon roles that they shall have.
         Asign roles as it is described in the provided file.
+        Changes are computed as a plan (difference between configuration and IAM policy) and only the plan is applied.
 
 
         Args:
@@ -387,6 +423,7 @@ class RolesMgmt:
             force_overwrite (bool): Flag used for users' roles mapping.
                                 If flag is set than user's roles will be overwritten.
                                 If flag is not set roles will be added to user with no ingeration to their existing roles.
+            dry_run (bool): If True - only log the plan, IAM policy is not changed.
 
         Returns:
             bool: operation_result - return True if operation was done successfully. Otherwise return False.
@@ -398,27 +435,26 @@ class RolesMgmt:
         operation_result = False
 
         try:
-            with open(users_list_file_path, "r") as file:
-                users_conf_list = json.load(file)
-
-            operation_result = True
-        except FileNotFoundError as e:
-            self.__log.error(f"No such file or directory: {users_list_file_path}. Users roles mapping cannot be performed.")
-            operation_result = False
-        except json.decoder.JSONDecodeError as e:
-            self.__log.error(f"File {users_list_file_path} is incorrect. Check formatting. Cannot perform operations.")
+            users_conf_list = self.load_users_configuration(users_list_file_path=users_list_file_path)
+            operation_result = users_conf_list is not None
+        except (FileNotFoundError, json.decoder.JSONDecodeError):
             operation_result = False
 
         if operation_result:
-            self.__log.debug(f"======")
-            for conf_dict in users_conf_list:
-                if self.UsersKey.USER.value in conf_dict:
-                    operation_result = self.__asign_roles_to_single_user(
-                        user_conf=conf_dict, force_overwrite=force_overwrite)
-                elif self.UsersKey.GROUP_H_ROLE.value in conf_dict:
-                    operation_result = self.__asign_role_to_group_of_users(
-                        group_conf=conf_dict, force_overwrite=force_overwrite)
-                self.__log.debug(f"======")
+            plan, operation_result = self.plan_users_mgmt(users_conf_list=users_conf_list, force_overwrite=force_overwrite)
+            plan.log(self.__log)
+
+            if dry_run:
+                self.__log.info("Dry run. Planned changes are not applied.")
+            else:
+                # Imported only when changes are applied - dry runs do not load google.api_core
+                from google.api_core.exceptions import GoogleAPICallError
+
+                try:
+                    self.apply_plan(plan=plan)
+                except (GoogleAPICallError, TimeoutError, RuntimeError) as e:
+                    self.__log.error(f"Planned changes were NOT applied. \nError: {e}")
+                    operation_result = False
 
         if operation_result:
             self.__log.info(f"Mapping users <-> horizon roles was successful.")
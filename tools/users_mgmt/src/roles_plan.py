@@ -0,0 +1,132 @@
+# Copyright (c) 2024-2025 Accenture, All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from enum import Enum
+
+
+class RolesPlan:
+    """Roles Plan Class
+
+    Minimal set of changes which brings users' GCP roles from their current state to the desired one.
+    """
+
+    def __init__(self):
+        """Roles Plan Class Constructor"""
+        # {user_id: {"add": [role1], "remove": [role2], "keep": [role3]}}
+        self.__users = {}
+
+    class Action(Enum):
+        """Plan Actions Enum
+
+        All possible actions on user's role.
+        """
+        ADD = "add"
+        REMOVE = "remove"
+        KEEP = "keep"
+
+    @classmethod
+    def compute(cls, desired_roles, actual_roles, force_overwrite, protected_users=()):
+        """Compute plan by comparing desired and actual users' roles.
+
+        Args:
+            desired_roles (dict): Roles users shall have. Format: {user_id: set of roles ids}
+            actual_roles (dict): Roles users currently have. Format: {user_id: list of roles ids}
+            force_overwrite (bool): if True - roles not present in desired state are removed.
+                                    If False - only missing roles are added.
+            protected_users (iterable): users whose roles are never removed (e.g. user who executes the script)
+
+        Returns:
+            RolesPlan: computed plan.
+        """
+
+        plan = cls()
+        for user_id, desired in desired_roles.items():
+            actual = set(actual_roles.get(user_id, ()))
+            to_remove = actual - desired if force_overwrite and user_id not in protected_users else set()
+            plan.__users[user_id] = {
+                cls.Action.ADD.value: sorted(desired - actual),
+                cls.Action.REMOVE.value: sorted(to_remove),
+                cls.Action.KEEP.value: sorted(actual - to_remove),
+            }
+        return plan
+
+    def users(self):
+        """Retrieve users covered by the plan.
+
+        Returns:
+            list: users ids
+        """
+        return list(self.__users)
+
+    def roles_to_add(self, user_id):
+        """Retrieve roles which shall be added to user.
+
+        Args:
+            user_id (string): user id
+
+        Returns:
+            list: roles ids
+        """
+        return self.__users[user_id][self.Action.ADD.value]
+
+    def roles_to_remove(self, user_id):
+        """Retrieve roles which shall be removed from user.
+
+        Args:
+            user_id (string): user id
+
+        Returns:
+            list: roles ids
+        """
+        return self.__users[user_id][self.Action.REMOVE.value]
+
+    def changes_count(self):
+        """Count all changes in the plan.
+
+        Returns:
+            int: number of roles to add and to remove.
+        """
+        return sum(len(entry[self.Action.ADD.value]) + len(entry[self.Action.REMOVE.value])
+                   for entry in self.__users.values())
+
+    def to_dict(self):
+        """Retrieve plan as dictionary.
+
+        Returns:
+            dict: Format:
+                    {user_id: {"add": [role1], "remove": [role2], "keep": [role3]}}
+        """
+        return {user_id: dict(entry) for user_id, entry in self.__users.items()}
+
+    def log(self, logger):
+        """Log the plan.
+
+        Args:
+            logger (logging.Logger): logger
+        """
+
+        unchanged_users = 0
+        for user_id, entry in self.__users.items():
+            if not entry[self.Action.ADD.value] and not entry[self.Action.REMOVE.value]:
+                unchanged_users += 1
+                logger.debug(f"Plan: user {user_id} - no changes.")
+                continue
+            for role in entry[self.Action.ADD.value]:
+                logger.info(f"Plan: + {role} to user {user_id}")
+            for role in entry[self.Action.REMOVE.value]:
+                logger.info(f"Plan: - {role} from user {user_id}")
+
+        adds = sum(len(entry[self.Action.ADD.value]) for entry in self.__users.values())
+        removes = sum(len(entry[self.Action.REMOVE.value]) for entry in self.__users.values())
+        logger.info(f"Plan: {adds} roles to add, {removes} roles to remove, {unchanged_users} users without changes.")
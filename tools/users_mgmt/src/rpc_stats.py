@@ -0,0 +1,174 @@
+# Copyright (c) 2024-2025 Accenture, All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import math
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+
+REPORT_FILENAME = "Performance_report.json"
+
+
+class RpcStats:
+    """RPC Statistics Class
+
+    Collects number, latency, size, errors and retries of all calls made by the script,
+    grouped by RPC type and project. Safe to use from many threads.
+    """
+
+    def __init__(self):
+        """RPC Statistics Class Constructor"""
+        # {(rpc, project): {"latencies": [seconds], "bytes": int, "errors": int, "retries": int}}
+        self.__calls = {}
+        self.__lock = threading.Lock()
+        self.__start_time = time.perf_counter()
+
+    class Call:
+        """Single tracked call. Size of the transferred data can be set by the caller."""
+
+        def __init__(self):
+            self.bytes = 0
+
+    def __entry(self, rpc, project):
+        return self.__calls.setdefault((rpc, project), {"latencies": [], "bytes": 0, "errors": 0, "retries": 0})
+
+    @contextmanager
+    def track(self, rpc, project=None):
+        """Measure a call.
+
+        Usage:
+            with stats.track("get_iam_policy", project) as call:
+                policy = client.get_iam_policy(...)
+                call.bytes = policy.ByteSize()
+
+        Args:
+            rpc (string): RPC type name
+            project (string): project the call was made for
+
+        Yields:
+            RpcStats.Call: tracked call
+        """
+
+        call = self.Call()
+        error = False
+        start_time = time.perf_counter()
+        try:
+            yield call
+        except Exception:
+            error = True
+            raise
+        finally:
+            elapsed = time.perf_counter() - start_time
+            with self.__lock:
+                entry = self.__entry(rpc, project)
+                entry["latencies"].append(elapsed)
+                entry["bytes"] += call.bytes
+                entry["errors"] += int(error)
+
+    def record_retry(self, rpc, project=None):
+        """Count retry of a call.
+
+        Args:
+            rpc (string): RPC type name
+            project (string): project the call was made for
+        """
+        with self.__lock:
+            self.__entry(rpc, project)["retries"] += 1
+
+    def retries(self, project=None):
+        """Count retries.
+
+        Args:
+            project (string): project whose retries are counted. If None - retries of all calls are counted.
+
+        Returns:
+            int: number of retries.
+        """
+        with self.__lock:
+            return sum(entry["retries"] for (_, entry_project), entry in self.__calls.items()
+                       if project is None or entry_project == project)
+
+    @staticmethod
+    def __percentile(sorted_values, percent):
+        """Nearest-rank percentile.
+
+        Args:
+            sorted_values (list): sorted values
+            percent (int): percentile (0-100)
+
+        Returns:
+            float: percentile value or None if there are no values.
+        """
+        if not sorted_values:
+            return None
+        rank = max(math.ceil(percent / 100 * len(sorted_values)), 1)
+        return sorted_values[rank - 1]
+
+    def report(self):
+        """Build performance report.
+
+        Returns:
+            dict: Format:
+                    {
+                        "elapsed_s": float,
+                        "calls": [{"rpc", "project", "count", "errors", "retries", "bytes", "total_ms", "p50_ms", "p95_ms"}]
+                    }
+        """
+
+        calls = []
+        with self.__lock:
+            for (rpc, project), entry in sorted(self.__calls.items(), key=lambda item: (item[0][0], str(item[0][1]))):
+                latencies = sorted(entry["latencies"])
+                calls.append({
+                    "rpc": rpc,
+                    "project": project,
+                    "count": len(latencies),
+                    "errors": entry["errors"],
+                    "retries": entry["retries"],
+                    "bytes": entry["bytes"],
+                    "total_ms": round(sum(latencies) * 1000, 3),
+                    "p50_ms": round(self.__percentile(latencies, 50) * 1000, 3) if latencies else None,
+                    "p95_ms": round(self.__percentile(latencies, 95) * 1000, 3) if latencies else None,
+                })
+
+        return {"elapsed_s": round(time.perf_counter() - self.__start_time, 3), "calls": calls}
+
+    def save(self, output_dir, logger):
+        """Save performance report to JSON file and log its summary.
+
+        Args:
+            output_dir (string): Path to directory where to store the report
+            logger (logging.Logger): logger
+
+        Returns:
+            pathlib.Path: path to the report file.
+        """
+
+        report = self.report()
+        for call in report["calls"]:
+            logger.info(f"RPC {call['rpc']} ({call['project'] or '-'}): {call['count']} calls, "
+                        f"p50 {call['p50_ms']}ms, p95 {call['p95_ms']}ms, {call['retries']} retries, {call['errors']} errors")
+
+        output_path = Path(output_dir)
+        output_path.mkdir(parents=True, exist_ok=True)
+        logger.info(f"Retries in total: {sum(call['retries'] for call in report['calls'])}")
+        report_path = output_path / REPORT_FILENAME
+        with report_path.open("w", encoding="utf-8") as file:
+            json.dump(report, file, indent=4)
+        logger.info(f"Performance report is saved in a file '{report_path}'.")
+
+        return report_path
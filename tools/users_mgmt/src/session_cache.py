@@ -0,0 +1,136 @@
+# Copyright (c) 2024-2025 Accenture, All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+
+
+SESSION_FILENAME = "session.json"
+EXPIRY_MARGIN = 5 * 60  # seconds before token expiry when the session is no longer used
+
+
+class SessionCache:
+    """Authentication Session Cache Class
+
+    Stores identity of the user executing the script, project and quota project set up for them
+    and expiry of their access token. While the session is valid (same credentials file, same project, token not expired)
+    the script skips `gcloud` configuration and the tokeninfo call. Access tokens themselves are never stored.
+    """
+
+    def __init__(self, file_path, logger):
+        """Authentication Session Cache Class Constructor
+
+        Args:
+            file_path (string): Path to the session file
+            logger (logging.Logger): logger
+        """
+        self.__file_path = Path(file_path)
+        self.__log = logger
+
+    @staticmethod
+    def fingerprint(credentials_file_path):
+        """Fingerprint of credentials file.
+
+        Any change of the file (new login, quota project change) changes the fingerprint and invalidates the session.
+
+        Args:
+            credentials_file_path (string): Path to credentials file
+
+        Returns:
+            string: fingerprint or None if the file does not exist.
+        """
+        try:
+            stat = os.stat(credentials_file_path)
+        except (OSError, TypeError):
+            return None
+        return f"{os.path.abspath(credentials_file_path)}:{stat.st_mtime_ns}:{stat.st_size}"
+
+    def load(self, project_id, fingerprint):
+        """Load valid session.
+
+        Args:
+            project_id (string): project id the script is executed for
+            fingerprint (string): fingerprint of the current credentials file
+
+        Returns:
+            dict: session or None if there is no valid session. Format:
+                    {"user_id", "project_id", "quota_project_id", "expiry", "fingerprint"}
+        """
+
+        if fingerprint is None:
+            return None
+
+        try:
+            with self.__file_path.open("r", encoding="utf-8") as file:
+                session = json.load(file)
+            expiry = datetime.fromisoformat(session["expiry"])
+        except FileNotFoundError:
+            return None
+        except (json.decoder.JSONDecodeError, KeyError, TypeError, ValueError, OSError) as e:
+            self.__log.warning(f"Session file {self.__file_path} cannot be read. It will be recreated. \nError: {e}")
+            return None
+
+        if session.get("fingerprint") != fingerprint:
+            self.__log.debug("Credentials changed since the session was saved.")
+            return None
+        if session.get("project_id") != project_id:
+            self.__log.debug(f"Session was saved for project {session.get('project_id')}, not {project_id}.")
+            return None
+        if (expiry - datetime.now(timezone.utc)).total_seconds() < EXPIRY_MARGIN:
+            self.__log.debug(f"Session expired at {session['expiry']}.")
+            return None
+
+        return session
+
+    def save(self, user_id, project_id, quota_project_id, expiry, fingerprint):
+        """Save session.
+
+        Args:
+            user_id (string): Id of user who is executing the script
+            project_id (string): project id the script is executed for
+            quota_project_id (string): quota project of the credentials
+            expiry (datetime.datetime): expiry of the access token (naive datetimes are treated as UTC)
+            fingerprint (string): fingerprint of the credentials file
+        """
+
+        if fingerprint is None or expiry is None or not user_id:
+            return
+
+        if expiry.tzinfo is None:
+            expiry = expiry.replace(tzinfo=timezone.utc)
+
+        session = {
+            "user_id": user_id,
+            "project_id": project_id,
+            "quota_project_id": quota_project_id,
+            "expiry": expiry.isoformat(),
+            "fingerprint": fingerprint,
+        }
+
+        self.__file_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.__file_path.with_suffix(".tmp")
+        # Session reveals identity of the user, so it is readable only by them
+        with open(os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "w", encoding="utf-8") as file:
+            json.dump(session, file, indent=4)
+        os.replace(tmp_path, self.__file_path)
+        self.__log.debug(f"Session saved in {self.__file_path} (valid until {session['expiry']}).")
+
+    def clear(self):
+        """Remove saved session."""
+        try:
+            self.__file_path.unlink()
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,146 @@
+# Copyright (c) 2024-2025 Accenture, All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import atexit
+import contextvars
+import json
+import logging
+import queue
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+
+LOG_FILENAME = "LOG.log"
+MAX_LOG_BYTES = 10 * 1024 * 1024
+LOG_BACKUP_COUNT = 5  # rotated files kept: LOG.log.1 ... LOG.log.5
+TEXT_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
+# Fields of structured records, set with `extra` or with `operation_context`
+CONTEXT_FIELDS = ("project", "operation_id", "operation", "user", "role", "elapsed_ms")
+
+# Fields of the operation being handled in the current thread
+_OPERATION_CONTEXT = contextvars.ContextVar("operation_context", default={})
+
+
+@contextmanager
+def operation_context(**fields):
+    """Attach fields (e.g. operation id) to all records logged in the current thread inside the block.
+
+    Args:
+        fields (dict): fields from CONTEXT_FIELDS
+    """
+    token = _OPERATION_CONTEXT.set({**_OPERATION_CONTEXT.get(), **fields})
+    try:
+        yield
+    finally:
+        _OPERATION_CONTEXT.reset(token)
+
+
+class _ContextFilter(logging.Filter):
+    """Adds fields of the current operation context to records. Runs in the thread which logs the record."""
+
+    def filter(self, record):
+        for field, value in _OPERATION_CONTEXT.get().items():
+            if not hasattr(record, field):
+                setattr(record, field, value)
+        return True
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """Queue handler which leaves formatting to the background writer.
+
+    Messages of the script are f-strings without arguments, so records can be passed as they are.
+    """
+
+    def prepare(self, record):
+        return record
+
+
+class _SizeRotatingFileHandler(RotatingFileHandler):
+    """Rotating file handler which checks the size already written instead of formatting every record twice."""
+
+    def shouldRollover(self, record):
+        return self.maxBytes > 0 and self.stream is not None and self.stream.tell() >= self.maxBytes
+
+
+class JsonFormatter(logging.Formatter):
+    """JSON Log Formatter Class
+
+    Formats each record as one JSON object per line: time, level, thread, message, fields from CONTEXT_FIELDS
+    which are set for the record and exception, if any.
+    """
+
+    def format(self, record):
+        entry = {"time": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec="milliseconds"),
+                 "level": record.levelname, "thread": record.threadName, "message": record.getMessage()}
+        for field in CONTEXT_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class AsyncLogging:
+    """Asynchronous Logging Class
+
+    Records are put in a queue by the logging threads and written to the log file and console by a background writer thread,
+    so formatting and I/O (also of DEBUG records) do not slow down the script.
+    The log file is appended to and rotated by size, so logs of previous runs are kept.
+    """
+
+    def __init__(self, logger, log_file=LOG_FILENAME, max_bytes=MAX_LOG_BYTES, backup_count=LOG_BACKUP_COUNT):
+        """Asynchronous Logging Class Constructor
+
+        Args:
+            logger (logging.Logger): logger whose records are written
+            log_file (string): Path to the log file
+            max_bytes (int): Size of the log file after which it is rotated
+            backup_count (int): Number of rotated log files kept
+        """
+        self.__file_handler = _SizeRotatingFileHandler(log_file, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8")
+        self.__console_handler = logging.StreamHandler()
+        self.set_text_format(TEXT_FORMAT)
+
+        queue_handler = _DeferredQueueHandler(queue.SimpleQueue())
+        queue_handler.addFilter(_ContextFilter())
+        logger.addHandler(queue_handler)
+        self.__listener = QueueListener(queue_handler.queue, self.__file_handler, self.__console_handler)
+        self.__listener.start()
+        self.__running = True
+        # Records still in the queue are written before the script exits
+        atexit.register(self.stop)
+
+    def set_text_format(self, text_format):
+        """Change format of text records.
+
+        Args:
+            text_format (string): logging format string
+        """
+        formatter = logging.Formatter(text_format)
+        if not isinstance(self.__file_handler.formatter, JsonFormatter):
+            self.__file_handler.setFormatter(formatter)
+        self.__console_handler.setFormatter(formatter)
+
+    def use_json(self):
+        """Write records to the log file as JSON lines (see `JsonFormatter`). Console output stays as text."""
+        self.__file_handler.setFormatter(JsonFormatter())
+
+    def stop(self):
+        """Write all queued records and stop the background writer."""
+        if self.__running:
+            self.__listener.stop()
+            self.__running = False
+        self.__file_handler.flush()